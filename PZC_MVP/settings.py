@@ -73,6 +73,7 @@ CORS_ALLOWED_ORIGINS = [
 
 
 MIDDLEWARE = [
+    'users_pzc.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -102,6 +103,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'PZC_MVP.wsgi.application'
+ASGI_APPLICATION = 'PZC_MVP.asgi.application'
 
 
 # Database
@@ -115,6 +117,9 @@ DATABASES = {
         'PASSWORD' : 'Pro@co2E',
         'HOST' : 'localhost',
         'PORT' : '3306',
+        # No persistent connections (CONN_MAX_AGE = 0): under ASGI each async request may run on a new
+        # thread and would leave its connection open
+        'CONN_MAX_AGE': 0,
     }
 }
 
@@ -191,7 +196,7 @@ LOGGING = {
     'loggers': {
         'django': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'level': 'INFO',  # DEBUG would also log every SQL statement
             'propagate': True,
         },
         'users_pzc': {  # Replace with your app's name
@@ -199,13 +204,29 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
-    },
-    'loggers': {
-    'django.utils.autoreload': {
-        'handlers': ['console'],
-        'level': 'INFO',  # Change DEBUG to INFO or WARNING to suppress debug logs
-        'propagate': False,
+        'django.utils.autoreload': {
+            'handlers': ['console'],
+            'level': 'INFO',  # Change DEBUG to INFO or WARNING to suppress debug logs
+            'propagate': False,
+        },
     },
 }
 
+# Request instrumentation (users_pzc.middleware.RequestTimingMiddleware)
+PZC_SERVER_TIMING = True
+PZC_SLOW_REQUEST_MS = 1000
+PZC_SLOW_REQUEST_QUERIES = 100
+
+# Chart responses are cached per user until that user's data changes (users_pzc.caching). Invalidation
+# bumps a version key that every worker process has to see, so the cache lives in files shared by all
+# processes of the host; with several hosts use RedisCache instead. A process-local LocMemCache would let
+# the other processes serve stale charts and answer 304 to stale ETags (system check users_pzc.W001).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
 }
+PZC_RESPONSE_CACHE = True
+PZC_RESPONSE_CACHE_TIMEOUT = 60 * 60
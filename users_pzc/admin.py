@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import EmissionFactor
 
 # Register your models here.
+
+
+@admin.register(EmissionFactor)
+class EmissionFactorAdmin(admin.ModelAdmin):
+    list_display = ('category', 'source', 'region', 'effective_from', 'factor')
+    list_filter = ('category', 'source', 'region')
+    search_fields = ('source', 'region')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class UsersPzcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users_pzc'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers the system checks)
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,157 @@
+import functools
+import hashlib
+import time
+from datetime import date
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import URLResolver, get_resolver
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+from .fiscal import invalidate_available_fiscal_years, invalidate_latest_fiscal_year
+
+DATA_VERSION_KEY = 'data_version:{owner}'
+RESPONSE_CACHE_KEY = 'response:{view}:{user_id}:{version}:{factors_version}:{params}'
+RESPONSE_STATS_KEY = 'response_stats:{view}:{outcome}'
+
+def data_version(owner):
+    """Returns the current data version of a user id (or 'emission_factors').
+
+    Versions start from the clock rather than 1, so a version key evicted from the cache can never
+    come back with a number that older cached responses were stored under.
+    """
+    key = DATA_VERSION_KEY.format(owner=owner)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_data_version(owner):
+    key = DATA_VERSION_KEY.format(owner=owner)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def user_data_changed(user_id):
+    # Called by the signals and by the bulk write paths, which bypass them
+    invalidate_latest_fiscal_year(user_id)
+    invalidate_available_fiscal_years(user_id)
+    bump_data_version(user_id)
+
+
+def record(view_name, outcome):
+    key = RESPONSE_STATS_KEY.format(view=view_name, outcome=outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass  # evicted between add and incr; losing one count is fine
+
+
+def response_cache_key(view_name, request):
+    # Every query parameter is part of the key (year, facility_id, facility_location, charts, ...)
+    params = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return RESPONSE_CACHE_KEY.format(
+        view=view_name, user_id=request.user.pk, version=data_version(request.user.pk),
+        factors_version=data_version('emission_factors'), params=params,
+    )
+
+
+def cache_response(get):
+    """Serves a chart view's GET from the cache until the user's data (or an emission factor) changes.
+
+    Successful responses are stored per user, view and query string under the user's data version,
+    which signals.py bumps on every write to the metric models or Facility.
+    """
+    @functools.wraps(get)
+    def cached_get(self, request, *args, **kwargs):
+        if not getattr(settings, 'PZC_RESPONSE_CACHE', True):
+            return get(self, request, *args, **kwargs)
+        # The class actually serving the request; subclasses share an inherited get()
+        view_name = type(self).__name__
+        key = response_cache_key(view_name, request)
+        data = cache.get(key)
+        if data is not None:
+            record(view_name, 'hits')
+            return Response(data)
+
+        record(view_name, 'misses')
+        response = get(self, request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):
+            cache.set(key, response.data, getattr(settings, 'PZC_RESPONSE_CACHE_TIMEOUT', 60 * 60))
+        return response
+    cached_get.response_cache = True
+    return cached_get
+
+
+def response_etag(view_name, request):
+    """Strong ETag of a read view's response, computed without touching the database.
+
+    Besides the data versions it covers the query string, the negotiated media type and the date
+    (some views default to the current year or hide future months).
+    """
+    parts = [
+        view_name, request.user.pk, data_version(request.user.pk), data_version('emission_factors'),
+        request.GET.urlencode(), getattr(request, 'accepted_media_type', ''), date.today().isoformat(),
+    ]
+    return '"%s"' % hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def conditional_response(get):
+    """Answers a matching If-None-Match with 304 before the view runs and tags successful responses.
+
+    `Cache-Control: private, no-cache` lets browsers keep the response but revalidate it every time.
+    """
+    @functools.wraps(get)
+    def conditional_get(self, request, *args, **kwargs):
+        etag = response_etag(type(self).__name__, request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = get(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    return conditional_get
+
+
+def cached_view_names(patterns=None):
+    # Views in the URLconf whose get() goes through cache_response (the decorator chain keeps the flag)
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= cached_view_names(pattern.url_patterns)
+            continue
+        view = getattr(pattern.callback, 'view_class', None)
+        if getattr(getattr(view, 'get', None), 'response_cache', False):
+            names.add(view.__name__)
+    return names
+
+
+def response_cache_stats():
+    view_names = sorted(cached_view_names())
+    keys = {
+        (view_name, outcome): RESPONSE_STATS_KEY.format(view=view_name, outcome=outcome)
+        for view_name in view_names for outcome in ('hits', 'misses')
+    }
+    counts = cache.get_many(keys.values())
+    views = {}
+    for view_name in view_names:
+        hits = counts.get(keys[view_name, 'hits'], 0)
+        misses = counts.get(keys[view_name, 'misses'], 0)
+        views[view_name] = {
+            'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+    hits = sum(stats['hits'] for stats in views.values())
+    misses = sum(stats['misses'] for stats in views.values())
+    return {
+        'backend': settings.CACHES['default']['BACKEND'],
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        'views': views,
+    }
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def check_response_cache_backend(app_configs, **kwargs):
+    # Data versions live in the cache: a per-process backend only sees the writes of its own process
+    if not getattr(settings, 'PZC_RESPONSE_CACHE', True) or settings.CACHES['default']['BACKEND'] != LOCMEM_BACKEND:
+        return []
+    return [Warning(
+        'PZC_RESPONSE_CACHE is enabled with LocMemCache, which every worker process keeps separately.',
+        hint="A write handled by one process leaves the other processes serving stale charts. Use a shared "
+             "cache backend (FileBasedCache, RedisCache) or set PZC_RESPONSE_CACHE = False when running "
+             "more than one process.",
+        id='users_pzc.W001',
+    )]
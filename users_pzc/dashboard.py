@@ -0,0 +1,653 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import NamedTuple
+from django.db.models import Q, Sum
+from django.utils.functional import cached_property
+from .emissions import (
+    EMISSION_SOURCES, ELECTRICITY_FIELDS, FUEL_FIELDS, FISCAL_MONTHS, LOGISTICES_FUELS, WATER_FIELDS,
+    emissions_by_period, month_start,
+)
+from .facilities import facility_names, resolve_facility_scope
+from .fiscal import calendar_month, current_fiscal_year
+from .models import MetricRollup, Waste, Energy, Water, Logistices, Biodiversity
+
+WASTE_FIELDS = [
+    'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste',
+    'liquid_discharge', 'other_waste', 'Recycle_waste', 'Landfill_waste'
+]
+STACKED_WASTE_FIELDS = [
+    'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste',
+    'liquid_discharge', 'Recycle_waste', 'Landfill_waste', 'other_waste'
+]
+WASTE_DONUT_FIELDS = ['food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste']
+RENEWABLE_FIELDS = ['renewable_solar', 'renewable_other']
+
+
+def month_name(month):
+    return datetime(1900, month, 1).strftime('%b')
+
+
+class DashboardData:
+    """Grouped data shared by every chart of one dashboard request.
+
+    Each source is fetched lazily with a single grouped query, so a bundle costs at most one
+    query per source no matter how many charts it contains.
+    """
+
+    def __init__(self, user, year, facility_id=None, facility_location=None, rollup_metrics=None, scope=None):
+        self.user = user
+        self.year = year
+        self.facility_id = facility_id
+        self.facility_location = facility_location
+        # Views pass the FacilityScope they resolved (and validated) for the request
+        self.scope = scope or resolve_facility_scope(user, facility_id, facility_location)
+        # {category: [metrics]} to read only part of the rollups; all waste, energy and water metrics by default
+        self.rollup_metrics = rollup_metrics
+        self.start_date = date(year, 4, 1)
+        self.end_date = date(year + 1, 3, 31)
+
+    def echo(self, name, default=None):
+        # Mirrors the parameter echo of the standalone views (each has its own default)
+        value = getattr(self, name)
+        return default if value is None else value
+
+    @property
+    def filters(self):
+        return {'user': self.user, **self.scope.filters}
+
+    @cached_property
+    def facilities(self):
+        return facility_names(self.user)
+
+    @cached_property
+    def by_facility_id(self):
+        # The same data narrowed by facility_id alone, for the charts whose endpoints ignore facility_location
+        if not self.facility_location or self.facility_location.lower() == 'all':
+            return self
+        return DashboardData(
+            self.user, self.year, self.facility_id, rollup_metrics=self.rollup_metrics,
+            scope=resolve_facility_scope(self.user, self.facility_id),
+        )
+
+    @cached_property
+    def rollups(self):
+        # {category: [{'metric', 'month', 'facility', 'facility__facility_name', 'facility__facility_location', 'total'}]}
+        if self.rollup_metrics is None:
+            scope = Q(category__in=['waste', 'energy', 'water'])
+        else:
+            scope = Q()
+            for category, metrics in self.rollup_metrics.items():
+                scope |= Q(category=category, metric__in=metrics)
+        rows = (
+            MetricRollup.objects.filter(scope, fiscal_year=self.year, **self.filters)
+            .values('category', 'metric', 'month', 'facility', 'facility__facility_name', 'facility__facility_location')
+            .annotate(total=Sum('total'))
+            .order_by()
+        )
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row['category']].append(row)
+        return grouped
+
+    def has_data(self, category):
+        return bool(self.rollups.get(category))
+
+    def monthly(self, category, metrics):
+        """Returns {month: {metric: total}} for every month of the fiscal year."""
+        totals = {month: dict.fromkeys(metrics, 0) for month in range(1, 13)}
+        for row in self.rollups.get(category, []):
+            if row['metric'] in metrics:
+                totals[row['month']][row['metric']] += row['total']
+        return totals
+
+    def totals(self, category, metrics):
+        totals = dict.fromkeys(metrics, 0)
+        for row in self.rollups.get(category, []):
+            if row['metric'] in metrics:
+                totals[row['metric']] += row['total']
+        return totals
+
+    def facility_totals(self, category, metrics):
+        """Returns {facility pk: total} summed over `metrics` for the facilities with data."""
+        totals = defaultdict(float)
+        for row in self.rollups.get(category, []):
+            if row['metric'] in metrics:
+                totals[row['facility']] += row['total']
+        return dict(totals)
+
+    def facility_names(self, category):
+        # [(facility pk, facility_name)] of the facilities with rows in `category`, in name order so that
+        # charts sorted by total list ties like the views do
+        return sorted(
+            {(row['facility'], row['facility__facility_name']) for row in self.rollups.get(category, [])},
+            key=lambda facility: (facility[1], facility[0]),
+        )
+
+    @cached_property
+    def logistices(self):
+        rows = list(
+            Logistices.objects.filter(fiscal_year=self.year, **self.filters)
+            .values('fiscal_month', 'facility', 'facility__facility_name', 'facility__facility_location', 'logistices_types')
+            .annotate(
+                total_fuel=Sum('fuel_consumption'),
+                total_km=Sum('km_travelled'),
+                total_trips=Sum('No_Trips'),
+                total_vehicles=Sum('No_Vehicles'),
+                total_usage=Sum('total_fuelconsumption'),
+                **{
+                    fuel_type: Sum('fuel_consumption', filter=Q(Typeof_fuel=fuel_type))
+                    for fuel_type in LOGISTICES_FUELS
+                }
+            )
+            .order_by()
+        )
+        for row in rows:
+            row['month'] = calendar_month(row['fiscal_month'])
+        return rows
+
+    @cached_property
+    def biodiversity(self):
+        # Covers the fiscal year plus the calendar year used by the overall usage card
+        return list(
+            Biodiversity.objects.filter(DatePicker__range=(date(self.year, 1, 1), self.end_date), **self.filters)
+            .values('DatePicker', 'width', 'height', 'no_trees', 'totalArea', 'head_count',
+                    'new_trees_planted', 'overall_Trees')
+        )
+
+    @property
+    def fiscal_biodiversity(self):
+        return [row for row in self.biodiversity if self.start_date <= row['DatePicker'] <= self.end_date]
+
+    def emission_totals(self, rows, fields, value):
+        # Sums `rows` into the {'period', 'region', <field>: total} rows emissions_by_period expects
+        totals = {}
+        for row in rows:
+            key = (row['month'], row['facility__facility_location'])
+            if key not in totals:
+                totals[key] = {'period': month_start(self.year, row['month']), 'region': key[1], **dict.fromkeys(fields, 0)}
+            for field, amount in value(row):
+                if field in fields:
+                    totals[key][field] += amount or 0
+        return list(totals.values())
+
+    def monthly_emissions(self):
+        totals = {}
+        for category in ('energy', 'water', 'waste'):
+            fields = [field for source_fields in EMISSION_SOURCES[category].values() for field in source_fields]
+            totals[category] = self.emission_totals(
+                self.rollups.get(category, []), fields, lambda row: [(row['metric'], row['total'])]
+            )
+        totals['logistices'] = self.emission_totals(
+            self.logistices, LOGISTICES_FUELS, lambda row: [(fuel, row[fuel]) for fuel in LOGISTICES_FUELS]
+        )
+        emissions = emissions_by_period(totals)
+        return {month: emissions.get(month_start(self.year, month), 0) for month in FISCAL_MONTHS}
+
+
+class OverviewMetric(NamedTuple):
+    """One metric field charted by a per-field overview endpoint."""
+    model: type
+    field: str
+    empty_label: str = None  # line chart key of the empty response, when it differs from the field
+
+    @property
+    def category(self):
+        return self.model.rollup_category
+
+
+# Every per-field overview endpoint, by view name
+METRIC_OVERVIEWS = {
+    'FoodWasteOverviewView': OverviewMetric(Waste, 'food_waste'),
+    'SolidWasteOverviewView': OverviewMetric(Waste, 'solid_Waste', empty_label='solid_waste'),
+    'E_WasteOverviewView': OverviewMetric(Waste, 'E_Waste'),
+    'Biomedical_WasteOverviewView': OverviewMetric(Waste, 'Biomedical_waste'),
+    'Liquid_DischargeOverviewView': OverviewMetric(Waste, 'liquid_discharge'),
+    'OthersOverviewView': OverviewMetric(Waste, 'other_waste'),
+    'Waste_Sent_For_RecycleOverviewView': OverviewMetric(Waste, 'Recycle_waste'),
+    'Waste_Sent_For_LandFillOverviewView': OverviewMetric(Waste, 'Landfill_waste'),
+    'HVACOverviewView': OverviewMetric(Energy, 'hvac'),
+    'ProductionOverviewView': OverviewMetric(Energy, 'production'),
+    'StpOverviewView': OverviewMetric(Energy, 'stp'),
+    'Admin_BlockOverviewView': OverviewMetric(Energy, 'admin_block'),
+    'Utilities_OverviewView': OverviewMetric(Energy, 'utilities'),
+    'Others_OverviewView': OverviewMetric(Energy, 'others'),
+    'Generated_WaterOverviewView': OverviewMetric(Water, 'Generated_Water'),
+    'Recycle_WaterOverviewView': OverviewMetric(Water, 'Recycled_Water'),
+    'Softener_usageOverviewView': OverviewMetric(Water, 'Softener_usage'),
+    'Boiler_usageOverviewView': OverviewMetric(Water, 'Boiler_usage'),
+    'otherUsage_OverviewView': OverviewMetric(Water, 'otherUsage'),
+}
+
+
+def metric_overview(metric):
+    """Line and donut chart of a single metric (the per-field overview views)."""
+    def build(data):
+        if not data.has_data(metric.category):
+            return {
+                "year": data.year,
+                "line_chart_data": [
+                    {"month": month_name(month), metric.empty_label or metric.field: 0} for month in FISCAL_MONTHS
+                ],
+                "donut_chart_data": [{"facility_name": "No Facility", "percentage": 0}],
+            }
+
+        monthly = data.monthly(metric.category, [metric.field])
+        totals = data.facility_totals(metric.category, [metric.field])
+        return {
+            "year": data.year,
+            "line_chart_data": [
+                {"month": month_name(month), metric.field: monthly[month][metric.field]} for month in FISCAL_MONTHS
+            ],
+            # Only the facilities with data, largest first
+            "donut_chart_data": facility_shares(
+                totals, [facility for facility in data.facility_names(metric.category) if facility[0] in totals],
+                largest_first=True,
+            ),
+        }
+    return build
+
+
+def facility_shares(totals, facilities, largest_first=False, ndigits=None):
+    """Donut chart data: each facility's share of the summed totals, in one pass.
+
+    `totals` maps facility pks to totals; `facilities` is the (pk, facility_name) list to chart, in order.
+    Every listed facility appears (0% without a total), so pass all of the user's facilities to include
+    the ones without usage.
+    """
+    total = sum(totals.values())
+    shares = [(name, (totals.get(pk, 0) / total * 100) if total else 0) for pk, name in facilities]
+    if largest_first:
+        shares.sort(key=lambda share: -share[1])
+    return [
+        {"facility_name": name, "percentage": percentage if ndigits is None else round(percentage, ndigits)}
+        for name, percentage in shares
+    ]
+
+
+def facility_donut(queryset, total, facilities=None, **options):
+    """Donut chart of the `total` aggregate per facility, from one query grouped by facility pk.
+
+    With `facilities` (the user's (pk, facility_name) pairs) every one of them is charted; otherwise the
+    facilities with rows, named by the same query, in name order. `options` go to facility_shares.
+    """
+    if facilities is None:
+        rows = list(
+            queryset.values('facility', 'facility__facility_name').annotate(total=total)
+            .order_by('facility__facility_name', 'facility')
+        )
+        facilities = [(row['facility'], row['facility__facility_name']) for row in rows]
+    else:
+        rows = queryset.values('facility').annotate(total=total).order_by()
+    return facility_shares({row['facility']: row['total'] or 0 for row in rows}, facilities, **options)
+
+
+def stacked_chart(category, fields):
+    def build(data):
+        monthly = data.monthly(category, fields)
+        return {
+            "facility_id": data.echo('facility_id'),
+            "year": data.year,
+            "facility_location": data.echo('facility_location'),
+            "stacked_bar_data": [{"month": month_name(month), **monthly[month]} for month in FISCAL_MONTHS],
+        }
+    return build
+
+
+def stacked_bars(queryset, series):
+    """Sums every series per month with a single GROUP BY fiscal_month query; returns the rows in fiscal order.
+
+    `series` maps an output key to its aggregate; months without entries get 0 for every key.
+    """
+    # Aliases are prefixed since an annotation may not reuse a model field's name
+    monthly = {month: dict.fromkeys(series, 0) for month in FISCAL_MONTHS}
+    rows = (
+        queryset
+        .values('fiscal_month')
+        .annotate(**{f'total_{key}': aggregate for key, aggregate in series.items()})
+        .order_by()
+    )
+    for row in rows:
+        if row['fiscal_month'] is not None:
+            monthly[calendar_month(row['fiscal_month'])].update((key, row[f'total_{key}']) for key in series)
+    return [{"month": month_name(month), **monthly[month]} for month in FISCAL_MONTHS]
+
+
+def waste_card(data):
+    response_data = {'year': data.year, 'overall_waste_totals': {}, 'facility_waste_data': {}}
+    totals = data.totals('waste', WASTE_FIELDS)
+    for field in WASTE_FIELDS:
+        response_data['overall_waste_totals'][f"overall_{field}"] = totals[field]
+        facility_totals = data.facility_totals('waste', [field])
+        response_data['facility_waste_data'][field] = [
+            {"facility_name": name, f"total_{field}": facility_totals[pk]}
+            for pk, name in sorted(
+                (facility for facility in data.facility_names('waste') if facility[0] in facility_totals),
+                key=lambda facility: -facility_totals[facility[0]],
+            )
+        ]
+    return response_data
+
+
+def waste_donut(data):
+    totals = data.totals('waste', WASTE_DONUT_FIELDS)
+    overall_total = sum(totals.values())
+    return {
+        "year": data.year,
+        "facility_id": data.echo('facility_id', 'all'),
+        "facility_location": data.echo('facility_location'),
+        "waste_percentages": {
+            f"{field}_total": (total / overall_total) * 100 if overall_total else 0
+            for field, total in totals.items()
+        },
+    }
+
+
+def waste_share(field, key, percentage_key):
+    """Share of `field` in the overall waste (sent to landfill / sent to recycle pie charts)."""
+    def build(data):
+        if not data.has_data('waste'):
+            return {"year": data.year, key: {percentage_key: 0, "remaining_percentage": 0}}
+
+        field_total = data.totals('waste', [field])[field]
+        overall_total = sum(data.totals('waste', WASTE_DONUT_FIELDS).values())
+        share = (field_total / overall_total) * 100 if overall_total else 0
+        remaining = ((overall_total - field_total) / overall_total) * 100 if overall_total else 0
+        return {
+            "year": data.year,
+            key: {percentage_key: round(share, 2), "remaining_percentage": round(remaining, 2)},
+        }
+    return build
+
+
+def energy_card(data):
+    if not data.has_data('energy'):
+        totals = {f"overall_{field}": 0.0 for field in ELECTRICITY_FIELDS}
+        totals['overall_fuel_used_in_operations'] = 0.0
+        totals['overall_renewable_energy'] = 0.0
+        return {'year': data.year, 'overall_energy_totals': totals}
+
+    totals = data.totals('energy', ELECTRICITY_FIELDS + RENEWABLE_FIELDS + FUEL_FIELDS)
+    overall = {f"overall_{field}": totals[field] for field in ELECTRICITY_FIELDS}
+    overall['overall_fuel_used_in_operations'] = sum(totals[field] for field in FUEL_FIELDS)
+    overall['overall_renewable_energy'] = sum(totals[field] for field in RENEWABLE_FIELDS)
+    return {'year': data.year, 'overall_energy_totals': overall}
+
+
+def renewable_energy(data):
+    monthly = data.monthly('energy', RENEWABLE_FIELDS)
+    return {
+        "year": data.year,
+        "line_chart_data": [
+            {"month": month_name(month), "renewable_energy": sum(monthly[month].values())}
+            for month in FISCAL_MONTHS
+        ],
+        # The endpoint narrows its donut by facility_id only
+        "donut_chart_data": facility_shares(
+            data.by_facility_id.facility_totals('energy', RENEWABLE_FIELDS), data.facilities
+        ),
+    }
+
+
+def fuel_used_in_operations(data):
+    monthly = data.monthly('energy', FUEL_FIELDS)
+    today = datetime.now()
+    return {
+        "year": data.year,
+        "line_chart_data": [
+            {"month": month_name(month), "fuel_used_in_operations": sum(monthly[month].values())}
+            for month in FISCAL_MONTHS
+            # No data yet for future months of the current year
+            if not (data.year == today.year and month > today.month)
+        ],
+        "donut_chart_data": facility_shares(data.facility_totals('energy', FUEL_FIELDS), data.facilities),
+    }
+
+
+def stacked_energy(data):
+    chart = stacked_chart('energy', ELECTRICITY_FIELDS + RENEWABLE_FIELDS)(data)
+    for entry in chart['stacked_bar_data']:
+        entry['renewable_energy'] = entry.pop('renewable_solar') + entry.pop('renewable_other')
+    return chart
+
+
+def energy_analytics(data):
+    totals = data.totals('energy', ELECTRICITY_FIELDS + RENEWABLE_FIELDS)
+    total_renewable_energy = sum(totals[field] for field in RENEWABLE_FIELDS)
+    total_non_renewable_energy = sum(totals[field] for field in ELECTRICITY_FIELDS)
+    total_energy = total_non_renewable_energy + total_renewable_energy
+    return {
+        "facility_id": data.echo('facility_id', 'all'),
+        "year": data.year,
+        "facility_location": data.echo('facility_location'),
+        "pie_chart_data": [
+            {"label": "Renewable Energy", "value": (total_renewable_energy / total_energy * 100) if total_energy > 0 else 0},
+            {"label": "Remaining Energy", "value": (total_non_renewable_energy / total_energy * 100) if total_energy > 0 else 0},
+        ],
+        "energy_percentages": {
+            f"{field}_total": round((totals[field] / total_non_renewable_energy * 100) if total_non_renewable_energy else 0, 2)
+            for field in ELECTRICITY_FIELDS
+        },
+    }
+
+
+def water_card(data):
+    totals = data.totals('water', WATER_FIELDS)
+    response_data = {'year': data.year}
+    if not data.has_data('water'):
+        response_data['message'] = f"No data available for the year {data.year}."
+    response_data['overall_water_totals'] = {f"overall_{field}": totals[field] for field in WATER_FIELDS}
+    return response_data
+
+
+def water_analytics(data):
+    totals = data.totals('water', WATER_FIELDS)
+    usage = {
+        "Softener_Usage": totals['Softener_usage'],
+        "Boiler_Usage": totals['Boiler_usage'],
+        "Other_Usage": totals['otherUsage'],
+    }
+    total_usage = sum(usage.values())
+    generated_recycled_total = totals['Generated_Water'] + totals['Recycled_Water']
+    remaining_water = generated_recycled_total - totals['Recycled_Water']
+    return {
+        "year": data.year,
+        "facility_id": data.echo('facility_id', 'all'),
+        "facility_location": data.echo('facility_location'),
+        "donut_chart_data": {
+            key: round((value / total_usage * 100) if total_usage else 0, 2) for key, value in usage.items()
+        },
+        "pie_chart_data": [
+            {"label": "Recycled Water", "value": (totals['Recycled_Water'] / generated_recycled_total * 100) if generated_recycled_total else 0},
+            {"label": "Remaining Water", "value": (remaining_water / generated_recycled_total * 100) if generated_recycled_total else 0},
+        ],
+    }
+
+
+def _carbon_offset(rows):
+    return sum(
+        0.00006 * (row['width'] or 0) ** 2 * (row['height'] or 0) * (row['no_trees'] or 0) for row in rows
+    )
+
+
+def biodiversity_metrics(data):
+    rows = data.fiscal_biodiversity
+    if not rows:
+        return {
+            "facility_id": data.echo('facility_id', 'all'),
+            "year": data.year,
+            "current_year_metrics": {
+                "total_trees": 0,
+                "carbon_offset": 0,
+                "green_belt_density": 0,
+                "trees_per_capita": 0,
+                "new_trees_planted": 0,
+                "biomass": 0,
+                "co2_sequestration_rate": 0,
+            },
+            "Offset_year": [{"year": 0, "carbon_offset": 0}],
+            "Green_Belt_Density": [{"year": 0, "green_belt_density": 0}],
+            "Trees_Per_Capita": [{"year": 0, "trees_per_capita": 0}],
+        }
+
+    sums = {
+        field: sum(row[field] or 0 for row in rows)
+        for field in ['no_trees', 'width', 'height', 'totalArea', 'head_count', 'new_trees_planted']
+    }
+    yearly = {
+        'year': data.year,
+        'carbon_offset': 0.00006 * (sums['width'] ** 2) * sums['height'] * sums['no_trees'],
+        'green_belt_density': (sums['no_trees'] / sums['totalArea']) * 10000 if sums['totalArea'] > 0 else 0,
+        'trees_per_capita': sums['no_trees'] / sums['head_count'] if sums['head_count'] > 0 else 0,
+    }
+
+    # The sequestration rate compares calendar years around the current fiscal year
+    latest_year = current_fiscal_year()
+    current_rows = [row for row in rows if row['DatePicker'].year == latest_year]
+    prev_rows = [row for row in rows if row['DatePicker'].year == latest_year - 1]
+
+    return {
+        "facility_id": data.echo('facility_id', 'all'),
+        "year": data.year,
+        "current_year_metrics": {
+            "total_trees": sums['no_trees'],
+            "carbon_offset": _carbon_offset(rows),
+            "green_belt_density": yearly['green_belt_density'],
+            "trees_per_capita": yearly['trees_per_capita'],
+            "new_trees_planted": sums['new_trees_planted'],
+            "biomass": sum(0.0998 * (row['width'] or 0) ** 2 * (row['height'] or 0) for row in rows),
+            "co2_sequestration_rate": _carbon_offset(current_rows) - _carbon_offset(prev_rows),
+        },
+        "Offset_year": [{"year": yearly['year'], "carbon_offset": yearly['carbon_offset']}],
+        "Green_Belt_Density": [{"year": yearly['year'], "green_belt_density": yearly['green_belt_density']}],
+        "Trees_Per_Capita": [{"year": yearly['year'], "trees_per_capita": yearly['trees_per_capita']}],
+    }
+
+
+def logistices_overview(data):
+    rows = data.logistices
+    if not rows:
+        return {
+            "year": data.year,
+            "facility_id": data.echo('facility_id', 'all'),
+            "logistices_totals": {
+                "total_vehicles": 0,
+                "total_trips": 0,
+                "total_km_travelled": 0.0,
+                "total_fuel_consumed": 0.0
+            },
+            "bar_chart_data": [{"month": month_name(month), "Fuel_Consumption": 0.0} for month in FISCAL_MONTHS],
+            "donut_chart_data": [{"facility_name": "No Facility", "percentage": 0}],
+            "logistices_fuel_comparison": {
+                "cargo": [{"month": month_name(month), "cargo": 0.0} for month in FISCAL_MONTHS],
+                "staff": [{"month": month_name(month), "staff": 0.0} for month in FISCAL_MONTHS],
+            }
+        }
+
+    monthly_fuel = {month: 0.0 for month in range(1, 13)}
+    type_fuel = {'Cargo': dict(monthly_fuel), 'Staff': dict(monthly_fuel)}
+    facility_fuel = defaultdict(float)
+    for row in rows:
+        fuel = row['total_fuel'] or 0.0
+        monthly_fuel[row['month']] += fuel
+        facility_fuel[row['facility']] += fuel
+        if row['logistices_types'] in type_fuel:
+            type_fuel[row['logistices_types']][row['month']] += fuel
+
+    facilities = sorted({(row['facility'], row['facility__facility_name']) for row in rows}, key=lambda facility: (facility[1], facility[0]))
+    return {
+        "year": data.year,
+        "facility_id": data.echo('facility_id', 'all'),
+        "logistices_totals": {
+            "total_vehicles": sum(row['total_vehicles'] or 0 for row in rows),
+            "total_trips": sum(row['total_trips'] or 0 for row in rows),
+            "total_km_travelled": sum(row['total_km'] or 0.0 for row in rows),
+            "total_fuel_consumed": sum(row['total_fuel'] or 0.0 for row in rows),
+        },
+        "bar_chart_data": [{"month": month_name(month), "Fuel_Consumption": monthly_fuel[month]} for month in FISCAL_MONTHS],
+        "donut_chart_data": facility_shares(facility_fuel, facilities, ndigits=2),
+        "logistices_fuel_comparison": {
+            "cargo": [{"month": month_name(month), "cargo": type_fuel['Cargo'][month]} for month in FISCAL_MONTHS],
+            "staff": [{"month": month_name(month), "staff": type_fuel['Staff'][month]} for month in FISCAL_MONTHS],
+        }
+    }
+
+
+def emission_line_chart(data):
+    emissions = data.monthly_emissions()
+    return {
+        'year': data.year,
+        'line_chart_data': [
+            {"month": month_name(month), "total_emissions": emissions.get(month, 0)} for month in FISCAL_MONTHS
+        ],
+    }
+
+
+def overall_usage(data):
+    # The endpoint narrows by facility_id only and echoes it lowercased
+    data = data.by_facility_id
+    facility_id = (data.facility_id or 'all').lower()
+    calendar_year_trees = sum(
+        row['overall_Trees'] or 0 for row in data.biodiversity if row['DatePicker'].year == data.year
+    )
+    return {
+        "email": data.user.email,
+        "year": data.year,
+        "facility_id": facility_id if facility_id != 'all' else "All facilities",
+        "overall_data": {
+            "waste_usage": round(data.totals('waste', ['overall_usage'])['overall_usage'], 2),
+            "energy_usage": round(data.totals('energy', ['overall_usage'])['overall_usage'], 2),
+            "water_usage": round(data.totals('water', ['overall_usage'])['overall_usage'], 2),
+            "biodiversity_usage": round(calendar_year_trees, 2),
+            "logistices_usage": round(sum(row['total_usage'] or 0.0 for row in data.logistices), 2),
+            "total_emissions": round(sum(data.monthly_emissions().values()), 2),
+        },
+    }
+
+
+# Chart identifiers are the names of the standalone overview endpoints
+DASHBOARD_CHARTS = {
+    'OverallUsageView': overall_usage,
+
+    'WasteViewCard_Over': waste_card,
+    'FoodWasteOverviewView': metric_overview(METRIC_OVERVIEWS['FoodWasteOverviewView']),
+    'SolidWasteOverviewView': metric_overview(METRIC_OVERVIEWS['SolidWasteOverviewView']),
+    'E_WasteOverviewView': metric_overview(METRIC_OVERVIEWS['E_WasteOverviewView']),
+    'Biomedical_WasteOverviewView': metric_overview(METRIC_OVERVIEWS['Biomedical_WasteOverviewView']),
+    'Liquid_DischargeOverviewView': metric_overview(METRIC_OVERVIEWS['Liquid_DischargeOverviewView']),
+    'OthersOverviewView': metric_overview(METRIC_OVERVIEWS['OthersOverviewView']),
+    'Waste_Sent_For_RecycleOverviewView': metric_overview(METRIC_OVERVIEWS['Waste_Sent_For_RecycleOverviewView']),
+    'Waste_Sent_For_LandFillOverviewView': metric_overview(METRIC_OVERVIEWS['Waste_Sent_For_LandFillOverviewView']),
+    'StackedWasteOverviewView': stacked_chart('waste', STACKED_WASTE_FIELDS),
+    'WasteOverallDonutChartView': waste_donut,
+    'SentToLandfillOverviewView': waste_share('Landfill_waste', 'sentToLandFill', 'landfill_percentage'),
+    'SentToRecycledOverviewView': waste_share('Recycle_waste', 'SentToRecycle', 'recycle_percentage'),
+
+    'EnergyViewCard_Over': energy_card,
+    'HVACOverviewView': metric_overview(METRIC_OVERVIEWS['HVACOverviewView']),
+    'ProductionOverviewView': metric_overview(METRIC_OVERVIEWS['ProductionOverviewView']),
+    'StpOverviewView': metric_overview(METRIC_OVERVIEWS['StpOverviewView']),
+    'Admin_BlockOverviewView': metric_overview(METRIC_OVERVIEWS['Admin_BlockOverviewView']),
+    'Utilities_OverviewView': metric_overview(METRIC_OVERVIEWS['Utilities_OverviewView']),
+    'Others_OverviewView': metric_overview(METRIC_OVERVIEWS['Others_OverviewView']),
+    'Renewable_EnergyOverView': renewable_energy,
+    'Fuel_Used_OperationsOverView': fuel_used_in_operations,
+    'StackedEnergyOverviewView': stacked_energy,
+    'EnergyAnalyticsView': energy_analytics,
+
+    'WaterViewCard_Over': water_card,
+    'Generated_WaterOverviewView': metric_overview(METRIC_OVERVIEWS['Generated_WaterOverviewView']),
+    'Recycle_WaterOverviewView': metric_overview(METRIC_OVERVIEWS['Recycle_WaterOverviewView']),
+    'Softener_usageOverviewView': metric_overview(METRIC_OVERVIEWS['Softener_usageOverviewView']),
+    'Boiler_usageOverviewView': metric_overview(METRIC_OVERVIEWS['Boiler_usageOverviewView']),
+    'otherUsage_OverviewView': metric_overview(METRIC_OVERVIEWS['otherUsage_OverviewView']),
+    'StackedWaterOverviewView': stacked_chart('water', WATER_FIELDS),
+    'WaterAnalyticsView': water_analytics,
+
+    'BiodiversityMetricsGraphsView': biodiversity_metrics,
+    'LogisticesOverviewAndGraphs': logistices_overview,
+    'EmissionCalculations': emission_line_chart,
+}
+
+
+def build_dashboard(data, chart_ids):
+    return {chart_id: DASHBOARD_CHARTS[chart_id](data) for chart_id in chart_ids}
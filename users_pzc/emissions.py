@@ -0,0 +1,198 @@
+import time
+from collections import defaultdict
+from datetime import date
+import numpy as np
+from django.db.models import F, Sum, Q
+from django.db.models.functions import Coalesce, TruncMonth
+
+ELECTRICITY_FIELDS = ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others']
+FUEL_FIELDS = ['coking_coal', 'coke_oven_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid']
+WATER_FIELDS = ['Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage']
+WASTE_EMISSION_FIELDS = ['Landfill_waste', 'Recycle_waste']
+LOGISTICES_FUELS = ['diesel', 'petrol']  # Typeof_fuel values; their fuel_consumption is what emits
+
+# The summed fields each emission factor multiplies: {category: {source: [fields]}}
+EMISSION_SOURCES = {
+    'energy': {'electricity': ELECTRICITY_FIELDS, **{fuel: [fuel] for fuel in FUEL_FIELDS}},
+    'water': {'water': WATER_FIELDS},
+    'waste': {field: [field] for field in WASTE_EMISSION_FIELDS},
+    'logistices': {fuel: [fuel] for fuel in LOGISTICES_FUELS},
+}
+
+# Other processes pick up factor edits after this long; edits in this process apply at once (signals.py)
+EMISSION_FACTOR_RELOAD_SECONDS = 5 * 60
+
+# Fiscal year month order (April - March)
+FISCAL_MONTHS = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
+
+
+class EmissionFactorTable:
+    """All EmissionFactor rows, indexed for vectorized lookup.
+
+    Each (category, source, region) has a date-sorted series; a month uses the factor in force on its
+    first day, and a region-specific factor wins over the blank-region default once it is in force.
+    """
+
+    def __init__(self, factors):
+        series = defaultdict(list)
+        for factor in factors:
+            series[(factor.category, factor.source, factor.region.strip().lower())].append(
+                (factor.effective_from, factor.factor)
+            )
+        self.series = {}
+        for key, values in series.items():
+            values.sort()
+            self.series[key] = (
+                np.array([effective_from for effective_from, _ in values], dtype='datetime64[D]'),
+                np.array([value for _, value in values], dtype=float),
+            )
+        self.regions = {region for _, _, region in self.series if region}
+
+    def _in_force(self, key, periods):
+        # NaN where the series has no factor in force yet
+        if key not in self.series:
+            return np.full(len(periods), np.nan)
+        dates, values = self.series[key]
+        index = np.searchsorted(dates, periods, side='right') - 1
+        return np.where(index >= 0, values[np.maximum(index, 0)], np.nan)
+
+    def lookup(self, category, source, periods, regions):
+        factors = self._in_force((category, source, ''), periods)
+        for region in self.regions.intersection(regions):
+            rows = regions == region
+            regional = self._in_force((category, source, region), periods[rows])
+            factors[rows] = np.where(np.isnan(regional), factors[rows], regional)
+        # Sources without any factor in force emit nothing
+        return np.nan_to_num(factors)
+
+    def matrix(self, category, periods, regions):
+        """Returns the (rows x sources) factor matrix for rows of `periods` (datetime64[D]) and `regions`."""
+        return np.column_stack([
+            self.lookup(category, source, periods, regions) for source in EMISSION_SOURCES[category]
+        ])
+
+
+_factor_cache = {'table': None, 'loaded_at': 0.0}
+
+
+def emission_factors():
+    """Returns the process-wide EmissionFactorTable, loading it with one query when missing or stale."""
+    if _factor_cache['table'] is None or time.monotonic() - _factor_cache['loaded_at'] > EMISSION_FACTOR_RELOAD_SECONDS:
+        from .models import EmissionFactor
+        _factor_cache['table'] = EmissionFactorTable(EmissionFactor.objects.all())
+        _factor_cache['loaded_at'] = time.monotonic()
+    return _factor_cache['table']
+
+
+def invalidate_emission_factors():
+    _factor_cache['table'] = None
+
+
+def emissions_by_period(totals, factors=None):
+    """Applies the emission factors to pre-aggregated totals and returns {first day of month: emissions}.
+
+    `totals` maps a category to rows of {'period': first day of the month, 'region': facility location,
+    <field>: total}. Each category becomes a (rows x fields) matrix that is reduced to its sources and
+    multiplied by the factors in force for every row at once.
+    """
+    factors = factors or emission_factors()
+    emissions = defaultdict(float)
+    for category, rows in totals.items():
+        rows = [row for row in rows if row['period'] is not None]
+        if not rows:
+            continue
+        sources = EMISSION_SOURCES[category]
+        fields = [field for source_fields in sources.values() for field in source_fields]
+        # (fields x sources) 0/1 matrix summing the fields of each source
+        field_sources = np.zeros((len(fields), len(sources)))
+        offset = 0
+        for column, source_fields in enumerate(sources.values()):
+            field_sources[offset:offset + len(source_fields), column] = 1
+            offset += len(source_fields)
+
+        quantities = np.array([[row.get(field) or 0 for field in fields] for row in rows], dtype=float)
+        periods = np.array([row['period'] for row in rows], dtype='datetime64[D]')
+        regions = np.array([(row['region'] or '').strip().lower() for row in rows], dtype=object)
+        row_emissions = ((quantities @ field_sources) * factors.matrix(category, periods, regions)).sum(axis=1)
+
+        unique_periods, index = np.unique(periods, return_inverse=True)
+        for period, value in zip(unique_periods.astype(object), np.bincount(index, weights=row_emissions)):
+            emissions[period] += float(value)
+    return dict(emissions)
+
+
+def month_start(fiscal_year, month):
+    return date(fiscal_year if month >= 4 else fiscal_year + 1, month, 1)
+
+
+def monthly_totals(queryset, aggregates):
+    """Runs a single GROUP BY month, facility location query; returns rows of {'period', 'region', alias: total}."""
+    return list(
+        queryset
+        .values(period=TruncMonth('DatePicker'), region=F('facility__facility_location'))
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def _field_sums(fields):
+    return {field: Coalesce(Sum(field), 0.0) for field in fields}
+
+
+def energy_monthly_totals(queryset, **extra):
+    return monthly_totals(queryset, {**_field_sums(ELECTRICITY_FIELDS + FUEL_FIELDS), **extra})
+
+
+def water_monthly_totals(queryset, **extra):
+    return monthly_totals(queryset, {**_field_sums(WATER_FIELDS), **extra})
+
+
+def waste_monthly_totals(queryset, **extra):
+    return monthly_totals(queryset, {**_field_sums(WASTE_EMISSION_FIELDS), **extra})
+
+
+def logistices_monthly_totals(queryset, **extra):
+    return monthly_totals(queryset, {
+        **{
+            fuel_type: Coalesce(Sum('fuel_consumption', filter=Q(Typeof_fuel=fuel_type)), 0.0)
+            for fuel_type in LOGISTICES_FUELS
+        },
+        **extra,
+    })
+
+
+def by_fiscal_month(emissions):
+    # {first day of month: emissions} -> {month: emissions} in fiscal order
+    by_month = dict.fromkeys(FISCAL_MONTHS, 0)
+    for period, value in emissions.items():
+        by_month[period.month] += value
+    return by_month
+
+
+def monthly_emissions(energy_data, water_data, waste_data, logistices_data):
+    """Returns {month: total_emissions} using one grouped query per model."""
+    return by_fiscal_month(emissions_by_period({
+        'energy': energy_monthly_totals(energy_data),
+        'water': water_monthly_totals(water_data),
+        'waste': waste_monthly_totals(waste_data),
+        'logistices': logistices_monthly_totals(logistices_data),
+    }))
+
+
+def emissions_and_usage(energy_data, water_data, waste_data, logistices_data):
+    """Returns ({month: total_emissions}, {category: usage total}) from one grouped query per model.
+
+    The usage totals (overall_usage, total_fuelconsumption for logistices) ride along as an extra
+    aggregate of the emission queries.
+    """
+    usage = {'usage': Coalesce(Sum('overall_usage'), 0.0)}
+    totals = {
+        'energy': energy_monthly_totals(energy_data, **usage),
+        'water': water_monthly_totals(water_data, **usage),
+        'waste': waste_monthly_totals(waste_data, **usage),
+        'logistices': logistices_monthly_totals(logistices_data, usage=Coalesce(Sum('total_fuelconsumption'), 0.0)),
+    }
+    return (
+        by_fiscal_month(emissions_by_period(totals)),
+        {category: sum(row['usage'] for row in rows) for category, rows in totals.items()},
+    )
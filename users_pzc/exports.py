@@ -0,0 +1,121 @@
+import csv
+import tempfile
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .pagination import keyset_rows, keyset_segments
+
+EXPORT_CHUNK_SIZE = 2000
+# The XLSX zip is built before its first byte is sent, so its size is capped; CSV has no limit
+XLSX_MAX_ROWS = 100000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class CSVRenderer(BaseRenderer):
+    # Lets `?format=csv` pass content negotiation; the view streams the file itself
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class XLSXRenderer(BaseRenderer):
+    media_type = XLSX_CONTENT_TYPE
+    format = 'xlsx'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+EXPORT_RENDERERS = {'csv': CSVRenderer, 'xlsx': XLSXRenderer}
+
+
+def export_columns(model):
+    # Every stored column except the owner and the fiscal period derived from DatePicker; the headers
+    # match the import/create field names
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.name not in ('user', 'fiscal_year', 'fiscal_month')
+    ]
+
+
+def export_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields lists of row tuples, newest entries first and undated ones last (as in the JSON views)."""
+    # Keyset batches rather than one big cursor: mysqlclient buffers a whole result set
+    # client side even with .iterator(), so each batch is its own small query
+    pk = queryset.model._meta.pk.attname
+    date_index, pk_index = columns.index('DatePicker'), columns.index(pk)
+    last = None
+    while True:
+        segments, _ = keyset_segments(queryset, None if last is None else (last[date_index], last[pk_index]))
+        rows = keyset_rows(segments, chunk_size, values=columns)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def _csv_stream(queryset, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for rows in export_rows(queryset, columns):
+        yield ''.join(writer.writerow(row) for row in rows)
+
+
+def export_response(queryset, export_format, filename):
+    """Returns the rows of `queryset` as a streamed CSV or an XLSX download (a 400 when too big for XLSX)."""
+    model = queryset.model
+    columns = export_columns(model)
+    if export_format == 'csv':
+        response = StreamingHttpResponse(_csv_stream(queryset, columns), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    if queryset.count() > XLSX_MAX_ROWS:
+        return Response(
+            {"error": f"XLSX exports are limited to {XLSX_MAX_ROWS} rows. Narrow the filters or use format=csv."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    # Write-only workbooks keep rows on disk while building, but the whole zip is written to a temp file
+    # before the response starts; only sending it is streamed
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=model.__name__)
+    sheet.append(columns)
+    for rows in export_rows(queryset, columns):
+        for row in rows:
+            sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f'{filename}.xlsx', content_type=XLSX_CONTENT_TYPE)
+
+
+class MetricExportMixin:
+    """Adds `?format=csv|xlsx` downloads to a metric list view.
+
+    The view calls `export_response` itself; any regular Response (errors included) is still sent as JSON.
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + list(EXPORT_RENDERERS.values())
+
+    def export_format(self, request):
+        # accepted_renderer is missing when content negotiation itself failed
+        renderer = getattr(request, 'accepted_renderer', None)
+        return renderer.format if renderer is not None and renderer.format in EXPORT_RENDERERS else None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.export_format(request) and not isinstance(response, StreamingHttpResponse):
+            request.accepted_renderer, request.accepted_media_type = JSONRenderer(), JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
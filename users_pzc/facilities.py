@@ -0,0 +1,74 @@
+from typing import NamedTuple, Optional
+from .models import Facility
+
+INVALID_FACILITY_ERROR = 'Invalid facility ID or not associated with the logged-in user.'
+
+
+def user_facilities(user):
+    """Returns [(facility_id, facility_name, facility_location)] of the user's facilities.
+
+    Not cached across requests: one indexed query, and a facility must be usable as soon as it is created.
+    """
+    return list(
+        Facility.objects.filter(user=user).order_by('facility_id')
+        .values_list('facility_id', 'facility_name', 'facility_location')
+    )
+
+
+def facility_names(user):
+    # [(facility_id, facility_name)] of all the user's facilities, for charts that list every one
+    return [(pk, name) for pk, name, _ in user_facilities(user)]
+
+
+def _given(value):
+    return bool(value) and value.lower() != 'all'
+
+
+class FacilityScope(NamedTuple):
+    """The facilities a request's facility_id / facility_location parameters select.
+
+    `facility_ids` is None when neither narrows the request; `error` is set for an unknown facility or
+    a location none of the user's facilities are in.
+    """
+    facility_ids: Optional[list] = None
+    error: Optional[str] = None
+
+    @property
+    def filters(self):
+        # On the metric models' own facility_id column: no join with Facility. A scope with an error
+        # selects nothing, for the views that answer unknown facilities with empty charts.
+        if self.error:
+            return {'facility_id__in': []}
+        return {} if self.facility_ids is None else {'facility_id__in': self.facility_ids}
+
+
+def resolve_facility_scope(user, facility_id=None, facility_location=None, facilities=None):
+    if facilities is None:
+        facilities = user_facilities(user)
+    facility_ids = None
+    if _given(facility_id):
+        # Case-insensitive like the MySQL collation the ids are compared with
+        facility_ids = [pk for pk, _, _ in facilities if pk.lower() == facility_id.lower()]
+        if not facility_ids:
+            return FacilityScope(error=INVALID_FACILITY_ERROR)
+    if _given(facility_location):
+        located = [pk for pk, _, location in facilities if facility_location.lower() in location.lower()]
+        if not located:
+            return FacilityScope(error=f'No facility found with location {facility_location}.')
+        facility_ids = located if facility_ids is None else [pk for pk in facility_ids if pk in located]
+    return FacilityScope(facility_ids)
+
+
+def facility_scope(request, facility_id=None, facility_location=None):
+    """Returns the FacilityScope of `facility_id` / `facility_location` for request.user, once per request."""
+    scopes = getattr(request, '_facility_scopes', None)
+    if scopes is None:
+        scopes = request._facility_scopes = {}
+    key = (facility_id, facility_location)
+    if key not in scopes:
+        # The user's facilities are read once per request, however many scopes it resolves
+        facilities = getattr(request, '_user_facilities', None)
+        if facilities is None:
+            facilities = request._user_facilities = user_facilities(request.user)
+        scopes[key] = resolve_facility_scope(request.user, facility_id, facility_location, facilities=facilities)
+    return scopes[key]
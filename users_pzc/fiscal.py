@@ -0,0 +1,96 @@
+from datetime import date
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+
+LATEST_FISCAL_YEAR_CACHE_KEY = 'latest_fiscal_year:{user_id}'
+LATEST_FISCAL_YEAR_CACHE_TIMEOUT = 60 * 60
+AVAILABLE_FISCAL_YEARS_CACHE_KEY = 'available_fiscal_years:{user_id}'
+
+
+def fiscal_period(picked):
+    """Returns the (fiscal_year, fiscal_month) of a date (or ISO date string), (None, None) without one.
+
+    The fiscal year runs April - March and is named after the year it starts in; April is fiscal month 1.
+    The stored fiscal columns of the metric rows and the rollup buckets both come from here.
+    """
+    if not picked:
+        return None, None
+    if isinstance(picked, str):
+        picked = date.fromisoformat(picked)
+    return (picked.year if picked.month >= 4 else picked.year - 1), (picked.month - 4) % 12 + 1
+
+
+def calendar_month(fiscal_month):
+    # The calendar month of a stored fiscal_month (1 = April ... 12 = March)
+    return (fiscal_month + 2) % 12 + 1
+
+
+def current_fiscal_year():
+    return fiscal_period(date.today())[0]
+
+
+def _latest_data_date(user):
+    from .models import METRIC_MODELS, CustomUser  # models imports this module
+    # One query: an index-backed "latest DatePicker" subquery per metric model
+    latest = CustomUser.objects.filter(pk=user.pk).values(**{
+        model.__name__: Subquery(
+            model.objects.filter(user=OuterRef('pk'), DatePicker__isnull=False)
+            .order_by('-DatePicker')
+            .values('DatePicker')[:1]
+        )
+        for model in METRIC_MODELS
+    }).first()
+    return max(filter(None, (latest or {}).values()), default=None)
+
+
+def latest_fiscal_year(user, default=None):
+    """Returns the fiscal year of the user's most recent entry across all metric models.
+
+    Falls back to `default` (the current fiscal year when not given) if the user has no data.
+    The lookup is cached per user and invalidated by writes to any metric model (see signals.py).
+    """
+    key = LATEST_FISCAL_YEAR_CACHE_KEY.format(user_id=user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        latest_date = _latest_data_date(user)
+        # Cache "no data" as well so empty accounts don't hit the database on every chart
+        cached = {'year': fiscal_period(latest_date)[0]}
+        cache.set(key, cached, LATEST_FISCAL_YEAR_CACHE_TIMEOUT)
+
+    if cached['year'] is not None:
+        return cached['year']
+    return current_fiscal_year() if default is None else default
+
+
+def invalidate_latest_fiscal_year(user_id):
+    cache.delete(LATEST_FISCAL_YEAR_CACHE_KEY.format(user_id=user_id))
+
+
+def _available_fiscal_years(user, facility_id=None):
+    from .models import METRIC_MODELS  # models imports this module
+    # One query: the distinct stored fiscal years of each metric model, UNIONed (which removes duplicates)
+    querysets = []
+    for model in METRIC_MODELS:
+        queryset = model.objects.filter(user=user, fiscal_year__isnull=False)
+        if facility_id is not None:
+            queryset = queryset.filter(facility_id=facility_id)
+        querysets.append(queryset.values('fiscal_year').distinct().order_by())
+    return sorted((row['fiscal_year'] for row in querysets[0].union(*querysets[1:])), reverse=True)
+
+
+def available_fiscal_years(user, facility_id=None):
+    """Returns the fiscal years (newest first) with data in any metric model, optionally for one facility.
+
+    Cached per user, one entry per facility, and invalidated by writes to any metric model or facility.
+    """
+    key = AVAILABLE_FISCAL_YEARS_CACHE_KEY.format(user_id=user.pk)
+    cached = cache.get(key) or {}
+    scope = facility_id or 'all'
+    if scope not in cached:
+        cached[scope] = _available_fiscal_years(user, facility_id)
+        cache.set(key, cached, LATEST_FISCAL_YEAR_CACHE_TIMEOUT)
+    return cached[scope]
+
+
+def invalidate_available_fiscal_years(user_id):
+    cache.delete(AVAILABLE_FISCAL_YEARS_CACHE_KEY.format(user_id=user_id))
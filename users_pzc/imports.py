@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import date, datetime
+from zipfile import BadZipFile
+import numpy as np
+import pandas as pd
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, models, transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from rest_framework import serializers
+from .caching import user_data_changed
+from .fiscal import fiscal_period
+from .models import (
+    Waste, Energy, Water, Biodiversity, Facility, Logistices, MetricRollup, RollupMixin, assign_unique_ids,
+    month_key, taken_month_keys
+)
+from .serializers import (
+    WasteCreateSerializer, EnergyCreateSerializer, WaterCreateSerializer, BiodiversityCreateSerializer,
+    LogisticesSerializer, get_fiscal_year_range, get_month_range
+)
+
+IMPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def read_chunks(upload, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields (first_row_number, DataFrame) chunks of a .csv or .xlsx upload without loading it whole.
+
+    Row numbers are the spreadsheet's own (the header is row 1).
+    """
+    name = upload.name.lower()
+    if name.endswith('.csv'):
+        try:
+            reader = pd.read_csv(
+                upload, dtype=str, keep_default_na=False, skip_blank_lines=False,
+                encoding='utf-8-sig', chunksize=chunk_size
+            )
+            row_number = 2
+            for frame in reader:
+                yield row_number, frame
+                row_number += len(frame)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise ImportFileError(f"The uploaded CSV file could not be read: {e}")
+    elif name.endswith(('.xlsx', '.xlsm')):
+        try:
+            workbook = load_workbook(upload, read_only=True, data_only=True)
+        except (BadZipFile, InvalidFileException, KeyError) as e:
+            raise ImportFileError(f"The uploaded Excel file could not be read: {e}")
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = ['' if value is None else str(value) for value in header]
+            chunk, row_number = [], 2
+            for values in rows:
+                # Read-only rows can be shorter or longer than the header
+                chunk.append((tuple(values) + (None,) * len(columns))[:len(columns)])
+                if len(chunk) == chunk_size:
+                    yield row_number, pd.DataFrame(chunk, columns=columns, dtype=object)
+                    row_number += len(chunk)
+                    chunk = []
+            if chunk:
+                yield row_number, pd.DataFrame(chunk, columns=columns, dtype=object)
+        finally:
+            workbook.close()
+    else:
+        raise ImportFileError("Unsupported file type. Upload a .csv or .xlsx file.")
+
+
+def _normalize(column):
+    # Cells arrive as text, numbers or datetimes: strip text and treat blank cells as missing
+    column = column.map(lambda value: value.strip() if isinstance(value, str) else value)
+    return column.mask(column.isna() | (column == ''))
+
+
+def _month_keys(importer, frame):
+    return pd.MultiIndex.from_arrays(
+        [frame['facility_id'], frame['year'], frame['month']] + [frame[column] for column in importer.key_columns]
+    )
+
+
+def _stored_keys(importer, frame, period_range):
+    # One range query for the entries stored before the import that the chunk's rows could clash with
+    first, last = frame['DatePicker'].min(), frame['DatePicker'].max()
+    queryset = importer.model.objects.filter(
+        facility_id__in=frame['facility_id'].unique().tolist(),
+        DatePicker__range=(period_range(first.year, first.month)[0], period_range(last.year, last.month)[1])
+    )
+    stored = {
+        (facility_id, picked.year, picked.month) + tuple(rest)
+        for facility_id, picked, *rest in queryset.values_list('facility_id', 'DatePicker', *importer.key_columns)
+    }
+    if not hasattr(importer.model, 'unique_month_fields'):
+        # Without a unique constraint a sheet may carry several rows of a month, so only entries
+        # stored before the import count
+        stored -= importer.imported_keys
+    return pd.MultiIndex.from_tuples(list(stored)) if stored else None
+
+
+def _is_duplicate(keys, stored):
+    if stored is None:
+        return np.zeros(len(keys), dtype=bool)
+    return keys.isin(stored)
+
+
+def _is_month_duplicate(importer, frame):
+    # The unique constraint allows one entry per month: later rows of the sheet for a month clash too
+    keys = _month_keys(importer, frame)
+    return _is_duplicate(keys, _stored_keys(importer, frame, get_month_range)) | keys.duplicated()
+
+
+def monthly_duplicates(importer, frame):
+    """One entry per facility and month (and logistices type and fuel type for logistices)."""
+    duplicate = _is_month_duplicate(importer, frame)
+    columns = list(importer.key_columns)
+    return {
+        row: {"non_field_errors": [importer.serializer.duplicate_error(tuple(frame.loc[row, columns]))]}
+        for row in frame.index[duplicate]
+    }
+
+
+def biodiversity_duplicates(importer, frame):
+    """A species once per facility and fiscal year, and one entry per facility, month and species."""
+    stored = _stored_keys(importer, frame, get_fiscal_year_range)
+    fiscal_year = frame['DatePicker'].map(lambda picked: fiscal_period(picked)[0])
+    stored_fiscal = None
+    if stored is not None:
+        stored_fiscal = pd.MultiIndex.from_tuples([
+            (facility_id, fiscal_period(date(year, month, 1))[0], species) for facility_id, year, month, species in stored
+        ])
+
+    errors = {}
+    has_species = (frame['species'] != '').to_numpy()
+    species_keys = pd.MultiIndex.from_arrays([frame['facility_id'], fiscal_year, frame['species']])
+    for row in frame.index[_is_duplicate(species_keys, stored_fiscal) & has_species]:
+        errors[row] = {'species': [importer.serializer.duplicate_species_error]}
+    for row in frame.index[_is_duplicate(_month_keys(importer, frame), stored)]:
+        errors.setdefault(row, {"non_field_errors": [importer.serializer.duplicate_month_error]})
+    return errors
+
+
+# Category -> model, the serializer whose rules the rows are validated against, its uniqueness check
+# and the columns that key an entry besides facility and month
+IMPORT_CATEGORIES = {
+    'waste': (Waste, WasteCreateSerializer, monthly_duplicates, ()),
+    'energy': (Energy, EnergyCreateSerializer, monthly_duplicates, ()),
+    'water': (Water, WaterCreateSerializer, monthly_duplicates, ()),
+    'biodiversity': (Biodiversity, BiodiversityCreateSerializer, biodiversity_duplicates, ('species',)),
+    'logistices': (Logistices, LogisticesSerializer, monthly_duplicates, ('logistices_types', 'Typeof_fuel')),
+}
+IMPORT_CATEGORIES['logistics'] = IMPORT_CATEGORIES['logistices']
+
+
+class MetricImporter:
+    """Streams a spreadsheet into one metric model, chunk by chunk.
+
+    Each chunk is validated column-wise with pandas against the rules of the category's create
+    serializer (required fields, date/number formats, existing facility, duplicate entries), valid
+    rows are written with bulk_create and invalid ones are collected into a per-row error report.
+    """
+
+    def __init__(self, category, user, chunk_size=IMPORT_CHUNK_SIZE):
+        self.model, serializer_class, self.find_duplicates, self.key_columns = IMPORT_CATEGORIES[category]
+        self.serializer = serializer_class()
+        self.user = user
+        self.chunk_size = chunk_size
+        # Keys written by this import; for models without a unique constraint (biodiversity) only
+        # entries stored before it count as duplicates
+        self.imported_keys = set()
+        self.columns = {name: field for name, field in self.serializer.fields.items() if not field.read_only}
+        self.report = {"category": category, "total_rows": 0, "created": 0, "failed": 0, "errors": []}
+
+    def run(self, upload):
+        for first_row, frame in read_chunks(upload, self.chunk_size):
+            self.import_chunk(first_row, frame)
+        if self.report['created']:
+            user_data_changed(self.user.pk)
+        self.report['errors_truncated'] = self.report['failed'] > len(self.report['errors'])
+        return self.report
+
+    def model_field(self, name):
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def parse_dates(self, field, column):
+        # Daily sheets repeat few distinct dates, so the field's own parser runs once per value
+        parsed = {}
+        for value in column.dropna().unique():
+            if isinstance(value, datetime):
+                value_date = value.date()  # Excel date cells
+            else:
+                try:
+                    value_date = field.to_internal_value(str(value))
+                except serializers.ValidationError:
+                    value_date = None
+            parsed[value] = value_date
+        return parsed
+
+    def parse_columns(self, frame, errors):
+        """Returns the typed columns; missing cells are NaN/None so the model default applies."""
+        parsed = {}
+        for name, field in self.columns.items():
+            column = _normalize(frame[name]) if name in frame else pd.Series(None, index=frame.index, dtype=object)
+            missing = column.isna()
+            if field.required:
+                for row in frame.index[missing]:
+                    errors[row][name] = [field.error_messages['required']]
+
+            model_field = self.model_field(name)
+            if isinstance(field, serializers.DateField):
+                values = column.map(self.parse_dates(field, column))
+                message = field.error_messages['invalid']
+            elif isinstance(model_field, (models.FloatField, models.IntegerField)):
+                values = pd.to_numeric(column, errors='coerce')
+                if isinstance(model_field, models.IntegerField):
+                    values = values.where(values % 1 == 0)
+                    message = serializers.IntegerField.default_error_messages['invalid']
+                else:
+                    message = serializers.FloatField.default_error_messages['invalid']
+            else:
+                values = column.map(lambda value: value if pd.isna(value) else str(value))
+                message = None
+
+            if message:
+                for row in frame.index[~missing & values.isna()]:
+                    errors[row][name] = [message]
+            parsed[name] = values
+        return pd.DataFrame(parsed, index=frame.index)
+
+    def import_chunk(self, first_row, frame):
+        frame = frame.loc[:, ~frame.columns.duplicated()]
+        frame.columns = [str(column).strip() for column in frame.columns]
+        frame.index = pd.RangeIndex(first_row, first_row + len(frame))
+        # Skip fully blank lines (common at the end of spreadsheets)
+        frame = frame[~frame.apply(_normalize).isna().all(axis=1)]
+        if frame.empty:
+            return
+
+        errors = defaultdict(dict)
+        parsed = self.parse_columns(frame, errors)
+        valid = parsed.loc[~parsed.index.isin(list(errors))].copy()
+
+        if not valid.empty:
+            # Only the user's own facilities: another user's facility reads as missing
+            facilities = set(
+                Facility.objects.filter(user=self.user, facility_id__in=valid['facility_id'].unique().tolist())
+                .values_list('facility_id', flat=True)
+            )
+            for row in valid.index[~valid['facility_id'].isin(facilities)]:
+                errors[row] = {"facility_id": ["The selected facility does not exist."]}
+            valid = valid[valid['facility_id'].isin(facilities)]
+
+        if not valid.empty:
+            valid['year'] = valid['DatePicker'].map(lambda picked: picked.year)
+            valid['month'] = valid['DatePicker'].map(lambda picked: picked.month)
+            # Keys compare against the value that will be stored, i.e. the model default when blank
+            for name in self.key_columns:
+                valid[name] = valid[name].fillna(self.model._meta.get_field(name).get_default())
+            duplicates = self.find_duplicates(self, valid)
+            errors.update(duplicates)
+            valid = valid.drop(index=list(duplicates))
+
+        while not valid.empty:
+            # Rows whose month an entry stored since the duplicate check already holds are reported
+            # and the rest of the chunk is written without them
+            clashes = self.create(valid)
+            if not clashes:
+                self.imported_keys.update(_month_keys(self, valid))
+                break
+            errors.update(clashes)
+            valid = valid.drop(index=list(clashes))
+        self.report['total_rows'] += len(frame)
+        self.report['created'] += len(valid)
+        self.report['failed'] += len(errors)
+        for row in sorted(errors):
+            if len(self.report['errors']) >= MAX_REPORTED_ERRORS:
+                break
+            self.report['errors'].append({"row": row, "errors": errors[row]})
+
+    def create(self, valid):
+        # Writes the rows; returns the errors of the rows whose month a concurrent write took instead
+        instances = []
+        for record in valid.drop(columns=['year', 'month']).to_dict('records'):
+            values = {name: value for name, value in record.items() if not pd.isna(value)}
+            for name, value in values.items():
+                if isinstance(self.model_field(name), models.IntegerField):
+                    values[name] = int(value)
+            instance = self.model(user=self.user, **values)
+            instance.set_derived_fields()
+            instances.append(instance)
+
+        # bulk_create skips save(), so monthly rollups are refreshed for the chunk here
+        try:
+            with transaction.atomic():
+                assign_unique_ids(self.model, instances)
+                self.model.objects.bulk_create(instances, batch_size=500)
+                if issubclass(self.model, RollupMixin):
+                    MetricRollup.objects.refresh(self.model, [instance.rollup_bucket() for instance in instances])
+        except IntegrityError:
+            # An entry of the same month was stored concurrently, after the duplicate check
+            taken = taken_month_keys(self.model, instances) if hasattr(self.model, 'unique_month_fields') else {}
+            if not taken:
+                raise
+            return {
+                row: {"non_field_errors": [self.serializer.duplicate_error(month_key(instance)[3:])]}
+                for row, instance in zip(valid.index, instances) if month_key(instance) in taken
+            }
+        return {}
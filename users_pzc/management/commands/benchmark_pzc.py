@@ -0,0 +1,179 @@
+import json
+import logging
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.test import APIClient
+from users_pzc.fiscal import latest_fiscal_year
+from users_pzc.middleware import QueryCounter
+from users_pzc.models import METRIC_MODELS, CustomUser, Facility
+
+DEFAULT_EMAIL = 'user0001@seed.pzc.local'  # first user created by seed_pzc
+
+
+def get_routes(patterns=None, prefix='/'):
+    """Yields (view name, path) for every users_pzc GET route without path parameters."""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from get_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern) and not pattern.pattern.converters:
+            view = getattr(pattern.callback, 'view_class', None)
+            if view is not None and view.__module__.startswith('users_pzc') and hasattr(view, 'get'):
+                yield view.__name__, route
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every GET endpoint of users_pzc with DRF's test client against the configured database "
+        "(seed it with seed_pzc first) and write p50/p95 latency, query count and peak memory to a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default=DEFAULT_EMAIL, help="User whose data is requested.")
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=1, help="Untimed requests per endpoint first.")
+        parser.add_argument('--filter', help="Only endpoints whose view name contains this text.")
+        parser.add_argument('--output', help="Where to write the JSON report.")
+        parser.add_argument('--compare', help="A previous report to compare against.")
+        parser.add_argument('--threshold', type=float, default=25.0,
+                            help="Percent slowdown of p50 that counts as a regression (default 25).")
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help="Exit with an error when the comparison finds regressions.")
+        parser.add_argument('--cached', action='store_true',
+                            help="Keep the chart response cache on (by default every request is computed).")
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(f"No user {options['email']}; run `manage.py seed_pzc` or pass --email.")
+        facility = Facility.objects.filter(user=user).order_by('facility_id').first()
+        year = latest_fiscal_year(user)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        variants = {'': {}, '?year&facility': {'year': year, 'facility_id': facility.facility_id if facility else ''}}
+        endpoints = {}
+        request_logger = logging.getLogger('users_pzc.requests')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)  # one log line per benchmark request would drown the report
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], PZC_RESPONSE_CACHE=options['cached']):
+                for view_name, path in get_routes():
+                    if options['filter'] and options['filter'].lower() not in view_name.lower():
+                        continue
+                    for suffix, params in variants.items():
+                        endpoints[view_name + suffix] = self.measure(client, path, params, options)
+                        self.stdout.write(self.format_row(view_name + suffix, endpoints[view_name + suffix]))
+        finally:
+            request_logger.setLevel(previous_level)
+
+        report = {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'email': user.email,
+                'year': year,
+                'facility_id': facility.facility_id if facility else None,
+                'rows': {model.__name__: model.objects.filter(user=user).count() for model in METRIC_MODELS},
+                'repeat': options['repeat'],
+                'warmup': options['warmup'],
+                'cached': options['cached'],
+            },
+            'endpoints': endpoints,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                json.dump(report, report_file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as previous_file:
+                previous = json.load(previous_file)['endpoints']
+            if options['filter']:
+                previous = {name: stats for name, stats in previous.items() if options['filter'].lower() in name.lower()}
+            regressions = self.compare(previous, endpoints, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} endpoint(s) regressed: {', '.join(regressions)}")
+
+    def measure(self, client, path, params, options):
+        for _ in range(options['warmup']):
+            client.get(path, params)
+
+        timings = []
+        for _ in range(max(options['repeat'], 1)):
+            # An execute wrapper rather than CaptureQueriesContext: the test client resets queries_log per request
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                started = perf_counter()
+                response = client.get(path, params)
+                timings.append((perf_counter() - started) * 1000)
+
+        # Separate run: tracing allocations slows the request down too much to time it as well
+        tracemalloc.start()
+        try:
+            client.get(path, params)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': queries.count,
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def format_row(self, name, stats):
+        return (
+            f"{name:<50} {stats['status']:>4} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+            f"{stats['queries']:>5} queries  {stats['peak_kb']:>9.1f} KB"
+        )
+
+    def compare(self, previous, current, threshold):
+        """Prints per-endpoint changes and returns the names that got slower or issue more queries."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Compared with the previous report"))
+        regressions = []
+        for name, stats in current.items():
+            before = previous.get(name)
+            if before is None:
+                self.stdout.write(f"{name:<50} new endpoint")
+                continue
+            change = (stats['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0.0
+            # Sub-millisecond differences are noise even when large in percent
+            slower = change > threshold and stats['p50_ms'] - before['p50_ms'] > 1
+            more_queries = stats['queries'] > before['queries']
+            line = (
+                f"{name:<50} p50 {before['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f} ms ({change:+6.1f}%)  "
+                f"queries {before['queries']:>5} -> {stats['queries']:<5}  "
+                f"peak {before['peak_kb']:>9.1f} -> {stats['peak_kb']:.1f} KB"
+            )
+            if slower or more_queries:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            elif change < -threshold or stats['queries'] < before['queries']:
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(line)
+        for name in sorted(previous.keys() - current.keys()):
+            self.stdout.write(f"{name:<50} no longer measured")
+        return regressions
@@ -0,0 +1,60 @@
+from statistics import median
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from users_pzc.models import Waste, Energy, Water, Biodiversity, Logistices
+from users_pzc.serializers import get_month_range
+
+
+class Command(BaseCommand):
+    help = "Print the query plan and timing of the metric access paths used by the views and create serializers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query (median is reported).")
+        parser.add_argument('--models', nargs='+', default=['Waste', 'Energy', 'Water', 'Biodiversity', 'Logistices'])
+
+    def handle(self, *args, **options):
+        models = {model.__name__: model for model in (Waste, Energy, Water, Biodiversity, Logistices)}
+        for name in options['models']:
+            model = models[name]
+            # Probe with the most recent entry so the fiscal year and month actually contain data
+            sample = (
+                model.objects.filter(DatePicker__isnull=False)
+                .order_by('-DatePicker')
+                .values('user_id', 'facility_id', 'DatePicker', 'fiscal_year')
+                .first()
+            )
+            if not sample:
+                self.stdout.write(f"{name}: no data")
+                continue
+
+            picked = sample['DatePicker']
+            queries = {
+                'user + fiscal year': model.objects.filter(
+                    user_id=sample['user_id'], fiscal_year=sample['fiscal_year']
+                ),
+                'facility + fiscal year': model.objects.filter(
+                    user_id=sample['user_id'], facility_id=sample['facility_id'], fiscal_year=sample['fiscal_year']
+                ),
+                'latest entry for user': model.objects.filter(user_id=sample['user_id']).order_by('-DatePicker')[:1],
+            }
+            if hasattr(model, 'unique_month_fields'):
+                # The unique constraint checks a month on write; this lookup only names the clashing
+                # entries afterwards and counts the entries an upsert replaces (taken_month_keys)
+                queries['stored month keys'] = model.objects.filter(
+                    facility_id__in=[sample['facility_id']], fiscal_year__in=[sample['fiscal_year']]
+                )
+            else:
+                queries['facility + month (duplicate check)'] = model.objects.filter(
+                    facility_id=sample['facility_id'], DatePicker__range=get_month_range(picked.year, picked.month)
+                )
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({model.objects.count()} rows)"))
+            for label, queryset in queries.items():
+                timings = []
+                for _ in range(options['repeat']):
+                    started = perf_counter()
+                    list(queryset.values_list('pk', flat=True))
+                    timings.append((perf_counter() - started) * 1000)
+                self.stdout.write(f"  {label}: {median(timings):.2f} ms")
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f"    {line}")
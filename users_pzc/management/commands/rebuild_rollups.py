@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from users_pzc.models import Waste, Energy, Water, Logistices, MetricRollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly MetricRollup rows from the raw Waste/Energy/Water/Logistices entries."
+
+    def handle(self, *args, **options):
+        for model in (Waste, Energy, Water, Logistices):
+            MetricRollup.objects.rebuild(model)
+            count = MetricRollup.objects.filter(category=model.rollup_category).count()
+            self.stdout.write(f"{model.__name__}: {count} rollup rows")
@@ -0,0 +1,166 @@
+import math
+import random
+from calendar import monthrange
+from datetime import date
+from time import perf_counter
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from users_pzc.caching import user_data_changed
+from users_pzc.models import (
+    CustomUser, Facility, Waste, Energy, Water, Biodiversity, Logistices, MetricRollup, RollupMixin, assign_unique_ids
+)
+
+SEED_EMAIL_DOMAIN = 'seed.pzc.local'
+SEED_PASSWORD = 'seed-password'
+SPECIES = ['Neem', 'Banyan', 'Peepal', 'Mango', 'Teak', 'Ashoka', 'Gulmohar', 'Jamun']
+# (logistices_types, Typeof_fuel) as the charts and emission factors expect them
+LOGISTICES_KINDS = [('Cargo', 'diesel'), ('Cargo', 'petrol'), ('Staff', 'diesel'), ('Staff', 'petrol')]
+
+# Typical daily magnitude of each metric field; a monthly entry holds a month of it, scaled per facility and by season
+DAILY_SCALES = {
+    Waste: {
+        'food_waste': 40, 'solid_Waste': 120, 'E_Waste': 3, 'Biomedical_waste': 1.5, 'liquid_discharge': 300,
+        'other_waste': 20, 'Recycle_waste': 60, 'Landfill_waste': 80,
+    },
+    Energy: {
+        'hvac': 900, 'production': 4000, 'stp': 150, 'admin_block': 300, 'utilities': 400, 'others': 100,
+        'coking_coal': 2, 'coke_oven_coal': 1, 'natural_gas': 50, 'diesel': 30, 'biomass_wood': 5,
+        'biomass_other_solid': 3, 'renewable_solar': 600, 'renewable_other': 80,
+    },
+    Water: {
+        'Generated_Water': 50, 'Recycled_Water': 15, 'Softener_usage': 8, 'Boiler_usage': 12, 'otherUsage': 6,
+    },
+    Logistices: {
+        'km_travelled': 400, 'fuel_consumption': 60, 'Spends_on_fuel': 5500,
+    },
+}
+MODELS = {model.__name__: model for model in (Waste, Energy, Water, Biodiversity, Logistices)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic synthetic users, facilities and monthly metric entries for load testing. "
+        f"Seeded users log in as <name>@{SEED_EMAIL_DOMAIN} with password '{SEED_PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--facilities', type=int, default=4, help="Facilities per user.")
+        parser.add_argument('--years', type=int, default=3, help="Fiscal years of data per facility.")
+        parser.add_argument('--start-year', type=int, default=2021, help="First fiscal year (April - March).")
+        parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; the same options always give the same data.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help=f"Delete previously seeded @{SEED_EMAIL_DOMAIN} users first.")
+
+    def handle(self, *args, **options):
+        seeded_users = CustomUser.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+        if seeded_users.exists():
+            if not options['flush']:
+                raise CommandError("Seeded users already exist; pass --flush to replace them.")
+            # Cascades to their facilities, metric entries and rollups
+            deleted, _ = seeded_users.delete()
+            self.stdout.write(f"Removed {deleted} previously seeded objects")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.counts = {}
+        started = perf_counter()
+
+        users, facilities = self.create_owners(options['users'], options['facilities'])
+        for name in options['models']:
+            model = MODELS[name]
+            self.pending = []
+            if model is Biodiversity:
+                rows = self.biodiversity_rows(facilities, options['start_year'], options['years'])
+            else:
+                rows = self.monthly_rows(model, facilities, options['start_year'], options['years'])
+            for row in rows:
+                self.pending.append(row)
+                if len(self.pending) >= self.batch_size:
+                    self.flush(model)
+            self.flush(model)
+
+        for user in users:
+            # bulk_create skips the signals
+            user_data_changed(user.pk)
+
+        self.stdout.write(f"Users: {len(users)}, facilities: {len(facilities)}")
+        for name, count in self.counts.items():
+            self.stdout.write(f"{name}: {count} rows")
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {perf_counter() - started:.1f}s"))
+
+    def create_owners(self, user_count, facilities_per_user):
+        password = make_password(SEED_PASSWORD)  # hashed once; hashing per user would dominate small runs
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f'user{number:04d}@{SEED_EMAIL_DOMAIN}', first_name='Seed', last_name=f'User {number}',
+                       password=password)
+            for number in range(1, user_count + 1)
+        ])
+        # bulk_create only returns primary keys on some backends
+        users = list(CustomUser.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').order_by('email'))
+        facilities = Facility.objects.bulk_create([
+            Facility(
+                user=user, facility_id=f'SEED{user_number:04d}{number:02d}', facility_name=f'Plant {number}',
+                facility_head=f'Head {number}', facility_location=self.rng.choice(['Chennai', 'Pune', 'Delhi', 'Kolkata']),
+                facility_description='Synthetic facility for load testing',
+            )
+            for user_number, user in enumerate(users, start=1) for number in range(1, facilities_per_user + 1)
+        ])
+        return users, facilities
+
+    def measure(self, scale, facility_scale, day):
+        # Seasonal swing (peaks in summer) with +-15% day-to-day noise
+        season = 1 + 0.25 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 80) / 365)
+        return round(scale * facility_scale * season * self.rng.uniform(0.85, 1.15), 2)
+
+    def monthly_rows(self, model, facilities, start_year, years):
+        # One entry per facility and month (and per kind for logistices), as the unique constraints allow
+        scales = DAILY_SCALES[model]
+        kinds = LOGISTICES_KINDS if model is Logistices else [None]
+        for facility in facilities:
+            facility_scale = self.rng.uniform(0.5, 2.0)
+            for offset in range(years * 12):
+                year, month = start_year + (offset + 3) // 12, (offset + 3) % 12 + 1
+                day = date(year, month, 1)
+                days = monthrange(year, month)[1]
+                for kind in kinds:
+                    values = {
+                        field: self.measure(scale * days / len(kinds), facility_scale, day)
+                        for field, scale in scales.items()
+                    }
+                    if kind:
+                        values['logistices_types'], values['Typeof_fuel'] = kind
+                        values['No_Trips'] = self.rng.randint(10, 120)
+                        values['No_Vehicles'] = self.rng.randint(1, 6)
+                    yield model(user_id=facility.user_id, facility=facility, category=model.__name__, DatePicker=day, **values)
+
+    def biodiversity_rows(self, facilities, start_year, years):
+        for facility in facilities:
+            for fiscal_year in range(start_year, start_year + years):
+                for species in self.rng.sample(SPECIES, 3):
+                    yield Biodiversity(
+                        user_id=facility.user_id, facility=facility, category='Biodiversity',
+                        DatePicker=date(fiscal_year, self.rng.randint(4, 12), self.rng.randint(1, 28)),
+                        no_trees=self.rng.randint(20, 500), species=species, age=self.rng.randint(1, 40),
+                        height=round(self.rng.uniform(1, 25), 1), width=round(self.rng.uniform(0.2, 3), 1),
+                        totalArea=round(self.rng.uniform(100, 5000), 1), new_trees_planted=self.rng.randint(0, 50),
+                        head_count=self.rng.randint(5, 60),
+                    )
+
+    def flush(self, model):
+        if not self.pending:
+            return
+        # Sequential ids keep runs repeatable; assign_unique_ids only redraws ones taken by real entries
+        field = f'{model.__name__.lower()}_id'
+        for number, instance in enumerate(self.pending, start=self.counts.get(model.__name__, 0) + 1):
+            setattr(instance, field, '%08X' % number)
+            instance.set_derived_fields()
+        with transaction.atomic():
+            assign_unique_ids(model, self.pending)
+            model.objects.bulk_create(self.pending, batch_size=1000)
+            if issubclass(model, RollupMixin):
+                MetricRollup.objects.refresh(model, [instance.rollup_bucket() for instance in self.pending])
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(self.pending)
+        self.pending = []
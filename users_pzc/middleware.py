@@ -0,0 +1,92 @@
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('users_pzc.requests')
+
+
+class QueryCounter:
+    # connection.execute_wrapper hook: counts every SQL statement and the time spent in the database
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class RequestTimingMiddleware:
+    """Measures each request's SQL queries, DB time, render time and the remaining Python time.
+
+    The numbers go out as a `Server-Timing` header and a per-endpoint log line on `users_pzc.requests`
+    (INFO, or WARNING once PZC_SLOW_REQUEST_MS / PZC_SLOW_REQUEST_QUERIES is exceeded). Work done while
+    a streamed response is consumed (CSV/XLSX exports) happens after the response leaves and isn't counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request._render_duration = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        db_ms = counter.duration * 1000
+        render_ms = request._render_duration * 1000
+        app_ms = max(total_ms - db_ms - render_ms, 0.0)
+        if getattr(settings, 'PZC_SERVER_TIMING', True):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={db_ms:.1f};desc="{counter.count} queries"',
+                f'render;dur={render_ms:.1f}',
+                f'app;dur={app_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ])
+
+        stats = {
+            'endpoint': self.endpoint(request),
+            'method': request.method,
+            'status': response.status_code,
+            'queries': counter.count,
+            'db_ms': round(db_ms, 1),
+            'render_ms': round(render_ms, 1),
+            'app_ms': round(app_ms, 1),
+            'total_ms': round(total_ms, 1),
+        }
+        slow = (
+            total_ms >= getattr(settings, 'PZC_SLOW_REQUEST_MS', 1000)
+            or counter.count >= getattr(settings, 'PZC_SLOW_REQUEST_QUERIES', 100)
+        )
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            '%s %s' % ('slow request' if slow else 'request', ' '.join(f'{key}={value}' for key, value in stats.items())),
+            extra={'request_stats': stats},
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered right after this hook; time the rendering separately from the view
+        request._render_started = time.perf_counter()
+        response.add_post_render_callback(lambda rendered: self.render_finished(request))
+        return response
+
+    def render_finished(self, request):
+        request._render_duration += time.perf_counter() - request._render_started
+
+    def endpoint(self, request):
+        match = request.resolver_match
+        if match is None:
+            return request.path
+        view = getattr(match.func, 'view_class', match.func)
+        return view.__name__
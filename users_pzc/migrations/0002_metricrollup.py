@@ -0,0 +1,74 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+
+ROLLUP_METRICS = {
+    'Waste': ('waste', ['food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'liquid_discharge',
+                        'other_waste', 'Recycle_waste', 'Landfill_waste', 'overall_usage']),
+    'Energy': ('energy', ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others',
+                          'coking_coal', 'coke_oven_coal', 'natural_gas', 'diesel', 'biomass_wood',
+                          'biomass_other_solid', 'renewable_solar', 'renewable_other', 'overall_usage']),
+    'Water': ('water', ['Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage',
+                        'overall_usage']),
+    'Logistices': ('logistices', ['km_travelled', 'No_Trips', 'fuel_consumption', 'No_Vehicles', 'Spends_on_fuel',
+                                  'total_fuelconsumption']),
+}
+
+
+def backfill_rollups(apps, schema_editor):
+    MetricRollup = apps.get_model('users_pzc', 'MetricRollup')
+    for model_name, (category, metrics) in ROLLUP_METRICS.items():
+        model = apps.get_model('users_pzc', model_name)
+        buckets = (
+            model.objects.filter(DatePicker__isnull=False)
+            .values('user_id', 'facility_id', 'DatePicker__year', 'DatePicker__month')
+            .annotate(
+                rollup_entries=Count('pk'),
+                **{metric: Coalesce(Sum(metric), 0.0, output_field=FloatField()) for metric in metrics}
+            )
+            .order_by()
+        )
+        rollups = []
+        for bucket in buckets:
+            year, month = bucket['DatePicker__year'], bucket['DatePicker__month']
+            for metric in metrics:
+                rollups.append(MetricRollup(
+                    user_id=bucket['user_id'], facility_id=bucket['facility_id'], category=category,
+                    fiscal_year=year if month >= 4 else year - 1, month=month,
+                    metric=metric, total=bucket[metric], entries=bucket['rollup_entries'],
+                ))
+        MetricRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_pzc', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('fiscal_year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('metric', models.CharField(max_length=50)),
+                ('total', models.FloatField(default=0.0)),
+                ('entries', models.IntegerField(default=0)),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users_pzc.facility')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'category', 'metric', 'fiscal_year'], name='metric_rollup_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'facility', 'category', 'fiscal_year', 'month', 'metric'), name='unique_metric_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
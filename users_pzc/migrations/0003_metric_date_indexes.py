@@ -0,0 +1,53 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_pzc', '0002_metricrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='biodiversity',
+            index=models.Index(fields=['user', 'DatePicker'], name='biodiversity_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biodiversity',
+            index=models.Index(fields=['facility', 'DatePicker'], name='biodiversity_facility_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='energy',
+            index=models.Index(fields=['user', 'DatePicker'], name='energy_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='energy',
+            index=models.Index(fields=['facility', 'DatePicker'], name='energy_facility_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logistices',
+            index=models.Index(fields=['user', 'DatePicker'], name='logistices_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logistices',
+            index=models.Index(fields=['facility', 'DatePicker'], name='logistices_facility_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waste',
+            index=models.Index(fields=['user', 'DatePicker'], name='waste_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waste',
+            index=models.Index(fields=['facility', 'DatePicker'], name='waste_facility_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='water',
+            index=models.Index(fields=['user', 'DatePicker'], name='water_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='water',
+            index=models.Index(fields=['facility', 'DatePicker'], name='water_facility_date_idx'),
+        ),
+    ]
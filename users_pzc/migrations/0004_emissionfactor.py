@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:46
+
+import datetime
+from django.db import migrations, models
+
+# The factors previously hard-coded in the views, in force from the start of time for every region
+DEFAULT_FACTORS = [
+    ('energy', 'electricity', 0.82),
+    ('energy', 'coking_coal', 2.66),
+    ('energy', 'coke_oven_coal', 3.1),
+    ('energy', 'natural_gas', 2.7),
+    ('energy', 'diesel', 2.91 * 1000),  # Diesel in liters, convert to kg
+    ('energy', 'biomass_wood', 1.75),
+    ('energy', 'biomass_other_solid', 1.16),
+    ('water', 'water', 0.46),
+    ('waste', 'Landfill_waste', 300),
+    ('waste', 'Recycle_waste', 10),
+    ('logistices', 'diesel', 2.91 * 1000),
+    ('logistices', 'petrol', 2.29 * 1000),
+]
+
+
+def seed_factors(apps, schema_editor):
+    EmissionFactor = apps.get_model('users_pzc', 'EmissionFactor')
+    EmissionFactor.objects.bulk_create([
+        EmissionFactor(category=category, source=source, region='', effective_from=datetime.date(1900, 1, 1), factor=factor)
+        for category, source, factor in DEFAULT_FACTORS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_pzc', '0003_metric_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmissionFactor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('energy', 'Energy'), ('water', 'Water'), ('waste', 'Waste'), ('logistices', 'Logistices')], max_length=20)),
+                ('source', models.CharField(max_length=50)),
+                ('region', models.CharField(blank=True, default='', help_text='Facility location the factor applies to (case-insensitive); blank for every location.', max_length=255)),
+                ('effective_from', models.DateField(help_text='Applies to months starting on or after this date.')),
+                ('factor', models.FloatField()),
+            ],
+            options={
+                'ordering': ['category', 'source', 'region', 'effective_from'],
+                'constraints': [models.UniqueConstraint(fields=('category', 'source', 'region', 'effective_from'), name='unique_emission_factor')],
+            },
+        ),
+        migrations.RunPython(seed_factors, migrations.RunPython.noop),
+    ]
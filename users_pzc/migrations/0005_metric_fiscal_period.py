@@ -0,0 +1,123 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:03
+
+from django.db import migrations, models
+from django.db.models import Case, When
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+METRIC_MODELS = ['Waste', 'Energy', 'Water', 'Biodiversity', 'Logistices']
+
+
+def backfill_fiscal_period(apps, schema_editor):
+    # One set-based UPDATE per model; January - March belong to the fiscal year before, April is month 1
+    for model_name in METRIC_MODELS:
+        apps.get_model('users_pzc', model_name).objects.filter(DatePicker__isnull=False).update(
+            fiscal_year=Case(
+                When(DatePicker__month__lt=4, then=ExtractYear('DatePicker') - 1),
+                default=ExtractYear('DatePicker'),
+            ),
+            fiscal_month=Case(
+                When(DatePicker__month__lt=4, then=ExtractMonth('DatePicker') + 9),
+                default=ExtractMonth('DatePicker') - 3,
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_pzc', '0004_emissionfactor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='biodiversity',
+            name='fiscal_month',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='biodiversity',
+            name='fiscal_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='energy',
+            name='fiscal_month',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='energy',
+            name='fiscal_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='logistices',
+            name='fiscal_month',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='logistices',
+            name='fiscal_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='waste',
+            name='fiscal_month',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='waste',
+            name='fiscal_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='water',
+            name='fiscal_month',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='water',
+            name='fiscal_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_fiscal_period, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='biodiversity',
+            index=models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='biodiversity_user_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='biodiversity',
+            index=models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='biodiversity_facility_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='energy',
+            index=models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='energy_user_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='energy',
+            index=models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='energy_facility_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logistices',
+            index=models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='logistices_user_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logistices',
+            index=models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='logistices_facility_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waste',
+            index=models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='waste_user_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waste',
+            index=models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='waste_facility_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='water',
+            index=models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='water_user_fy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='water',
+            index=models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='water_facility_fy_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+MONTH_KEYS = {
+    'Waste': ['facility', 'fiscal_year', 'fiscal_month'],
+    'Energy': ['facility', 'fiscal_year', 'fiscal_month'],
+    'Water': ['facility', 'fiscal_year', 'fiscal_month'],
+    'Logistices': ['facility', 'fiscal_year', 'fiscal_month', 'logistices_types', 'Typeof_fuel'],
+}
+
+
+def check_duplicate_months(apps, schema_editor):
+    # Entries that share a month would make the constraints fail half way; list them instead of
+    # picking which ones to drop
+    found = []
+    for model_name, fields in MONTH_KEYS.items():
+        duplicates = (
+            apps.get_model('users_pzc', model_name).objects.filter(fiscal_year__isnull=False)
+            .values(*fields).annotate(entries=Count('pk')).filter(entries__gt=1).order_by()
+        )
+        found += [f"{model_name} {', '.join(str(row[field]) for field in fields)}" for row in duplicates[:20]]
+    if found:
+        raise RuntimeError(
+            "Merge or delete the metric entries that share a facility and month before migrating:\n"
+            + "\n".join(found)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_pzc', '0005_metric_fiscal_period'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_months, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='energy',
+            constraint=models.UniqueConstraint(fields=('facility', 'fiscal_year', 'fiscal_month'), name='unique_energy_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='logistices',
+            constraint=models.UniqueConstraint(fields=('facility', 'fiscal_year', 'fiscal_month', 'logistices_types', 'Typeof_fuel'), name='unique_logistices_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='waste',
+            constraint=models.UniqueConstraint(fields=('facility', 'fiscal_year', 'fiscal_month'), name='unique_waste_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='water',
+            constraint=models.UniqueConstraint(fields=('facility', 'fiscal_year', 'fiscal_month'), name='unique_water_month'),
+        ),
+        # The unique constraints' indexes start with the same columns
+        migrations.RemoveIndex(
+            model_name='energy',
+            name='energy_facility_fy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='logistices',
+            name='logistices_facility_fy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='waste',
+            name='waste_facility_fy_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='water',
+            name='water_facility_fy_idx',
+        ),
+    ]
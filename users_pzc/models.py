@@ -1,8 +1,14 @@
 # myapp/models.py
 import uuid
-from django.db import models
+from calendar import monthrange
+from datetime import date
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models import Count, FloatField, Q, Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
 from django.utils import timezone 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from .fiscal import fiscal_period
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -69,12 +75,46 @@ class Facility(models.Model):
             self.facility_id = uuid.uuid4().hex[:8].upper()
         super().save(*args, **kwargs)
     
-class Waste(models.Model):
+class RollupMixin:
+    # Keeps MetricRollup in sync with every save()/delete() of a metric row
+    rollup_category = None
+    rollup_metrics = []
+
+    def rollup_bucket(self):
+        if not self.DatePicker:
+            return None
+        return (self.user_id, self.facility_id, self.DatePicker.year, self.DatePicker.month)
+
+    def stored_rollup_bucket(self):
+        if self._state.adding:
+            return None
+        stored = type(self).objects.filter(pk=self.pk).values_list('user_id', 'facility_id', 'DatePicker').first()
+        if not stored or not stored[2]:
+            return None
+        return (stored[0], stored[1], stored[2].year, stored[2].month)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous_bucket = self.stored_rollup_bucket()
+            super().save(*args, **kwargs)
+            MetricRollup.objects.refresh(type(self), [previous_bucket, self.rollup_bucket()])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            bucket = self.stored_rollup_bucket()
+            result = super().delete(*args, **kwargs)
+            MetricRollup.objects.refresh(type(self), [bucket])
+        return result
+
+
+class Waste(RollupMixin, models.Model):
     user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
     waste_id =  models.CharField(max_length=255,primary_key=True, editable=False)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
     category = models.CharField(max_length=255)
     DatePicker = models.DateField(null=True,blank=True)
+    fiscal_year = models.IntegerField(null=True, blank=True, editable=False)
+    fiscal_month = models.IntegerField(null=True, blank=True, editable=False)
     food_waste = models.FloatField(default=0.0)
     solid_Waste = models.FloatField(default=0.0)
     E_Waste = models.FloatField(default=0.0)
@@ -85,24 +125,46 @@ class Waste(models.Model):
     Landfill_waste = models.FloatField(default=0.0)
     overall_usage = models.FloatField(default=0.0, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'DatePicker'], name='waste_user_date_idx'),
+            models.Index(fields=['facility', 'DatePicker'], name='waste_facility_date_idx'),
+            models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='waste_user_fy_idx'),
+        ]
+        constraints = [
+            # One entry per facility and month
+            models.UniqueConstraint(fields=['facility', 'fiscal_year', 'fiscal_month'], name='unique_waste_month'),
+        ]
+
+    rollup_category = 'waste'
+    unique_month_fields = ['facility', 'fiscal_year', 'fiscal_month']
+    rollup_metrics = ['food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'liquid_discharge',
+                      'other_waste', 'Recycle_waste', 'Landfill_waste', 'overall_usage']
+
     def __str__(self):
         return f"Waste data for {self.user.email}"
     
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
+        # Also used by the bulk create path, which bypasses save()
         if not self.waste_id:
             self.waste_id = uuid.uuid4().hex[:8].upper()
+        self.fiscal_year, self.fiscal_month = fiscal_period(self.DatePicker)
         self.overall_usage = (self.food_waste + self.solid_Waste + self.E_Waste +
                               self.Biomedical_waste + self.other_waste)
-        
+
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
         super().save(*args, **kwargs)
 
 
-class Energy(models.Model):
+class Energy(RollupMixin, models.Model):
     user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
     energy_id =  models.CharField(max_length=255, primary_key=True, editable=False)
     category = models.CharField(max_length=255)
     DatePicker = models.DateField(null=True,blank=True)
+    fiscal_year = models.IntegerField(null=True, blank=True, editable=False)
+    fiscal_month = models.IntegerField(null=True, blank=True, editable=False)
     hvac=models.FloatField(default=0.0)
     production = models.FloatField(default=0.0)
     stp = models.FloatField(default=0.0)
@@ -118,34 +180,79 @@ class Energy(models.Model):
     renewable_solar = models.FloatField(default=0.0)
     renewable_other = models.FloatField(default=0.0)
     overall_usage = models.FloatField(default=0.0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'DatePicker'], name='energy_user_date_idx'),
+            models.Index(fields=['facility', 'DatePicker'], name='energy_facility_date_idx'),
+            models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='energy_user_fy_idx'),
+        ]
+        constraints = [
+            # One entry per facility and month
+            models.UniqueConstraint(fields=['facility', 'fiscal_year', 'fiscal_month'], name='unique_energy_month'),
+        ]
+
+    rollup_category = 'energy'
+    unique_month_fields = ['facility', 'fiscal_year', 'fiscal_month']
+    rollup_metrics = ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others',
+                      'coking_coal', 'coke_oven_coal', 'natural_gas', 'diesel', 'biomass_wood',
+                      'biomass_other_solid', 'renewable_solar', 'renewable_other', 'overall_usage']
     
     def __str__(self):
         return f"Energy data for {self.user.email}"
-    def save(self,*args, **kwargs):
+    def set_derived_fields(self):
+        # Also used by the bulk create path, which bypasses save()
         if not self.energy_id:
             self.energy_id = uuid.uuid4().hex[:8].upper()
+        self.fiscal_year, self.fiscal_month = fiscal_period(self.DatePicker)
         self.overall_usage = (self.hvac + self.production + self.stp + self.admin_block + self.utilities + self.others)
+
+    def save(self,*args, **kwargs):
+        self.set_derived_fields()
         super(Energy,self).save(*args, **kwargs)
 
-class Water(models.Model):
+class Water(RollupMixin, models.Model):
     user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
     category = models.CharField(max_length=255)
     water_id =  models.CharField(max_length=20, unique=True, editable=False)
     DatePicker = models.DateField(null=True,blank=True)
+    fiscal_year = models.IntegerField(null=True, blank=True, editable=False)
+    fiscal_month = models.IntegerField(null=True, blank=True, editable=False)
     Generated_Water = models.FloatField(default=0.0)
     Recycled_Water = models.FloatField(default=0.0)
     Softener_usage = models.FloatField(default=0.0)
     Boiler_usage = models.FloatField(default=0.0)
     otherUsage = models.FloatField(default=0.0)
     overall_usage = models.FloatField(default=0.0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'DatePicker'], name='water_user_date_idx'),
+            models.Index(fields=['facility', 'DatePicker'], name='water_facility_date_idx'),
+            models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='water_user_fy_idx'),
+        ]
+        constraints = [
+            # One entry per facility and month
+            models.UniqueConstraint(fields=['facility', 'fiscal_year', 'fiscal_month'], name='unique_water_month'),
+        ]
+
+    rollup_category = 'water'
+    unique_month_fields = ['facility', 'fiscal_year', 'fiscal_month']
+    rollup_metrics = ['Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage',
+                      'overall_usage']
     
     def __str__(self):
         return f"Water data for {self.user.email}"
-    def save(self, *args, **kwargs):
+    def set_derived_fields(self):
+        # Also used by the bulk create path, which bypasses save()
         if not self.water_id:
             self.water_id = uuid.uuid4().hex[:8].upper()
+        self.fiscal_year, self.fiscal_month = fiscal_period(self.DatePicker)
         self.overall_usage = (self.Generated_Water + self.Recycled_Water + self.Softener_usage + self.Boiler_usage + self.otherUsage)
+
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
         super(Water, self).save(*args, **kwargs)
     
 class Biodiversity(models.Model):
@@ -154,6 +261,8 @@ class Biodiversity(models.Model):
     category = models.CharField(max_length=255)
     biodiversity_id =  models.CharField(max_length=20, primary_key=True, editable=False)
     DatePicker = models.DateField(null=True,blank=True)
+    fiscal_year = models.IntegerField(null=True, blank=True, editable=False)
+    fiscal_month = models.IntegerField(null=True, blank=True, editable=False)
     no_trees=models.IntegerField(default=0)
     species = models.CharField(max_length=255)
     age = models.IntegerField(default=0)
@@ -164,18 +273,31 @@ class Biodiversity(models.Model):
     head_count = models.FloatField(default=0.0)
     overall_Trees = models.FloatField(default=0.0, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'DatePicker'], name='biodiversity_user_date_idx'),
+            models.Index(fields=['facility', 'DatePicker'], name='biodiversity_facility_date_idx'),
+            models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='biodiversity_user_fy_idx'),
+            models.Index(fields=['facility', 'fiscal_year', 'fiscal_month'], name='biodiversity_facility_fy_idx'),
+        ]
+
     
     def __str__(self):
         return f"biodiversity data for {self.user.email}"
     
-    def save(self,*args, **kwargs):
+    def set_derived_fields(self):
+        # Also used by the bulk create path, which bypasses save()
         if not self.biodiversity_id:
             self.biodiversity_id = uuid.uuid4().hex[:8].upper()
+        self.fiscal_year, self.fiscal_month = fiscal_period(self.DatePicker)
         self.overall_Trees = (self.no_trees)
+
+    def save(self,*args, **kwargs):
+        self.set_derived_fields()
         super(Biodiversity,self).save(*args, **kwargs)
         
     
-class Logistices(models.Model):
+class Logistices(RollupMixin, models.Model):
     user = models.ForeignKey(CustomUser,on_delete=models.CASCADE)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
     LOGISTICES_TYPE_CHOICES=[
@@ -188,6 +310,8 @@ class Logistices(models.Model):
     ]
     category = models.CharField(max_length=255)
     DatePicker = models.DateField(null=True,blank=True)
+    fiscal_year = models.IntegerField(null=True, blank=True, editable=False)
+    fiscal_month = models.IntegerField(null=True, blank=True, editable=False)
     logistices_id =  models.CharField(max_length=20, primary_key=True, editable=False)
     logistices_types = models.CharField(max_length=255,choices=LOGISTICES_TYPE_CHOICES,default='staff_logistices')
     Typeof_fuel = models.CharField(max_length=255,choices=FUEL_TYPE_CHOICES,default='diesel')
@@ -197,12 +321,230 @@ class Logistices(models.Model):
     No_Vehicles = models.IntegerField(null=True, blank=True)
     Spends_on_fuel = models.FloatField(default=0.0)
     total_fuelconsumption = models.FloatField(default=0.0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'DatePicker'], name='logistices_user_date_idx'),
+            models.Index(fields=['facility', 'DatePicker'], name='logistices_facility_date_idx'),
+            models.Index(fields=['user', 'fiscal_year', 'fiscal_month'], name='logistices_user_fy_idx'),
+        ]
+        constraints = [
+            # One entry per facility, month, logistices type and fuel type
+            models.UniqueConstraint(
+                fields=['facility', 'fiscal_year', 'fiscal_month', 'logistices_types', 'Typeof_fuel'],
+                name='unique_logistices_month',
+            ),
+        ]
+
+    rollup_category = 'logistices'
+    unique_month_fields = ['facility', 'fiscal_year', 'fiscal_month', 'logistices_types', 'Typeof_fuel']
+    rollup_metrics = ['km_travelled', 'No_Trips', 'fuel_consumption', 'No_Vehicles', 'Spends_on_fuel',
+                      'total_fuelconsumption']
+
     def __str__(self):
         return f" data for {self.user.email}"
     
-    def save(self,*args, **kwargs):
+    def set_derived_fields(self):
+        # Also used by the bulk create path, which bypasses save()
         if not self.logistices_id:
             self.logistices_id = uuid.uuid4().hex[:8].upper()
+        self.fiscal_year, self.fiscal_month = fiscal_period(self.DatePicker)
         self.total_fuelconsumption = (self.fuel_consumption)
+
+    def save(self,*args, **kwargs):
+        self.set_derived_fields()
         super(Logistices,self).save(*args, **kwargs)
-    
\ No newline at end of file
+
+
+METRIC_MODELS = [Waste, Energy, Water, Biodiversity, Logistices]
+
+REFRESH_DELETE_CHUNK = 200
+ROLLUP_BUCKET_FIELDS = ['user', 'facility', 'category', 'fiscal_year', 'month', 'metric']
+ID_LOOKUP_CHUNK = 500
+
+
+def assign_unique_ids(model, instances):
+    # The short random ids collide often enough in large bulk inserts, so clashing ones are drawn again
+    field = f'{model.__name__.lower()}_id'
+    ids = [getattr(instance, field) for instance in instances]
+    taken = set()
+    for offset in range(0, len(ids), ID_LOOKUP_CHUNK):
+        taken.update(
+            model.objects.filter(**{f'{field}__in': ids[offset:offset + ID_LOOKUP_CHUNK]}).values_list(field, flat=True)
+        )
+    for instance in instances:
+        while getattr(instance, field) in taken:
+            setattr(instance, field, uuid.uuid4().hex[:8].upper())
+        taken.add(getattr(instance, field))
+
+
+def month_key(instance):
+    # The values the model's one-entry-per-month constraint compares
+    return tuple(getattr(instance, instance._meta.get_field(field).attname) for field in instance.unique_month_fields)
+
+
+def taken_month_keys(model, instances):
+    """Returns {month key: owner's user id} of the stored entries (other than `instances` themselves)
+    that hold the month keys of `instances`.
+
+    Run after the unique constraint rejected a write, to tell which entries clashed, and before an
+    upsert, to find the entries it updates.
+    """
+    attnames = [model._meta.get_field(field).attname for field in model.unique_month_fields]
+    keys = {month_key(instance) for instance in instances}
+    own = {instance.pk for instance in instances if not instance._state.adding}
+    stored = model.objects.filter(
+        facility_id__in={key[0] for key in keys}, fiscal_year__in={key[1] for key in keys}
+    ).values_list('pk', 'user_id', *attnames)
+    return {tuple(key): owner for pk, owner, *key in stored if tuple(key) in keys and pk not in own}
+
+
+def conflict_target(unique_fields):
+    # The unique_fields of a bulk_create(update_conflicts=True): MySQL's ON DUPLICATE KEY UPDATE takes
+    # no conflict target, SQLite and PostgreSQL need one
+    return unique_fields if connection.features.supports_update_conflicts_with_target else None
+
+
+def bulk_upsert(model, instances, batch_size=500):
+    """bulk_create that updates the stored entry of the same facility and month (and kind) instead of failing.
+
+    The stored entry keeps its id and owner; every other column takes the new values.
+    """
+    id_field = f'{model.__name__.lower()}_id'
+    update_fields = [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in (*model.unique_month_fields, 'user', id_field)
+    ]
+    return model.objects.bulk_create(
+        instances, batch_size=batch_size, update_conflicts=True,
+        unique_fields=conflict_target(model.unique_month_fields), update_fields=update_fields
+    )
+
+
+class MetricRollupManager(models.Manager):
+    def refresh(self, model, buckets):
+        # Recomputes the (user, facility, month) buckets touched by a write with one grouped query
+        buckets = set(filter(None, buckets))
+        if not buckets:
+            return
+        first_year, first_month = min((year, month) for _, _, year, month in buckets)
+        last_year, last_month = max((year, month) for _, _, year, month in buckets)
+        rows = (
+            model.objects.filter(
+                facility_id__in={facility_id for _, facility_id, _, _ in buckets},
+                DatePicker__range=(
+                    date(first_year, first_month, 1),
+                    date(last_year, last_month, monthrange(last_year, last_month)[1])
+                )
+            )
+            .values('user_id', 'facility_id', year=ExtractYear('DatePicker'), month=ExtractMonth('DatePicker'))
+            .annotate(
+                rollup_entries=Count('pk'),
+                **{metric: Coalesce(Sum(metric), 0.0, output_field=FloatField()) for metric in model.rollup_metrics}
+            )
+            .order_by()
+        )
+
+        # Upsert rather than delete and re-insert: two writes refreshing the same bucket at once would
+        # both insert it after their deletes and one would fail on unique_metric_rollup_bucket
+        filled = set()
+        rollups = []
+        for row in rows:
+            bucket = (row['user_id'], row['facility_id'], row['year'], row['month'])
+            if bucket not in buckets:
+                continue
+            filled.add(bucket)
+            rollups += [
+                self.model(
+                    user_id=row['user_id'], facility_id=row['facility_id'], category=model.rollup_category,
+                    fiscal_year=fiscal_period(date(row['year'], row['month'], 1))[0], month=row['month'],
+                    metric=metric, total=row[metric], entries=row['rollup_entries']
+                )
+                for metric in model.rollup_metrics
+            ]
+        self.bulk_create(
+            rollups, batch_size=1000, update_conflicts=True, update_fields=['total', 'entries'],
+            unique_fields=conflict_target(ROLLUP_BUCKET_FIELDS),
+        )
+
+        # Buckets whose last entry went away; deleted in chunks so the OR of bucket conditions stays
+        # within the database's expression limits
+        emptied = list(buckets - filled)
+        for offset in range(0, len(emptied), REFRESH_DELETE_CHUNK):
+            stale = Q()
+            for user_id, facility_id, year, month in emptied[offset:offset + REFRESH_DELETE_CHUNK]:
+                fiscal_year = fiscal_period(date(year, month, 1))[0]
+                stale |= Q(user_id=user_id, facility_id=facility_id, fiscal_year=fiscal_year, month=month)
+            self.filter(stale, category=model.rollup_category).delete()
+
+    def rebuild(self, model):
+        # Recomputes every bucket of a model, e.g. after queryset.update() bypassed save()
+        buckets = (
+            model.objects.filter(DatePicker__isnull=False)
+            .values_list('user_id', 'facility_id', 'DatePicker__year', 'DatePicker__month')
+            .distinct()
+        )
+        with transaction.atomic():
+            self.filter(category=model.rollup_category).delete()
+            self.refresh(model, list(buckets))
+
+
+class MetricRollup(models.Model):
+    # Monthly per-facility totals of every metric field, read by the chart endpoints
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
+    category = models.CharField(max_length=20)
+    fiscal_year = models.IntegerField()
+    month = models.IntegerField()
+    metric = models.CharField(max_length=50)
+    total = models.FloatField(default=0.0)
+    entries = models.IntegerField(default=0)
+
+    objects = MetricRollupManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=ROLLUP_BUCKET_FIELDS, name='unique_metric_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'category', 'metric', 'fiscal_year'], name='metric_rollup_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.category}.{self.metric} {self.fiscal_year}/{self.month} for {self.facility_id}"
+
+
+class EmissionFactor(models.Model):
+    # kg CO2e per unit of one emission source; emissions.EMISSION_SOURCES lists the sources of each category
+    CATEGORY_CHOICES = [
+        ('energy', 'Energy'),
+        ('water', 'Water'),
+        ('waste', 'Waste'),
+        ('logistices', 'Logistices'),
+    ]
+
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    source = models.CharField(max_length=50)
+    region = models.CharField(
+        max_length=255, blank=True, default='',
+        help_text="Facility location the factor applies to (case-insensitive); blank for every location."
+    )
+    effective_from = models.DateField(help_text="Applies to months starting on or after this date.")
+    factor = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'source', 'region', 'effective_from'], name='unique_emission_factor',
+            ),
+        ]
+        ordering = ['category', 'source', 'region', 'effective_from']
+
+    def __str__(self):
+        return f"{self.category}.{self.source} {self.region or 'all regions'} from {self.effective_from}: {self.factor}"
+
+    def clean(self):
+        from .emissions import EMISSION_SOURCES  # emissions imports this module
+        if self.source not in EMISSION_SOURCES.get(self.category, {}):
+            raise ValidationError({'source': f"Unknown source for {self.category}; choose one of "
+                                             f"{', '.join(EMISSION_SOURCES.get(self.category, {}))}."})
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+from datetime import date
+from django.db.models import BooleanField, F, FloatField, Func, Sum, Value
+from django.db.models.functions import Coalesce
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    pass
+
+
+class RowLessThan(Func):
+    """`(a, b) < (x, y)` as one row comparison; takes the columns then the values."""
+    output_field = BooleanField()
+    conditional = True
+
+    def as_sql(self, compiler, connection):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        half = len(sqls) // 2
+        return f"({', '.join(sqls[:half])}) < ({', '.join(sqls[half:])})", params
+
+
+def keyset_segments(queryset, after=None, date_field='DatePicker'):
+    """Returns ([querysets], pk name): the rows newest first, undated ones last, from after (last_date, last_pk) on.
+
+    Dated and undated rows are walked separately, each in index order with the primary key as
+    tie-breaker: ordering by the nullable date with NULLs last, or OR-ing the undated rows into the
+    cursor condition, would make MySQL sort every page instead of scanning the (..., DatePicker, pk) index.
+    """
+    pk = queryset.model._meta.pk.attname
+    last_date, last_pk = after or (None, None)
+    if date_field is None:
+        ordered = queryset.order_by(pk)
+        return [ordered if after is None else ordered.filter(**{f'{pk}__gt': last_pk})], pk
+
+    undated = queryset.filter(**{f'{date_field}__isnull': True}).order_by(f'-{pk}')
+    if after is not None and last_date is None:
+        return [undated.filter(**{f'{pk}__lt': last_pk})], pk
+    dated = queryset.filter(**{f'{date_field}__isnull': False}).order_by(f'-{date_field}', f'-{pk}')
+    if after is not None:
+        # The plain bound gives the optimizer its index range; the row comparison is the exact cursor
+        dated = dated.filter(
+            RowLessThan(F(date_field), F(pk), Value(last_date), Value(last_pk)), **{f'{date_field}__lte': last_date}
+        )
+    return [dated, undated], pk
+
+
+def keyset_rows(segments, limit, values=None):
+    # Up to `limit` rows of keyset_segments, as instances or `values` tuples; the next segment is only
+    # queried when the current one runs out
+    rows = []
+    for segment in segments:
+        if values is not None:
+            segment = segment.values_list(*values)
+        rows += segment[:limit - len(rows)]
+        if len(rows) == limit:
+            break
+    return rows
+
+
+def column_totals(queryset, fields):
+    # One aggregate query over every matching row (not just the current page)
+    totals = queryset.order_by().aggregate(
+        **{field: Coalesce(Sum(field), 0.0, output_field=FloatField()) for field in fields}
+    )
+    return {field: totals[field] for field in fields}
+
+
+class KeysetPagination:
+    """Opt-in cursor pagination for the list views, enabled by `?page_size=` and/or `?cursor=`.
+
+    Pages follow keyset_segments, so each one is an index range scan instead of an OFFSET and rows added
+    between requests never shift a page. `next_cursor` is null on the last page.
+    """
+
+    def __init__(self, request, date_field='DatePicker'):
+        self.date_field = date_field
+        self.enabled = 'page_size' in request.GET or 'cursor' in request.GET
+        self.page_size = self.parse_page_size(request.GET.get('page_size'))
+        cursor = request.GET.get('cursor')
+        self.after = self.decode_cursor(cursor) if cursor else None
+        self.next_cursor = None
+
+    def parse_page_size(self, value):
+        if value in (None, ''):
+            return DEFAULT_PAGE_SIZE
+        try:
+            page_size = int(value)
+        except ValueError:
+            page_size = 0
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise PaginationError(f"page_size must be a whole number between 1 and {MAX_PAGE_SIZE}.")
+        return page_size
+
+    def encode_cursor(self, instance, pk):
+        key = [getattr(instance, pk)]
+        if self.date_field is not None:
+            last_date = getattr(instance, self.date_field)
+            key.insert(0, last_date.isoformat() if last_date else None)
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if self.date_field is None:
+                last_date, (last_pk,) = None, key
+            else:
+                last_date, last_pk = key
+                last_date = date.fromisoformat(last_date) if last_date is not None else None
+        except (binascii.Error, TypeError, ValueError):
+            raise PaginationError("Invalid cursor.")
+        # The key values become query parameters, so only scalars can have come from encode_cursor
+        if isinstance(last_pk, bool) or not isinstance(last_pk, (str, int)):
+            raise PaginationError("Invalid cursor.")
+        return last_date, last_pk
+
+    def paginate(self, queryset):
+        segments, pk = keyset_segments(queryset, self.after, self.date_field)
+        # One extra row tells whether another page follows
+        page = keyset_rows(segments, self.page_size + 1)
+        if len(page) > self.page_size:
+            page = page[:self.page_size]
+            self.next_cursor = self.encode_cursor(page[-1], pk)
+        return page
+
+    def page_info(self):
+        return {"page_size": self.page_size, "next_cursor": self.next_cursor}
@@ -1,13 +1,17 @@
 
 from datetime import datetime,date
+from calendar import monthrange
 import re
 from venv import logger
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import gettext as _
-from .models import CustomUser,Waste,Energy,Water,Biodiversity,Facility,Logistices,Org_registration
+from .models import CustomUser,Waste,Energy,Water,Biodiversity,Facility,Logistices,Org_registration,MetricRollup,assign_unique_ids,bulk_upsert,month_key,taken_month_keys
+from .fiscal import fiscal_period
+from .caching import user_data_changed
 import logging
 
 #Registration Serializers starts
@@ -168,13 +172,147 @@ class FacilitySerializer(serializers.ModelSerializer):
         return facility
 #Facility Serializers ENds
 #Waste Serializers Starts
+def _month_key(model, attrs):
+    # The month key an entry will be stored under, before the instance exists
+    fiscal_year, fiscal_month = fiscal_period(attrs['DatePicker'])
+    kinds = [attrs[field] for field in model.unique_month_fields if field not in ('facility', 'fiscal_year', 'fiscal_month')]
+    return (attrs['facility_id'], fiscal_year, fiscal_month, *kinds)
+
+
+class MonthlyEntrySerializerMixin:
+    """Saves single monthly entries against the model's one-entry-per-month unique constraint.
+
+    No lookup runs before the write: when the constraint rejects it, one query confirms the clash,
+    which is then reported with the message the lookup used to give.
+    """
+
+    def duplicate_error(self, kinds=(), updating=False):
+        # `kinds` are the clashing month key's values besides facility and month (see unique_month_fields)
+        return self.duplicate_update_error if updating else self.duplicate_month_error
+
+    def save_entry(self, instance, updating=False):
+        try:
+            with transaction.atomic():
+                instance.save()
+        except IntegrityError:
+            key = month_key(instance)
+            if key not in taken_month_keys(type(instance), [instance]):
+                raise
+            raise serializers.ValidationError({"non_field_errors": [self.duplicate_error(key[3:], updating)]})
+        return instance
+
+    def create(self, validated_data):
+        validated_data.pop('facility_id', None)
+        validated_data.setdefault('user', self.context['request'].user)
+        return self.save_entry(self.Meta.model(**validated_data))
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        return self.save_entry(instance, updating=True)
+
+
+class BulkMetricCreateListSerializer(serializers.ListSerializer):
+    """Creates a list of monthly metric entries (Waste, Energy, Water, Logistices) in one transaction.
+
+    Facilities are resolved with one query and entries of the upload that share a month are rejected
+    here; clashes with stored entries are left to the model's unique constraint. With
+    `context['upsert']` the stored entry of the month is updated instead, and `updated` counts them.
+    """
+
+    def run_child_validation(self, data):
+        # Remember every row's outcome so the batch checks can report alongside field errors
+        try:
+            validated = super().run_child_validation(data)
+        except serializers.ValidationError:
+            self._child_results.append(None)
+            raise
+        self._child_results.append(validated)
+        return validated
+
+    def to_internal_value(self, data):
+        self._child_results = []
+        try:
+            validated = super().to_internal_value(data)
+            errors = [{} for attrs in validated]
+        except serializers.ValidationError as exc:
+            if not self._child_results:
+                raise
+            validated, errors = None, exc.detail
+
+        rows = [(index, attrs) for index, attrs in enumerate(self._child_results) if attrs is not None]
+        model = self.child.Meta.model
+        # Only the user's own facilities: another user's facility reads as missing
+        facilities = Facility.objects.filter(user=self.context['request'].user).in_bulk(
+            {attrs['facility_id'] for _, attrs in rows}
+        )
+        seen = set()
+        for index, attrs in rows:
+            # Keys compare against the value that will be stored, i.e. the model default when omitted
+            for field in model.unique_month_fields:
+                if field not in ('facility', 'fiscal_year', 'fiscal_month'):
+                    attrs.setdefault(field, model._meta.get_field(field).get_default())
+            facility = facilities.get(attrs['facility_id'])
+            if facility is None:
+                errors[index] = {"facility_id": ["The selected facility does not exist."]}
+            elif _month_key(model, attrs) in seen:
+                errors[index] = {"non_field_errors": [self.child.duplicate_error(_month_key(model, attrs)[3:])]}
+            else:
+                seen.add(_month_key(model, attrs))
+                attrs['facility'] = facility
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        user = self.context['request'].user
+        instances = []
+        for attrs in validated_data:
+            attrs.pop('facility_id', None)
+            attrs.pop('user', None)  # save(user=...) passes it to every entry
+            instance = model(user=user, **attrs)
+            instance.set_derived_fields()
+            instances.append(instance)
+
+        # bulk_create skips save() and post_save, so rollups and the per-user caches are refreshed here
+        owners = {}
+        try:
+            with transaction.atomic():
+                assign_unique_ids(model, instances)
+                if self.context.get('upsert'):
+                    # Looked up before the write: the entries an upsert replaces keep their owner, whose
+                    # rollups and caches are the ones to refresh
+                    owners = taken_month_keys(model, instances)
+                    self.updated = len(owners)
+                    bulk_upsert(model, instances)
+                    for instance in instances:
+                        instance.user_id = owners.get(month_key(instance), instance.user_id)
+                else:
+                    model.objects.bulk_create(instances, batch_size=500)
+                MetricRollup.objects.refresh(model, [instance.rollup_bucket() for instance in instances])
+        except IntegrityError:
+            taken = taken_month_keys(model, instances)
+            if not taken:
+                raise
+            raise serializers.ValidationError([
+                {"non_field_errors": [self.child.duplicate_error(month_key(instance)[3:])]}
+                if month_key(instance) in taken else {}
+                for instance in instances
+            ])
+        for owner_id in {user.pk, *owners.values()}:
+            user_data_changed(owner_id)
+        return instances
+
+
 class WasteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Waste
         fields = ['user_id','facility_id','category', 'DatePicker', 'food_waste', 'solid_Waste', 
                   'E_Waste', 'Biomedical_waste', 'liquid_discharge', 
                   'other_waste', 'Recycle_waste','Landfill_waste','waste_id']
-class WasteCreateSerializer(serializers.ModelSerializer):
+class WasteCreateSerializer(MonthlyEntrySerializerMixin, serializers.ModelSerializer):
     facility_id = serializers.CharField(
         write_only=True, required=True,
         error_messages={
@@ -224,55 +362,31 @@ class WasteCreateSerializer(serializers.ModelSerializer):
             'facility': {'read_only': True},
             'waste_id': {'read_only': True}
         }
+        list_serializer_class = BulkMetricCreateListSerializer
+
+    duplicate_month_error = _("A Waste entry for this facility already exists for this month.")
+    duplicate_update_error = _("A different Waste entry for this facility already exists for this month.")
 
     def validate(self, data):
         facility_id = data.get('facility_id')
-        date = data.get('DatePicker')
         
         if not facility_id:
             raise serializers.ValidationError({"facility_id": "Facility ID is required."})
 
-        # Ensure the facility exists
+        if isinstance(self.parent, BulkMetricCreateListSerializer):
+            # Facility and month checks run once for the whole list
+            return data
+
+        # Ensure the facility exists and belongs to the user
         try:
-            facility = Facility.objects.get(facility_id=facility_id)
+            facility = Facility.objects.get(facility_id=facility_id, user=self.context['request'].user)
             data['facility'] = facility  # Set facility object on validated data
         except Facility.DoesNotExist:
             raise serializers.ValidationError({"facility_id": "The selected facility does not exist."})
 
-        # Extract the month and year from the provided date
-        month = date.month
-        year = date.year
-
-        if self.instance is None:
-            if Waste.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("A Waste entry for this facility already exists for this month.")
-                })
-        else:
-            existing_entry = Waste.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exclude(waste_id=self.instance.waste_id)  
-
-            if existing_entry.exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("A different Waste entry for this facility already exists for this month.")
-                })
-
+        # One entry per facility and month is enforced by the unique constraint when saving
         return data
 
-    def create(self, validated_data):
-        # Set the user from context
-        user = self.context['request'].user
-        validated_data['user'] = user
-        validated_data.pop('facility_id', None)
-        return Waste.objects.create(**validated_data)
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         representation['facility_id'] = instance.facility.facility_id
@@ -289,7 +403,7 @@ class EnergySerializer(serializers.ModelSerializer):
             'renewable_solar', 'renewable_other', 'overall_usage', 'energy_id'
         ]
 
-class EnergyCreateSerializer(serializers.ModelSerializer):
+class EnergyCreateSerializer(MonthlyEntrySerializerMixin, serializers.ModelSerializer):
     facility_id = serializers.CharField(
         write_only=True, required=True,
         error_messages={
@@ -357,46 +471,29 @@ class EnergyCreateSerializer(serializers.ModelSerializer):
             'facility': {'read_only': True},
             'energy_id': {'read_only': True}
         }
+        list_serializer_class = BulkMetricCreateListSerializer
+
+    duplicate_month_error = _("An Energy entry for this facility already exists for this month.")
+    duplicate_update_error = _("A different Energy entry for this facility already exists for this month.")
 
     def validate(self, data):
         facility_id = data.get('facility_id')
-        date = data.get('DatePicker')
 
         # Ensure the facility exists
         if not facility_id:
             raise serializers.ValidationError({"facility_id": "Facility ID is required."})
 
+        if isinstance(self.parent, BulkMetricCreateListSerializer):
+            # Facility and month checks run once for the whole list
+            return data
+
         try:
-            facility = Facility.objects.get(facility_id=facility_id)
+            facility = Facility.objects.get(facility_id=facility_id, user=self.context['request'].user)
             data['facility'] = facility  # Set facility object on validated data
         except Facility.DoesNotExist:
             raise serializers.ValidationError({"facility_id": "The selected facility does not exist."})
 
-        # Extract the month and year from the provided date
-        month = date.month
-        year = date.year
-
-        # Check if there is an existing entry for this facility and month
-        if self.instance is None:  # New entry (POST)
-            if Energy.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("An Energy entry for this facility already exists for this month.")
-                })
-        else:  # Update (PUT)
-            existing_entry = Energy.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exclude(energy_id=self.instance.energy_id)  # Exclude the current instance being updated
-
-            if existing_entry.exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("A different Energy entry for this facility already exists for this month.")
-                })
+        # One entry per facility and month is enforced by the unique constraint when saving
 
         # Validate required fields (ensure they are numeric)
         # energy_fields = [
@@ -430,12 +527,6 @@ class EnergyCreateSerializer(serializers.ModelSerializer):
     #     except ValueError:
     #         return False
 
-    def create(self, validated_data):
-        user = self.context['request'].user
-        validated_data['user'] = user
-        validated_data.pop('facility_id', None)
-        return Energy.objects.create(**validated_data)
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         representation['facility_id'] = instance.facility.facility_id
@@ -450,7 +541,7 @@ class WaterSerializer(serializers.ModelSerializer):
         fields = ['facility_id','DatePicker','category','Generated_Water', 'Recycled_Water', 'Softener_usage', 
                   'Boiler_usage', 'otherUsage', 'water_id']
 
-class WaterCreateSerializer(serializers.ModelSerializer):
+class WaterCreateSerializer(MonthlyEntrySerializerMixin, serializers.ModelSerializer):
     facility_id = serializers.CharField(
         write_only=True, required=True,
         error_messages={
@@ -497,43 +588,28 @@ class WaterCreateSerializer(serializers.ModelSerializer):
             'facility': {'read_only': True},
             'water_id': {'read_only': True}
         }
+        list_serializer_class = BulkMetricCreateListSerializer
+
+    duplicate_month_error = _("A Water entry for this facility already exists for this month.")
+    duplicate_update_error = _("A different Water entry for this facility already exists for this month.")
 
     def validate(self, data):
         facility_id = data.get('facility_id')
-        date = data.get('DatePicker')
         
         if not facility_id:
             raise serializers.ValidationError({"facility_id": "Facility ID is required."})
 
+        if isinstance(self.parent, BulkMetricCreateListSerializer):
+            # Facility and month checks run once for the whole list
+            return data
+
         try:
-            facility = Facility.objects.get(facility_id=facility_id)
+            facility = Facility.objects.get(facility_id=facility_id, user=self.context['request'].user)
             data['facility'] = facility
         except Facility.DoesNotExist:
             raise serializers.ValidationError({"facility_id": "The selected facility does not exist."})
 
-        month = date.month
-        year = date.year
-
-        if self.instance is None:
-            if Water.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("A Water entry for this facility already exists for this month.")
-                })
-        else:
-            existing_entry = Water.objects.filter(
-                facility=facility,
-                DatePicker__year=year,
-                DatePicker__month=month
-            ).exclude(water_id=self.instance.water_id)
-
-            if existing_entry.exists():
-                raise serializers.ValidationError({
-                    "non_field_errors": _("A different Water entry for this facility already exists for this month.")
-                })
+        # One entry per facility and month is enforced by the unique constraint when saving
 
         # Validate positive values for all water fields
         # water_fields = [
@@ -548,14 +624,6 @@ class WaterCreateSerializer(serializers.ModelSerializer):
 
         return data
 
-    def create(self, validated_data):
-        user = self.context['request'].user
-        validated_data['user'] = user
-        validated_data.pop('facility_id', None)
-
-        water = Water.objects.create(**validated_data)
-        return water
-
 #Water Serializers Ends
 #Biodiversity Serializers Starts
 class BiodiversitySerializer(serializers.ModelSerializer):
@@ -566,14 +634,12 @@ class BiodiversitySerializer(serializers.ModelSerializer):
 
 def get_fiscal_year_range(year, month):
     """Returns the start and end date of the fiscal year for a given date."""
-    if month >= 4:  # If the month is April or later, the fiscal year starts in that year
-        fiscal_start = date(year, 4, 1)
-        fiscal_end = date(year + 1, 3, 31)
-    else:  # If the month is January, February, or March, the fiscal year started the previous year
-        fiscal_start = date(year - 1, 4, 1)
-        fiscal_end = date(year, 3, 31)
-    
-    return fiscal_start, fiscal_end
+    fiscal_year = fiscal_period(date(year, month, 1))[0]
+    return date(fiscal_year, 4, 1), date(fiscal_year + 1, 3, 31)
+
+def get_month_range(year, month):
+    """Returns the first and last date of a calendar month."""
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
 
 class BiodiversityCreateSerializer(serializers.ModelSerializer):
     facility_id = serializers.CharField(
@@ -610,6 +676,9 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
             'biodiversity_id': {'read_only': True}
         }
 
+    duplicate_species_error = _("The species already exists for this facility in the selected fiscal year.")
+    duplicate_month_error = _("A Biodiversity entry for this facility and species already exists for this month.")
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -619,7 +688,7 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
         species = data.get('species')
 
         try:
-            facility = Facility.objects.get(facility_id=facility_id)
+            facility = Facility.objects.get(facility_id=facility_id, user=self.context['request'].user)
             data['facility'] = facility
         except Facility.DoesNotExist:
             raise serializers.ValidationError({"facility_id": "The selected facility does not exist."})
@@ -629,13 +698,10 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
 
         # Ensure no duplicate species in the fiscal year (April to March)
         if species:
-            fiscal_start, fiscal_end = get_fiscal_year_range(year, month)
-
             # Check if the species already exists in the fiscal year for this facility
             existing_species = Biodiversity.objects.filter(
                 facility=facility,
-                DatePicker__gte=fiscal_start,
-                DatePicker__lte=fiscal_end,
+                fiscal_year=fiscal_period(date)[0],
                 species=species
             )
 
@@ -645,14 +711,13 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
 
             if existing_species.exists():
                 raise serializers.ValidationError({
-                    'species': _("The species already exists for this facility in the selected fiscal year.")
+                    'species': self.duplicate_species_error
                 })
 
         # Ensure no duplicate entries for the same facility, month, and species
         existing_entry = Biodiversity.objects.filter(
             facility=facility,
-            DatePicker__year=year,
-            DatePicker__month=month,
+            DatePicker__range=get_month_range(year, month),
             species=species
         )
 
@@ -662,7 +727,7 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
 
         if existing_entry.exists():
             raise serializers.ValidationError({
-                "non_field_errors": _("A Biodiversity entry for this facility and species already exists for this month.")
+                "non_field_errors": self.duplicate_month_error
             })
 
         return data
@@ -690,7 +755,7 @@ class BiodiversityCreateSerializer(serializers.ModelSerializer):
 #Biodiversity Serializers Ends
 #Logistices Serializer Starts
 
-class LogisticesSerializer(serializers.ModelSerializer):
+class LogisticesSerializer(MonthlyEntrySerializerMixin, serializers.ModelSerializer):
     facility_id = serializers.CharField(
         write_only=True,
         required=True,
@@ -757,47 +822,34 @@ class LogisticesSerializer(serializers.ModelSerializer):
             'facility': {'read_only': True},
             'logistices_id': {'read_only': True}
         }
+        list_serializer_class = BulkMetricCreateListSerializer
 
     logger = logging.getLogger(__name__)
 
-    
+    def duplicate_error(self, kinds=(), updating=False):
+        # Names the clashing types, with the same text for creates and updates
+        logistices_types, Typeof_fuel = kinds
+        return (
+            f"An entry for logistices type '{logistices_types}' and fuel type '{Typeof_fuel}' "
+            f"already exists for the same facility in the given month and year."
+        )
+
     def validate(self, data):
         facility_id = data.get('facility_id')
-        date = data.get('DatePicker')
-        logistices_types = data.get('logistices_types')
-        Typeof_fuel = data.get('Typeof_fuel')
 
-        # Verify if the facility exists
+        if isinstance(self.parent, BulkMetricCreateListSerializer):
+            # Facility and month checks run once for the whole list
+            return data
+
+        # Verify if the facility exists and belongs to the user
         try:
-            facility = Facility.objects.get(facility_id=facility_id)
+            facility = Facility.objects.get(facility_id=facility_id, user=self.context['request'].user)
             data['facility'] = facility
         except Facility.DoesNotExist:
             raise serializers.ValidationError({"facility_id": "The selected facility does not exist."})
 
-        month = date.month
-        year = date.year
-
-        # Check if an entry already exists for the same logistices_types and Typeof_fuel
-        existing_entry = Logistices.objects.filter(
-            facility=facility,
-            DatePicker__year=year,
-            DatePicker__month=month,
-            logistices_types=logistices_types,
-            Typeof_fuel=Typeof_fuel
-        )
-
-        if self.instance:
-            # Exclude the current instance in the check (update operation)
-            existing_entry = existing_entry.exclude(logistices_id=self.instance.logistices_id)
-
-        if existing_entry.exists():
-            raise serializers.ValidationError({
-                "non_field_errors": (
-                    f"An entry for logistices type '{logistices_types}' and fuel type '{Typeof_fuel}' "
-                    f"already exists for the same facility in the given month and year."
-                )
-            })
-
+        # One entry per facility, month, logistices type and fuel type is enforced by the unique
+        # constraint when saving
         return data
 
 #Logistices Serializer Ends
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from .caching import bump_data_version, user_data_changed
+from .emissions import invalidate_emission_factors
+from .models import METRIC_MODELS, EmissionFactor, Facility, Org_registration
+
+
+def metric_data_changed(sender, instance, **kwargs):
+    user_data_changed(instance.user_id)
+
+
+def emission_factors_changed(sender, instance, **kwargs):
+    invalidate_emission_factors()
+    # Emissions of every user change, so all cached chart responses go stale
+    bump_data_version('emission_factors')
+
+
+def connect_signals():
+    # Org_registration only feeds OrganizationView, but its ETag relies on the same version
+    for model in [*METRIC_MODELS, Facility, Org_registration]:
+        post_save.connect(metric_data_changed, sender=model, dispatch_uid=f'metric_data_changed_save_{model.__name__}')
+        post_delete.connect(metric_data_changed, sender=model, dispatch_uid=f'metric_data_changed_delete_{model.__name__}')
+    post_save.connect(emission_factors_changed, sender=EmissionFactor, dispatch_uid='emission_factors_changed_save')
+    post_delete.connect(emission_factors_changed, sender=EmissionFactor, dispatch_uid='emission_factors_changed_delete')
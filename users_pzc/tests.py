@@ -1,3 +1,821 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+from datetime import date, datetime
+from importlib import import_module
+from io import BytesIO
+from unittest import mock
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from openpyxl import Workbook, load_workbook
+from rest_framework.test import APIClient
+from .checks import check_response_cache_backend
+from .dashboard import DASHBOARD_CHARTS
+from .fiscal import calendar_month, fiscal_period
+from .exports import export_columns, export_rows
+from .imports import IMPORT_CATEGORIES, MetricImporter
+from .models import (
+    Biodiversity, CustomUser, EmissionFactor, Energy, Facility, Logistices, MetricRollup, Water, Waste
+)
+from .serializers import WasteCreateSerializer
 
-# Create your tests here.
+
+class MetricTestCase(TestCase):
+    """Two users with a facility each; requests are made as `self.user`."""
+
+    def setUp(self):
+        # Facility lists, fiscal years and response versions live in the cache
+        cache.clear()
+        self.user = CustomUser.objects.create_user('owner@example.com', 'password')
+        self.other_user = CustomUser.objects.create_user('other@example.com', 'password')
+        self.facility = self.create_facility(self.user, 'FAC1')
+        self.other_facility = self.create_facility(self.other_user, 'FAC2')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_facility(self, user, facility_id, location='Chennai'):
+        return Facility.objects.create(
+            user=user, facility_id=facility_id, facility_name=f'Plant {facility_id}', facility_head='Head',
+            facility_location=location, facility_description='Test facility',
+        )
+
+    def waste(self, picked, facility_id='FAC1', **values):
+        return {'facility_id': facility_id, 'category': 'Waste', 'DatePicker': picked, **values}
+
+    def csv_upload(self, *lines, header='facility_id,category,DatePicker,food_waste'):
+        return SimpleUploadedFile('waste.csv', '\n'.join([header, *lines]).encode())
+
+    def rollup_total(self, category, metric, user=None, facility_id='FAC1', month=6):
+        return MetricRollup.objects.filter(
+            user=user or self.user, facility_id=facility_id, category=category, metric=metric, month=month
+        ).values_list('total', flat=True).first()
+
+    def etag(self, path='/api/WasteViewCard_Over/?year=2023'):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertRevalidated(self, path, etag):
+        # The data changed, so the stored ETag no longer matches
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BulkCreateTests(MetricTestCase):
+    def test_list_creates_every_entry_with_derived_fields_and_rollups(self):
+        response = self.client.post('/api/add_waste/', [
+            self.waste('2023-06-05', food_waste=2, solid_Waste=3),
+            self.waste('2023-07-05', food_waste=4),
+            self.waste('2024-02-05', food_waste=1),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        entries = Waste.objects.filter(user=self.user).order_by('DatePicker')
+        self.assertEqual(
+            [(entry.fiscal_year, entry.fiscal_month, entry.overall_usage) for entry in entries],
+            [(2023, 3, 5.0), (2023, 4, 4.0), (2023, 11, 1.0)],
+        )
+        self.assertEqual(len({entry.waste_id for entry in entries}), 3)
+        self.assertEqual(self.rollup_total('waste', 'overall_usage'), 5.0)
+        self.assertEqual(self.rollup_total('waste', 'food_waste', month=2), 1.0)
+
+    def test_invalid_row_rejects_the_whole_list(self):
+        response = self.client.post('/api/add_energy/', [
+            {'facility_id': 'FAC1', 'category': 'Energy', 'DatePicker': '2023-06-05', 'hvac': 1},
+            {'facility_id': 'FAC1', 'category': 'Energy', 'DatePicker': 'June'},
+            {'facility_id': 'MISSING', 'category': 'Energy', 'DatePicker': '2023-08-05'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('DatePicker', response.data[1])
+        self.assertEqual(response.data[2], {'facility_id': ['The selected facility does not exist.']})
+        self.assertFalse(Energy.objects.exists())
+        self.assertFalse(MetricRollup.objects.exists())
+
+    def test_list_invalidates_cached_charts(self):
+        path = '/api/WasteViewCard_Over/?year=2023'
+        self.client.post('/api/add_waste/', [self.waste('2023-06-05', food_waste=2)], format='json')
+        etag = self.etag(path)
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post('/api/add_waste/', [self.waste('2023-07-05', food_waste=3)], format='json')
+
+        self.assertRevalidated(path, etag)
+        self.assertEqual(self.client.get(path).data['overall_waste_totals']['overall_food_waste'], 5.0)
+
+
+class ImportTests(MetricTestCase):
+    def import_waste(self, upload):
+        return self.client.post('/api/import_data/waste/', {'file': upload}, format='multipart')
+
+    def test_valid_rows_are_created_and_invalid_ones_reported_by_row_number(self):
+        response = self.import_waste(self.csv_upload(
+            'FAC1,Waste,2023-06-05,2',
+            'FAC1,,2023-07-05,1',
+            'FAC1,Waste,05/08/2023,1',
+            'FAC1,Waste,2023-09-05,a lot',
+            ',,,',
+            'FAC2,Waste,2023-10-05,1',
+        ))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['total_rows'], response.data['created'], response.data['failed']), (5, 1, 4))
+        self.assertEqual({error['row']: error['errors'] for error in response.data['errors']}, {
+            3: {'category': ['Category is required.']},
+            4: {'DatePicker': ['Invalid date format. Please use YYYY-MM-DD.']},
+            5: {'food_waste': ['A valid number is required.']},
+            7: {'facility_id': ['The selected facility does not exist.']},
+        })
+        entry = Waste.objects.get()
+        self.assertEqual((entry.user, entry.DatePicker, entry.overall_usage), (self.user, date(2023, 6, 5), 2.0))
+        self.assertEqual(self.rollup_total('waste', 'food_waste'), 2.0)
+
+    def test_rows_for_a_stored_or_repeated_month_are_duplicates(self):
+        Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1))
+
+        response = self.import_waste(self.csv_upload(
+            'FAC1,Waste,2023-06-20,1',
+            'FAC1,Waste,2023-08-01,1',
+            'FAC1,Waste,2023-08-15,1',
+        ))
+
+        duplicate = {'non_field_errors': ['A Waste entry for this facility already exists for this month.']}
+        self.assertEqual(response.data['errors'], [{'row': 2, 'errors': duplicate}, {'row': 4, 'errors': duplicate}])
+        self.assertEqual(Waste.objects.count(), 2)
+
+    def test_chunks_are_checked_against_the_rows_of_earlier_chunks(self):
+        report = MetricImporter('waste', self.user, chunk_size=2).run(self.csv_upload(
+            'FAC1,Waste,2023-06-05,1',
+            'FAC1,Waste,2023-07-05,2',
+            'FAC1,Waste,2023-07-20,4',
+            'FAC1,Waste,2023-08-05,8',
+            'FAC1,Waste,,16',
+        ))
+
+        self.assertEqual((report['total_rows'], report['created'], report['failed']), (5, 3, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [4, 6])
+        self.assertEqual(sorted(Waste.objects.values_list('food_waste', flat=True)), [1.0, 2.0, 8.0])
+        self.assertEqual(self.rollup_total('waste', 'food_waste', month=7), 2.0)
+
+    def test_xlsx_with_date_cells(self):
+        workbook = Workbook()
+        workbook.active.append(['facility_id', 'category', 'DatePicker', 'food_waste'])
+        workbook.active.append(['FAC1', 'Waste', datetime(2023, 6, 5), 3])
+        workbook.active.append(['FAC1', 'Waste', '2023-07-05', None])
+        content = BytesIO()
+        workbook.save(content)
+
+        response = self.import_waste(SimpleUploadedFile('waste.xlsx', content.getvalue()))
+
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            list(Waste.objects.order_by('DatePicker').values_list('DatePicker', 'food_waste')),
+            [(date(2023, 6, 5), 3.0), (date(2023, 7, 5), 0.0)],
+        )
+
+    def test_import_invalidates_cached_charts(self):
+        path = '/api/WasteViewCard_Over/?year=2023'
+        etag = self.etag(path)
+
+        self.import_waste(self.csv_upload('FAC1,Waste,2023-06-05,2'))
+
+        self.assertRevalidated(path, etag)
+
+    def test_unreadable_requests(self):
+        self.assertEqual(self.import_waste(SimpleUploadedFile('waste.txt', b'facility_id')).status_code, 400)
+        self.assertEqual(self.import_waste(self.csv_upload()).data, {'error': 'The uploaded file has no data rows.'})
+        response = self.client.post('/api/import_data/fuel/', {'file': self.csv_upload()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/import_data/waste/', {}, format='multipart').status_code, 400)
+
+
+class MonthlyConstraintTests(MetricTestCase):
+    duplicate = 'A Waste entry for this facility already exists for this month.'
+
+    def setUp(self):
+        super().setUp()
+        self.stored = Waste.objects.create(
+            user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1), food_waste=1
+        )
+
+    def test_single_entry_for_a_stored_month_is_rejected(self):
+        response = self.client.post('/api/add_waste/', self.waste('2023-06-20', food_waste=2), format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': [self.duplicate]})
+        self.assertEqual(Waste.objects.count(), 1)
+
+    def test_edit_into_a_stored_month_is_rejected(self):
+        other = Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 7, 1))
+
+        response = self.client.put(f'/api/waste_update/{other.waste_id}/', self.waste('2023-06-10'), format='json')
+
+        self.assertEqual(response.data, {
+            'non_field_errors': ['A different Waste entry for this facility already exists for this month.']
+        })
+        other.refresh_from_db()
+        self.assertEqual(other.DatePicker, date(2023, 7, 1))
+
+    def test_edit_within_the_same_month(self):
+        response = self.client.put(
+            f'/api/waste_update/{self.stored.waste_id}/', self.waste('2023-06-25', food_waste=4), format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.stored.refresh_from_db()
+        self.assertEqual((self.stored.DatePicker, self.stored.overall_usage), (date(2023, 6, 25), 4.0))
+
+    def test_list_reports_each_row_clashing_with_a_stored_month_and_writes_nothing(self):
+        response = self.client.post('/api/add_waste/', [
+            self.waste('2023-08-05'),
+            self.waste('2023-06-05'),
+            self.waste('2023-09-05'),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, [{}, {'non_field_errors': [self.duplicate]}, {}])
+        self.assertEqual(Waste.objects.count(), 1)
+        self.assertEqual(self.rollup_total('waste', 'food_waste'), 1.0)
+
+    def test_list_rejects_rows_repeating_a_month_of_the_upload(self):
+        response = self.client.post('/api/add_waste/', [
+            self.waste('2023-09-05'),
+            self.waste('2023-09-25'),
+        ], format='json')
+
+        self.assertEqual(response.data, [{}, {'non_field_errors': [self.duplicate]}])
+        self.assertEqual(Waste.objects.count(), 1)
+
+    def test_logistics_entries_are_unique_per_type_and_fuel(self):
+        entry = {'facility_id': 'FAC1', 'category': 'Logistices', 'DatePicker': '2023-06-05',
+                 'logistices_types': 'Staff', 'Typeof_fuel': 'Diesel'}
+        self.assertEqual(self.client.post('/api/add_logistices/', entry, format='json').status_code, 201)
+        cargo = self.client.post('/api/add_logistices/', {**entry, 'logistices_types': 'Cargo'}, format='json')
+        self.assertEqual(cargo.status_code, 201)
+        cargo = Logistices.objects.get(logistices_types='Cargo')
+
+        created = self.client.post('/api/add_logistices/', {**entry, 'DatePicker': '2023-06-28'}, format='json')
+        updated = self.client.put(f'/api/update_logistices/{cargo.logistices_id}/', entry, format='json')
+        report = MetricImporter('logistices', self.user).run(self.csv_upload(
+            'FAC1,Logistices,2023-06-10,Staff,Diesel', header='facility_id,category,DatePicker,logistices_types,Typeof_fuel'
+        ))
+
+        # The message names the clashing types, with the same text for creates and updates
+        duplicate = (
+            "An entry for logistices type 'Staff' and fuel type 'Diesel' "
+            "already exists for the same facility in the given month and year."
+        )
+        self.assertEqual(created.data, [{'non_field_errors': [duplicate]}])
+        self.assertEqual(updated.data, {'error': {'non_field_errors': [duplicate]}})
+        self.assertEqual(report['errors'], [{'row': 2, 'errors': {'non_field_errors': [duplicate]}}])
+        self.assertEqual(Logistices.objects.count(), 2)
+
+    def test_upsert_flag_updates_the_stored_month(self):
+        response = self.client.post(
+            '/api/add_waste/?upsert=true', [self.waste('2023-06-15', food_waste=5), self.waste('2023-07-15')], format='json'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.stored.refresh_from_db()
+        self.assertEqual((self.stored.DatePicker, self.stored.food_waste), (date(2023, 6, 15), 5.0))
+        self.assertEqual(Waste.objects.count(), 2)
+
+    def test_import_reports_a_month_stored_after_its_duplicate_check(self):
+        # The duplicate check sees nothing, so the unique constraint rejects the write
+        blind = (Waste, WasteCreateSerializer, lambda importer, frame: {}, ())
+        with mock.patch.dict(IMPORT_CATEGORIES, {'waste': blind}):
+            report = MetricImporter('waste', self.user).run(self.csv_upload(
+                'FAC1,Waste,2023-06-20,2',
+                'FAC1,Waste,2023-07-20,3',
+            ))
+
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertEqual(report['errors'], [{'row': 2, 'errors': {'non_field_errors': [self.duplicate]}}])
+        self.assertEqual(Waste.objects.get(DatePicker__month=7).food_waste, 3.0)
+
+
+class FacilityOwnershipTests(MetricTestCase):
+    missing = ['The selected facility does not exist.']
+
+    def test_entries_cannot_be_written_to_another_users_facility(self):
+        single = self.client.post('/api/add_waste/', self.waste('2023-06-05', facility_id='FAC2'), format='json')
+        listed = self.client.post('/api/add_waste/', [self.waste('2023-06-05', facility_id='FAC2')], format='json')
+        upsert = self.client.post(
+            '/api/add_waste/?upsert=true', [self.waste('2023-06-05', facility_id='FAC2')], format='json'
+        )
+        report = MetricImporter('waste', self.user).run(self.csv_upload('FAC2,Waste,2023-06-05,1'))
+
+        self.assertEqual(single.data, {'facility_id': self.missing})
+        self.assertEqual(listed.data, [{'facility_id': self.missing}])
+        self.assertEqual(upsert.data, [{'facility_id': self.missing}])
+        self.assertEqual(report['errors'], [{'row': 2, 'errors': {'facility_id': self.missing}}])
+        self.assertFalse(Waste.objects.exists())
+
+    def test_entry_cannot_be_moved_to_another_users_facility(self):
+        entry = Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1))
+
+        response = self.client.put(
+            f'/api/waste_update/{entry.waste_id}/', self.waste('2023-06-01', facility_id='FAC2'), format='json'
+        )
+
+        self.assertEqual(response.data, {'facility_id': self.missing})
+        entry.refresh_from_db()
+        self.assertEqual(entry.facility, self.facility)
+
+
+class UpsertTests(MetricTestCase):
+    def upsert(self, rows, category='waste'):
+        return self.client.post(f'/api/upsert_data/{category}/', rows, format='json')
+
+    def test_stored_months_are_updated_and_new_ones_created(self):
+        stored = Waste.objects.create(
+            user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1), food_waste=1, solid_Waste=1
+        )
+
+        response = self.upsert([self.waste('2023-06-20', food_waste=5), self.waste('2023-07-05', food_waste=2)])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.assertEqual(Waste.objects.count(), 2)
+        stored.refresh_from_db()
+        self.assertEqual((stored.DatePicker, stored.food_waste, stored.solid_Waste, stored.overall_usage),
+                         (date(2023, 6, 20), 5.0, 0.0, 5.0))
+        self.assertEqual(self.rollup_total('waste', 'overall_usage'), 5.0)
+        self.assertEqual(self.rollup_total('waste', 'food_waste', month=7), 2.0)
+
+    def test_invalid_row_writes_nothing(self):
+        Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1), food_waste=1)
+
+        response = self.upsert([self.waste('2023-06-20', food_waste=5), self.waste('2023-07-05', food_waste='x')])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[1], {'food_waste': ['A valid number is required.']})
+        self.assertEqual(Waste.objects.get().food_waste, 1.0)
+
+    def test_another_users_facility_is_rejected(self):
+        theirs = Waste.objects.create(
+            user=self.other_user, facility=self.other_facility, category='Waste', DatePicker=date(2023, 6, 1), food_waste=1
+        )
+
+        response = self.upsert([self.waste('2023-06-20', facility_id='FAC2', food_waste=5)])
+
+        self.assertEqual(response.data, [{'facility_id': ['The selected facility does not exist.']}])
+        theirs.refresh_from_db()
+        self.assertEqual((theirs.user, theirs.food_waste), (self.other_user, 1.0))
+
+    def test_refreshes_the_owner_of_a_replaced_entry(self):
+        # An entry stored by another user on this user's facility keeps its owner when replaced
+        legacy = Waste.objects.create(
+            user=self.other_user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 1), food_waste=1
+        )
+        owner_client = APIClient()
+        owner_client.force_authenticate(self.other_user)
+        path = '/api/WasteViewCard_Over/?year=2023'
+        response = owner_client.get(path)
+
+        self.upsert([self.waste('2023-06-20', food_waste=5)])
+
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.user, legacy.food_waste), (self.other_user, 5.0))
+        self.assertEqual(self.rollup_total('waste', 'food_waste', user=self.other_user), 5.0)
+        self.assertEqual(owner_client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_unsupported_requests(self):
+        self.assertEqual(self.upsert([{'facility_id': 'FAC1'}], category='biodiversity').status_code, 400)
+        self.assertEqual(self.upsert(self.waste('2023-06-20')).data, {'error': 'A non-empty list of entries is required.'})
+        self.assertEqual(self.upsert([]).status_code, 400)
+
+
+class OverallUsageTests(MetricTestCase):
+    def setUp(self):
+        super().setUp()
+        Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 5), food_waste=2)
+
+    def test_facility_id_is_echoed_lowercased(self):
+        response = self.client.get('/api/OverallUsageView/?year=2023&facility_id=FAC1')
+
+        self.assertEqual(response.data['facility_id'], 'fac1')
+        self.assertEqual(response.data['overall_data']['waste_usage'], 2.0)
+
+    def test_unknown_facility_gives_empty_totals(self):
+        response = self.client.get('/api/OverallUsageView/?year=2023&facility_id=FAC2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['facility_id'], 'fac2')
+        self.assertEqual(set(response.data['overall_data'].values()), {0})
+
+
+class DashboardBundleTests(MetricTestCase):
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        mumbai = self.create_facility(self.user, 'FAC3', location='Mumbai')
+        second = self.create_facility(self.user, 'FAC4', location='Chennai North')
+        for facility, picked, amount in [
+            (self.facility, date(2023, 6, 5), 1), (mumbai, date(2023, 7, 5), 2), (second, date(2024, 1, 5), 4),
+        ]:
+            entry = {'user': self.user, 'facility': facility, 'DatePicker': picked}
+            Waste.objects.create(**entry, category='Waste', food_waste=amount, Landfill_waste=amount * 2, Recycle_waste=1)
+            Energy.objects.create(
+                **entry, category='Energy', hvac=amount, diesel=amount * 3, renewable_solar=amount * 5, renewable_other=1
+            )
+            Water.objects.create(**entry, category='Water', Generated_Water=amount * 10, Recycled_Water=amount, Boiler_usage=2)
+            Logistices.objects.create(
+                **entry, category='Logistices', logistices_types='Cargo', Typeof_fuel='Diesel', fuel_consumption=amount,
+                km_travelled=amount * 100, No_Trips=amount, No_Vehicles=1,
+            )
+            Biodiversity.objects.create(
+                **entry, category='Biodiversity', species='Neem', no_trees=amount * 10, width=1, height=amount, totalArea=50,
+                head_count=5, new_trees_planted=amount,
+            )
+
+    def assertBundleMatchesEndpoints(self, query):
+        bundle = self.client.get(f'/api/dashboard_bundle/?{query}')
+        self.assertEqual(bundle.status_code, 200)
+        for chart_id in DASHBOARD_CHARTS:
+            with self.subTest(chart_id, query=query):
+                response = self.client.get(f'/api/{chart_id}/?{query}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(bundle.data['charts'][chart_id], response.data)
+
+    def test_charts_match_their_endpoints_for_a_year(self):
+        self.assertBundleMatchesEndpoints('year=2023')
+
+    def test_charts_match_their_endpoints_for_a_facility(self):
+        self.assertBundleMatchesEndpoints('year=2023&facility_id=FAC3')
+
+    def test_charts_match_their_endpoints_for_a_location(self):
+        # Some endpoints narrow by facility_id only, so they chart every location here
+        self.assertBundleMatchesEndpoints('year=2023&facility_location=chennai')
+        self.assertBundleMatchesEndpoints('year=2023&facility_id=FAC1&facility_location=chennai')
+
+
+class FacilityScopeTests(MetricTestCase):
+    def test_new_facility_is_usable_at_once(self):
+        self.assertEqual(self.client.get('/api/WasteViewCard_Over/?year=2023&facility_id=FAC1').status_code, 200)
+        # Created without signals, as by another process
+        Facility.objects.bulk_create([Facility(
+            user=self.user, facility_id='FAC9', facility_name='Plant FAC9', facility_head='Head',
+            facility_location='Pune', facility_description='Test facility',
+        )])
+
+        self.assertEqual(self.client.get('/api/WasteViewCard_Over/?year=2023&facility_id=FAC9').status_code, 200)
+        self.assertEqual(self.client.get('/api/WasteViewCard_Over/?year=2023&facility_location=pune').status_code, 200)
+
+    def test_unknown_facility_or_location_is_rejected(self):
+        self.assertEqual(self.client.get('/api/WasteViewCard_Over/?year=2023&facility_id=FAC2').data, {
+            'error': 'Invalid facility ID or not associated with the logged-in user.'
+        })
+        self.assertEqual(self.client.get('/api/WasteViewCard_Over/?year=2023&facility_location=pune').data, {
+            'error': 'No facility found with location pune.'
+        })
+
+
+class ResponseCacheBackendCheckTests(SimpleTestCase):
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    def test_default_backend_is_shared_between_processes(self):
+        self.assertEqual(check_response_cache_backend(None), [])
+
+    def test_warns_about_a_process_local_backend(self):
+        with override_settings(CACHES=self.locmem):
+            self.assertEqual([warning.id for warning in check_response_cache_backend(None)], ['users_pzc.W001'])
+        with override_settings(CACHES=self.locmem, PZC_RESPONSE_CACHE=False):
+            self.assertEqual(check_response_cache_backend(None), [])
+
+
+class RollupTests(MetricTestCase):
+    """MetricRollup must always equal the raw monthly aggregate of the entries."""
+
+    def assertRollupsMatch(self, model):
+        expected = {}
+        for entry in model.objects.exclude(DatePicker=None):
+            bucket = (entry.user_id, entry.facility_id, fiscal_period(entry.DatePicker)[0], entry.DatePicker.month)
+            for metric in model.rollup_metrics:
+                total, entries = expected.get((*bucket, metric), (0.0, 0))
+                expected[(*bucket, metric)] = (total + (getattr(entry, metric) or 0), entries + 1)
+        stored = {
+            (rollup.user_id, rollup.facility_id, rollup.fiscal_year, rollup.month, rollup.metric): (rollup.total, rollup.entries)
+            for rollup in MetricRollup.objects.filter(category=model.rollup_category)
+        }
+        self.assertEqual(stored, expected)
+
+    def create_waste(self, picked, facility=None, **values):
+        return Waste.objects.create(
+            user=self.user, facility=facility or self.facility, category='Waste', DatePicker=picked, **values
+        )
+
+    def test_save_and_delete(self):
+        june = self.create_waste(date(2023, 6, 5), food_waste=2, solid_Waste=3)
+        self.create_waste(date(2024, 3, 31), food_waste=1)
+        self.create_waste(date(2024, 4, 1), food_waste=7)
+        self.assertRollupsMatch(Waste)
+
+        june.food_waste = 5
+        june.save()
+        self.assertRollupsMatch(Waste)
+        self.assertEqual(self.rollup_total('waste', 'overall_usage'), 8.0)
+
+        # Moving an entry empties its old bucket
+        june.DatePicker = date(2023, 8, 5)
+        june.save()
+        self.assertRollupsMatch(Waste)
+        self.assertIsNone(self.rollup_total('waste', 'food_waste'))
+
+        june.facility = self.create_facility(self.user, 'FAC3')
+        june.save()
+        self.assertRollupsMatch(Waste)
+
+        june.delete()
+        self.assertRollupsMatch(Waste)
+        self.assertEqual(MetricRollup.objects.filter(category='waste', month=8).count(), 0)
+
+    def test_buckets_with_several_entries(self):
+        entry = {'user': self.user, 'facility': self.facility, 'category': 'Logistices', 'DatePicker': date(2023, 6, 5)}
+        staff = Logistices.objects.create(**entry, logistices_types='Staff', Typeof_fuel='Diesel', fuel_consumption=3, No_Trips=2)
+        Logistices.objects.create(**entry, logistices_types='Cargo', Typeof_fuel='Diesel', fuel_consumption=4)
+        self.assertRollupsMatch(Logistices)
+        self.assertEqual(self.rollup_total('logistices', 'fuel_consumption'), 7.0)
+
+        staff.delete()
+        self.assertRollupsMatch(Logistices)
+        self.assertEqual(MetricRollup.objects.get(category='logistices', metric='fuel_consumption').entries, 1)
+
+    def test_list_create_import_and_upsert(self):
+        self.client.post('/api/add_waste/', [self.waste('2023-06-05', food_waste=2), self.waste('2023-07-05')], format='json')
+        MetricImporter('waste', self.user).run(self.csv_upload('FAC1,Waste,2023-09-05,3', 'FAC1,Waste,2024-01-05,4'))
+        self.assertRollupsMatch(Waste)
+
+        self.client.post('/api/upsert_data/waste/', [
+            self.waste('2023-06-20', solid_Waste=6), self.waste('2023-10-05', food_waste=1),
+        ], format='json')
+
+        self.assertRollupsMatch(Waste)
+        self.assertEqual(self.rollup_total('waste', 'overall_usage'), 6.0)
+
+    def test_rebuild_after_a_bulk_update(self):
+        self.create_waste(date(2023, 6, 5), food_waste=2)
+        self.create_waste(date(2023, 7, 5), food_waste=3)
+        # queryset.update() bypasses save(), so the rollups fall behind until rebuilt
+        Waste.objects.update(food_waste=10)
+        MetricRollup.objects.create(
+            user=self.user, facility=self.facility, category='waste', fiscal_year=2020, month=1, metric='food_waste'
+        )
+
+        MetricRollup.objects.rebuild(Waste)
+
+        self.assertRollupsMatch(Waste)
+
+
+class ConditionalGetTests(MetricTestCase):
+    path = '/api/WasteViewCard_Over/?year=2023'
+
+    def assertNotModified(self, etag, path=None, client=None):
+        response = (client or self.client).get(path or self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        return response
+
+    def test_unchanged_data_answers_304(self):
+        response = self.client.get(self.path)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        self.assertEqual(self.assertNotModified(response['ETag']).content, b'')
+        # Each view and query string has its own tag
+        self.assertNotEqual(self.etag('/api/WasteViewCard_Over/?year=2022'), response['ETag'])
+        self.assertNotEqual(self.etag('/api/EnergyViewCard_Over/?year=2023'), response['ETag'])
+
+    def test_write_gives_a_new_etag(self):
+        etag = self.etag()
+
+        self.client.post('/api/add_waste/', self.waste('2023-06-05', food_waste=2), format='json')
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['overall_waste_totals']['overall_food_waste'], 2.0)
+        self.assertNotModified(response['ETag'])
+
+    def test_edit_and_delete_give_a_new_etag(self):
+        entry = Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=date(2023, 6, 5))
+        etag = self.etag()
+        self.client.put(f'/api/waste_update/{entry.waste_id}/', self.waste('2023-06-05', food_waste=4), format='json')
+        self.assertRevalidated(self.path, etag)
+
+        etag = self.etag()
+        self.client.delete(f'/api/waste_delete/{entry.waste_id}/')
+        self.assertRevalidated(self.path, etag)
+
+    def test_only_the_writers_tags_change(self):
+        other_client = APIClient()
+        other_client.force_authenticate(self.other_user)
+        other_etag = other_client.get(self.path)['ETag']
+        etag = self.etag()
+
+        self.client.post('/api/add_waste/', self.waste('2023-06-05'), format='json')
+
+        self.assertNotModified(other_etag, client=other_client)
+        self.assertRevalidated(self.path, etag)
+
+    def test_emission_factor_change_gives_everyone_a_new_etag(self):
+        path = '/api/EmissionCalculations/?year=2023'
+        etag = self.etag(path)
+
+        EmissionFactor.objects.create(category='energy', source='electricity', effective_from=date(2023, 4, 1), factor=0.5)
+
+        self.assertRevalidated(path, etag)
+
+
+class FiscalPeriodTests(MetricTestCase):
+    def stored_periods(self, model=Waste):
+        return list(model.objects.order_by('DatePicker').values_list('DatePicker', 'fiscal_year', 'fiscal_month'))
+
+    def test_april_to_march_boundary(self):
+        self.assertEqual(fiscal_period(date(2023, 3, 31)), (2022, 12))
+        self.assertEqual(fiscal_period(date(2023, 4, 1)), (2023, 1))
+        self.assertEqual(fiscal_period(date(2023, 12, 31)), (2023, 9))
+        self.assertEqual(fiscal_period(date(2024, 1, 1)), (2023, 10))
+        self.assertEqual(fiscal_period('2023-03-31'), (2022, 12))
+        self.assertEqual(fiscal_period(None), (None, None))
+        self.assertEqual([calendar_month(fiscal_period(date(2023, month, 1))[1]) for month in range(1, 13)], list(range(1, 13)))
+
+    def test_stored_columns_follow_date_edits(self):
+        self.client.post('/api/add_waste/', self.waste('2023-03-31'), format='json')
+        entry = Waste.objects.get()
+        self.assertEqual((entry.fiscal_year, entry.fiscal_month), (2022, 12))
+
+        self.client.put(f'/api/waste_update/{entry.waste_id}/', self.waste('2023-04-01'), format='json')
+        self.assertEqual(self.stored_periods(), [(date(2023, 4, 1), 2023, 1)])
+
+        entry.refresh_from_db()
+        entry.DatePicker = date(2024, 2, 10)
+        entry.save()
+        self.assertEqual(self.stored_periods(), [(date(2024, 2, 10), 2023, 11)])
+
+        entry.DatePicker = None
+        entry.save()
+        self.assertEqual(self.stored_periods(), [(None, None, None)])
+
+    def test_list_create_sets_the_stored_columns(self):
+        self.client.post('/api/add_waste/', [self.waste('2023-03-31'), self.waste('2023-04-01')], format='json')
+
+        self.assertEqual(self.stored_periods(), [(date(2023, 3, 31), 2022, 12), (date(2023, 4, 1), 2023, 1)])
+
+    def test_backfill_migration_matches_fiscal_period(self):
+        backfill = import_module('users_pzc.migrations.0005_metric_fiscal_period').backfill_fiscal_period
+        for picked in (date(2023, 1, 15), date(2023, 3, 31), date(2023, 4, 1), date(2023, 12, 31)):
+            Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=picked)
+        Energy.objects.create(user=self.user, facility=self.facility, category='Energy', DatePicker=date(2024, 3, 1))
+        Waste.objects.update(fiscal_year=None, fiscal_month=None)
+        Energy.objects.update(fiscal_year=None, fiscal_month=None)
+
+        backfill(apps, None)
+
+        self.assertEqual(self.stored_periods(), [
+            (date(2023, 1, 15), 2022, 10), (date(2023, 3, 31), 2022, 12),
+            (date(2023, 4, 1), 2023, 1), (date(2023, 12, 31), 2023, 9),
+        ])
+        self.assertEqual(self.stored_periods(Energy), [(date(2024, 3, 1), 2023, 12)])
+
+
+class KeysetPaginationTests(MetricTestCase):
+    path = '/api/view_waste/'
+
+    def setUp(self):
+        super().setUp()
+        # One entry per facility and month, so several rows share each DatePicker
+        for number in range(2, 7):
+            facility = self.create_facility(self.user, f'FAC1{number}')
+            for picked in (date(2023, 6, 1), date(2023, 7, 1), None):
+                Waste.objects.create(user=self.user, facility=facility, category='Waste', DatePicker=picked)
+
+    def expected_order(self):
+        dated = Waste.objects.filter(user=self.user, DatePicker__isnull=False).order_by('-DatePicker', '-pk')
+        undated = Waste.objects.filter(user=self.user, DatePicker=None).order_by('-pk')
+        return [entry.waste_id for entry in [*dated, *undated]]
+
+    def walk(self, page_size, between_pages=None):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(self.path, {'page_size': page_size, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            page = [entry['waste_id'] for entry in response.data['waste_data']]
+            self.assertLessEqual(len(page), page_size)
+            seen += page
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return seen
+            if between_pages:
+                between_pages(len(seen))
+
+    def encoded(self, key):
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    def test_pages_visit_every_row_once_in_order(self):
+        expected = self.expected_order()
+        for page_size in (1, 2, 4, 5, 15, 100):
+            self.assertEqual(self.walk(page_size), expected)
+
+    def test_rows_added_between_pages_do_not_shift_the_walk(self):
+        expected = self.expected_order()
+        facility = self.create_facility(self.user, 'FAC9')
+
+        def add_row(seen):
+            # After the first page, add rows on either side of the cursor on the shared date
+            if seen == 4:
+                Waste.objects.create(
+                    user=self.user, facility=facility, category='Waste', DatePicker=date(2023, 7, 1), waste_id='~LATE'
+                )
+                Waste.objects.create(
+                    user=self.user, facility=facility, category='Waste', DatePicker=date(2023, 6, 1), waste_id='!EARLY'
+                )
+
+        seen = self.walk(4, between_pages=add_row)
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual([waste_id for waste_id in seen if waste_id in expected], expected)
+        # Ahead of the cursor is skipped, behind it is still reached
+        self.assertNotIn('~LATE', seen)
+        self.assertIn('!EARLY', seen)
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in (
+            'not a cursor', '%%%', self.encoded(['2023-06-01']), self.encoded(['June', 'ABC']),
+            self.encoded([20230601, 'ABC']), self.encoded(['2023-06-01', ['ABC']]), self.encoded(['2023-06-01', None]),
+            self.encoded({'date': '2023-06-01'}), base64.urlsafe_b64encode(b'[').decode(),
+        ):
+            response = self.client.get(self.path, {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.data, {'error': 'Invalid cursor.'})
+
+        response = self.client.get('/api/view_facility/', {'cursor': self.encoded(['2023-06-01', 'FAC1'])})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.path, {'page_size': 0}).status_code, 400)
+
+
+class ExportTests(MetricTestCase):
+    def setUp(self):
+        super().setUp()
+        for picked, food_waste in ((date(2023, 6, 5), 2), (date(2024, 1, 5), 3), (date(2022, 6, 5), 5), (None, 7)):
+            Waste.objects.create(user=self.user, facility=self.facility, category='Waste', DatePicker=picked, food_waste=food_waste)
+        Waste.objects.create(user=self.other_user, facility=self.other_facility, category='Waste', DatePicker=date(2023, 6, 5))
+        self.columns = export_columns(Waste)
+
+    def download(self, query):
+        response = self.client.get(f'/api/view_waste/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def food_waste_by_date(self, rows):
+        date_index, food_index = self.columns.index('DatePicker'), self.columns.index('food_waste')
+        return [(row[date_index], row[food_index]) for row in rows]
+
+    def test_csv(self):
+        response, content = self.download('format=csv&year=2023')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="waste_data_2023.csv"')
+        rows = list(csv.reader(content.decode().splitlines()))
+        self.assertEqual(rows[0], self.columns)
+        self.assertNotIn('user_id', rows[0])
+        self.assertEqual(self.food_waste_by_date(rows[1:]), [('2024-01-05', '3.0'), ('2023-06-05', '2.0')])
+
+        # Every row of the user, undated ones last
+        rows = list(csv.reader(self.download('format=csv')[1].decode().splitlines()))
+        self.assertEqual(
+            self.food_waste_by_date(rows[1:]),
+            [('2024-01-05', '3.0'), ('2023-06-05', '2.0'), ('2022-06-05', '5.0'), ('', '7.0')],
+        )
+
+    def test_xlsx(self):
+        response, content = self.download('format=xlsx&year=2023')
+
+        self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="waste_data_2023.xlsx"')
+        sheet = load_workbook(BytesIO(content))['Waste']
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), self.columns)
+        self.assertEqual(
+            self.food_waste_by_date(rows[1:]), [(datetime(2024, 1, 5), 3.0), (datetime(2023, 6, 5), 2.0)]
+        )
+
+    def test_xlsx_is_capped(self):
+        with mock.patch('users_pzc.exports.XLSX_MAX_ROWS', 3):
+            response = self.client.get('/api/view_waste/?format=xlsx')
+            self.assertEqual(self.download('format=xlsx&year=2023')[0].status_code, 200)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('format=csv', response.data['error'])
+
+    def test_rows_are_read_in_keyset_batches(self):
+        batches = list(export_rows(Waste.objects.filter(user=self.user), self.columns, chunk_size=3))
+
+        self.assertEqual([len(rows) for rows in batches], [3, 1])
+        self.assertEqual(
+            self.food_waste_by_date([row for rows in batches for row in rows]),
+            [(date(2024, 1, 5), 3.0), (date(2023, 6, 5), 2.0), (date(2022, 6, 5), 5.0), (None, 7.0)],
+        )
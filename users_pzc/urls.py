@@ -1,6 +1,6 @@
 
 from django.urls import   path
-from .views import RegisterView, LoginView, DashboardView, LogoutView,WasteCreateView,WasteView,WasteEditView,WasteDeleteView,EnergyCreateView,EnergyView,EnergyEditView,EnergyDeleteView,WaterView,WaterCreateView,WaterEditView,WaterDeleteView,BiodiversityCreateView,BiodiversityView,BiodiversityEditView,BiodiversityDeleteView,FacilityCreateView,FacilityView,FacilityEditView,FacilityDeleteView,LogisticesCreateView,LogisticesView,LogisticesEditView,LogisticesDeleteView,FoodWasteOverviewView,SolidWasteOverviewView,E_WasteOverviewView,Biomedical_WasteOverviewView,Liquid_DischargeOverviewView,OthersOverviewView,Waste_Sent_For_RecycleOverviewView,Waste_Sent_For_LandFillOverviewView,StackedWasteOverviewView,WasteOverallDonutChartView,SentToLandfillOverviewView,SentToRecycledOverviewView,HVACOverviewView,ProductionOverviewView,StpOverviewView,Admin_BlockOverviewView,Utilities_OverviewView,WasteViewCard_Over,EnergyViewCard_Over,Others_OverviewView,Renewable_EnergyOverView,StackedEnergyOverviewView,OverallUsageView,Fuel_Used_OperationsOverView,WaterViewCard_Over,Generated_WaterOverviewView,Recycle_WaterOverviewView,Softener_usageOverviewView,Boiler_usageOverviewView,otherUsage_OverviewView,StackedWaterOverviewView,EnergyAnalyticsView,WaterAnalyticsView,BiodiversityMetricsGraphsView,LogisticesOverviewAndGraphs,EmissionCalculations,YearFacilityDataAPIView,OrganizationCreate,OrganizationView
+from .views import RegisterView, LoginView, DashboardView, LogoutView,WasteCreateView,WasteView,WasteEditView,WasteDeleteView,EnergyCreateView,EnergyView,EnergyEditView,EnergyDeleteView,WaterView,WaterCreateView,WaterEditView,WaterDeleteView,BiodiversityCreateView,BiodiversityView,BiodiversityEditView,BiodiversityDeleteView,FacilityCreateView,FacilityView,FacilityEditView,FacilityDeleteView,LogisticesCreateView,LogisticesView,LogisticesEditView,LogisticesDeleteView,FoodWasteOverviewView,SolidWasteOverviewView,E_WasteOverviewView,Biomedical_WasteOverviewView,Liquid_DischargeOverviewView,OthersOverviewView,Waste_Sent_For_RecycleOverviewView,Waste_Sent_For_LandFillOverviewView,StackedWasteOverviewView,WasteOverallDonutChartView,SentToLandfillOverviewView,SentToRecycledOverviewView,HVACOverviewView,ProductionOverviewView,StpOverviewView,Admin_BlockOverviewView,Utilities_OverviewView,WasteViewCard_Over,EnergyViewCard_Over,Others_OverviewView,Renewable_EnergyOverView,StackedEnergyOverviewView,OverallUsageView,Fuel_Used_OperationsOverView,WaterViewCard_Over,Generated_WaterOverviewView,Recycle_WaterOverviewView,Softener_usageOverviewView,Boiler_usageOverviewView,otherUsage_OverviewView,StackedWaterOverviewView,EnergyAnalyticsView,WaterAnalyticsView,BiodiversityMetricsGraphsView,LogisticesOverviewAndGraphs,EmissionCalculations,YearFacilityDataAPIView,OrganizationCreate,OrganizationView,DashboardBundleView,MetricImportView,MetricUpsertView,ResponseCacheStatsView
 
 
 from rest_framework_simplejwt.views import (
@@ -67,6 +67,12 @@ urlpatterns = [
    path('update_logistices/<str:logistices_id>/',LogisticesEditView.as_view(),name='add_logistices'),
    path('delete_logistices/<str:logistices_id>/',LogisticesDeleteView.as_view(),name='add_logistices'),
    #Apis for Logistices Crud Operations Ends
+
+   #Api for Spreadsheet (csv/xlsx) import of any metric category
+   path('import_data/<str:category>/',MetricImportView.as_view(),name='import_data'),
+
+   #Api for creating or replacing a list of monthly entries of a metric category in one request
+   path('upsert_data/<str:category>/',MetricUpsertView.as_view(),name='upsert_data'),
    
    #OverviewCard Total
    path('OverallUsageView/',OverallUsageView.as_view(),name='OverallUsageView'),
@@ -127,5 +133,9 @@ urlpatterns = [
     path('EmissionCalculations/',EmissionCalculations.as_view(),name="EmissionCalculations"),
     #Apis For YearFacility
     path('YearFacilityDataAPIView/',YearFacilityDataAPIView.as_view(),name="YearFacilityDataAPIView"),
+    #Api For all Overview charts in one request
+    path('dashboard_bundle/',DashboardBundleView.as_view(),name="dashboard_bundle"),
+    #Api For chart response cache monitoring
+    path('cache_stats/',ResponseCacheStatsView.as_view(),name="cache_stats"),
 
 ]
@@ -2,7 +2,7 @@ import pandas as pd
 from datetime import datetime
 from collections import defaultdict
 from django.db.models import Sum, Value, FloatField,Min, Max,F,ExpressionWrapper
-from django.db.models.functions import Coalesce, Cast, ExtractMonth
+from django.db.models.functions import Coalesce, Cast
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils import timezone
 from django.contrib.auth import authenticate
@@ -10,18 +10,36 @@ from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated,AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated,AllowAny,IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import UserRegisterSerializer, UserLoginSerializer,WasteSerializer,WasteCreateSerializer,EnergyCreateSerializer,OrganizationSerializer,EnergySerializer,WaterCreateSerializer,WaterSerializer,BiodiversityCreateSerializer,BiodiversitySerializer,FacilitySerializer,LogisticesSerializer
-from .models import CustomUser,Waste,Energy,Water,Biodiversity,Facility,Logistices,Org_registration
+from .models import CustomUser,Waste,Energy,Water,Biodiversity,Facility,Logistices,Org_registration,MetricRollup
 from django.db.models import Q
 
 from django.db.models import Field
 from .filters import FacilityFilter, WasteFilter, EnergyFilter, WaterFilter, BiodiversityFilter, LogisticesFilter
+from .emissions import FISCAL_MONTHS, emissions_and_usage, monthly_emissions
+from .fiscal import available_fiscal_years, calendar_month, current_fiscal_year, latest_fiscal_year
+from .dashboard import (
+    DASHBOARD_CHARTS, METRIC_OVERVIEWS, DashboardData, build_dashboard, facility_donut, metric_overview, stacked_bars,
+)
+from .imports import IMPORT_CATEGORIES, ImportFileError, MetricImporter
+from .exports import MetricExportMixin, export_response
+from .pagination import KeysetPagination, PaginationError, column_totals
+from .caching import cache_response, conditional_response, response_cache_stats
+from .facilities import facility_names, facility_scope
 from django_filters.rest_framework import DjangoFilterBackend
 import logging
 
 logger = logging.getLogger(__name__)
+
+
+def wants_upsert(request):
+    # `?upsert=true` on a list create updates the stored entry of a month instead of rejecting the row
+    return request.query_params.get('upsert', '').lower() in ('1', 'true', 'yes')
+
+
 #Register View
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -86,6 +104,7 @@ class OrganizationCreate(APIView):
 class OrganizationView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_response
     def get(self, request):
         user = request.user
         org_reg_data = Org_registration.objects.filter(user=user)
@@ -112,12 +131,18 @@ class FacilityCreateView(APIView):
 class FacilityView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', 'all')
         location = request.GET.get('location')
         action = request.GET.get('action')
 
+        try:
+            pagination = KeysetPagination(request, date_field=None)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         # Start by filtering facilities by the user
         facility_data = Facility.objects.filter(user=user)
 
@@ -141,6 +166,8 @@ class FacilityView(APIView):
                 "location": "N/A",
             }]
         else:
+            if pagination.enabled:
+                facility_data = pagination.paginate(facility_data)
             facility_serializer = FacilitySerializer(facility_data, many=True)
             facility_data_response = facility_serializer.data
 
@@ -148,6 +175,8 @@ class FacilityView(APIView):
             'email': user.email,
             'facility_data': facility_data_response,
         }
+        if pagination.enabled:
+            user_data.update(pagination.page_info())
 
         return Response(user_data, status=status.HTTP_200_OK)
 
@@ -194,7 +223,9 @@ class WasteCreateView(APIView):
         # Check if data is a list (for multiple entries) or a single object
         is_bulk = isinstance(request.data, list)
         if is_bulk:
-            serializer = WasteCreateSerializer(data=request.data, many=True, context={'request': request})
+            serializer = WasteCreateSerializer(
+                data=request.data, many=True, context={'request': request, 'upsert': wants_upsert(request)}
+            )
         else:
             serializer = WasteCreateSerializer(data=request.data, context={'request': request})
 
@@ -207,14 +238,20 @@ class WasteCreateView(APIView):
         # Return validation errors
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class WasteView(APIView):
+class WasteView(MetricExportMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get("facility_id", None)
         year = request.GET.get("year", None)
 
+        try:
+            pagination = KeysetPagination(request)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Initialize queryset for Waste data
             waste_data = Waste.objects.filter(user=user)
@@ -223,9 +260,7 @@ class WasteView(APIView):
             if year:
                 try:
                     year = int(year)
-                    start_date = datetime(year, 4, 1)  # Financial year starts from April
-                    end_date = datetime(year + 1, 3, 31)  # Ends in March next year
-                    waste_data = waste_data.filter(DatePicker__range=(start_date, end_date))
+                    waste_data = waste_data.filter(fiscal_year=year)  # Financial year: April - March
                 except ValueError:
                     return Response(
                         {"error": "Invalid year format. Please provide a valid year, e.g., 2023."},
@@ -235,6 +270,11 @@ class WasteView(APIView):
             if facility_id:
                 waste_data = waste_data.filter(facility__facility_id=facility_id)
 
+            # Raw data download (?format=csv|xlsx) streams every matching row instead of the JSON list
+            export_format = self.export_format(request)
+            if export_format:
+                return export_response(waste_data, export_format, f"waste_data_{year}" if year else "waste_data")
+
             # Check if data exists, otherwise return zero-filled response
             if not waste_data.exists():
                 return Response(
@@ -255,26 +295,23 @@ class WasteView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Serialize and calculate totals
-            waste_data = waste_data.order_by("-DatePicker")  # Order by date, descending
-            waste_serializer = WasteSerializer(waste_data, many=True)
-            overall_total = sum(
-                (entry.food_waste or 0) +
-                (entry.solid_Waste or 0) +
-                (entry.E_Waste or 0) +
-                (entry.Biomedical_waste or 0) +
-                (entry.other_waste or 0)
-                for entry in waste_data
-            )
+            # Totals are one aggregate over every matching row, also when only a page is returned
+            totals = column_totals(waste_data, ['food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste'])
+            if pagination.enabled:
+                waste_page = pagination.paginate(waste_data)
+            else:
+                waste_page = waste_data.order_by("-DatePicker")  # Order by date, descending
+            waste_serializer = WasteSerializer(waste_page, many=True)
 
-            return Response(
-                {
-                    "email": user.email,
-                    "waste_data": waste_serializer.data,
-                    "overall_waste_usage_total": overall_total,
-                },
-                status=status.HTTP_200_OK,
-            )
+            response_data = {
+                "email": user.email,
+                "waste_data": waste_serializer.data,
+                "overall_waste_usage_total": sum(totals.values()),
+                "totals": totals,
+            }
+            if pagination.enabled:
+                response_data.update(pagination.page_info())
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response(
@@ -319,7 +356,9 @@ class EnergyCreateView(APIView):
     def post(self, request):
         is_bulk = isinstance(request.data, list)
         if is_bulk:
-            serializer = EnergyCreateSerializer(data=request.data, many=True, context={'request': request})
+            serializer = EnergyCreateSerializer(
+                data=request.data, many=True, context={'request': request, 'upsert': wants_upsert(request)}
+            )
         else:
             serializer = EnergyCreateSerializer(data=request.data,context={'request':request})
         if serializer.is_valid():
@@ -327,14 +366,20 @@ class EnergyCreateView(APIView):
             return Response({"messages":"Energy data added Succesfully"},status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class EnergyView(APIView):
+class EnergyView(MetricExportMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get("facility_id", None)
         year = request.GET.get("year", None)
 
+        try:
+            pagination = KeysetPagination(request)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Initialize queryset for Energy data
             energy_data = Energy.objects.filter(user=user)
@@ -343,9 +388,7 @@ class EnergyView(APIView):
             if year:
                 try:
                     year = int(year)
-                    start_date = datetime(year, 4, 1)  # Financial year starts in April
-                    end_date = datetime(year + 1, 3, 31)  # Ends in March next year
-                    energy_data = energy_data.filter(DatePicker__range=(start_date, end_date))
+                    energy_data = energy_data.filter(fiscal_year=year)  # Financial year: April - March
                 except ValueError:
                     return Response(
                         {"error": "Invalid year format. Please provide a valid year, e.g., 2023."},
@@ -355,6 +398,11 @@ class EnergyView(APIView):
             if facility_id:
                 energy_data = energy_data.filter(facility__facility_id=facility_id) 
 
+            # Raw data download (?format=csv|xlsx) streams every matching row instead of the JSON list
+            export_format = self.export_format(request)
+            if export_format:
+                return export_response(energy_data, export_format, f"energy_data_{year}" if year else "energy_data")
+
             # Check if data exists, otherwise return zero-filled response
             if not energy_data.exists():
                 return Response(
@@ -390,25 +438,23 @@ class EnergyView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Serialize and calculate totals
-            energy_data = energy_data.order_by("-DatePicker")  # Order by date, descending
-            energy_serializer = EnergySerializer(energy_data, many=True)
-            overall_total = sum(
-                (entry.hvac or 0) +
-                (entry.production or 0) +
-                (entry.stp or 0) +
-                (entry.admin_block or 0) +
-                (entry.others or 0)
-                for entry in energy_data
-            )
-            return Response(
-                {
-                    "email": user.email,
-                    "energy_data": energy_serializer.data,
-                    "overall_energy_usage_total": overall_total,
-                },
-                status=status.HTTP_200_OK,
-            )
+            # Totals are one aggregate over every matching row, also when only a page is returned
+            totals = column_totals(energy_data, ['hvac', 'production', 'stp', 'admin_block', 'others'])
+            if pagination.enabled:
+                energy_page = pagination.paginate(energy_data)
+            else:
+                energy_page = energy_data.order_by("-DatePicker")  # Order by date, descending
+            energy_serializer = EnergySerializer(energy_page, many=True)
+
+            response_data = {
+                "email": user.email,
+                "energy_data": energy_serializer.data,
+                "overall_energy_usage_total": sum(totals.values()),
+                "totals": totals,
+            }
+            if pagination.enabled:
+                response_data.update(pagination.page_info())
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except ValueError as e:
             return Response(
@@ -460,7 +506,9 @@ class WaterCreateView(APIView):
     def post(self,request):
         is_bulk = isinstance(request.data, list)
         if is_bulk:
-            serializer = WaterCreateSerializer(data=request.data, many=True, context={'request': request})
+            serializer = WaterCreateSerializer(
+                data=request.data, many=True, context={'request': request, 'upsert': wants_upsert(request)}
+            )
         else:
             serializer = WaterCreateSerializer(data=request.data,context={'request':request})
         if serializer.is_valid():
@@ -469,14 +517,20 @@ class WaterCreateView(APIView):
         return Response(serializer.errors,status=status.HTTP_400_BAD_REQUEST)
 
 #WaterView
-class WaterView(APIView):
+class WaterView(MetricExportMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get("facility_id", None)
         year = request.GET.get("year", None)
 
+        try:
+            pagination = KeysetPagination(request)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Initialize queryset for Water data
             water_data = Water.objects.filter(user=user)
@@ -485,9 +539,7 @@ class WaterView(APIView):
             if year:
                 try:
                     year = int(year)
-                    start_date = datetime(year, 4, 1)  # Financial year starts in April
-                    end_date = datetime(year + 1, 3, 31)  # Ends in March next year
-                    water_data = water_data.filter(DatePicker__range=(start_date, end_date))
+                    water_data = water_data.filter(fiscal_year=year)  # Financial year: April - March
                 except ValueError:
                     return Response(
                         {"error": "Invalid year format. Please provide a valid year, e.g., 2023."},
@@ -497,6 +549,11 @@ class WaterView(APIView):
             if facility_id:
                 water_data = water_data.filter(facility__facility_id=facility_id) 
 
+            # Raw data download (?format=csv|xlsx) streams every matching row instead of the JSON list
+            export_format = self.export_format(request)
+            if export_format:
+                return export_response(water_data, export_format, f"water_data_{year}" if year else "water_data")
+
             # Check if data exists, otherwise return zero-filled response
             if not water_data.exists():
                 return Response(
@@ -521,18 +578,23 @@ class WaterView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Serialize and calculate totals
-            water_data = water_data.order_by("-DatePicker")  # Order by date, descending
-            water_serializer = WaterSerializer(water_data, many=True)
-            overall_total = sum(water.overall_usage for water in water_data)
-            return Response(
-                {
-                    "email": user.email,
-                    "water_data": water_serializer.data,
-                    "overall_water_usage_total": overall_total,
-                },
-                status=status.HTTP_200_OK,
-            )
+            # Totals are one aggregate over every matching row, also when only a page is returned
+            totals = column_totals(water_data, ['overall_usage'])
+            if pagination.enabled:
+                water_page = pagination.paginate(water_data)
+            else:
+                water_page = water_data.order_by("-DatePicker")  # Order by date, descending
+            water_serializer = WaterSerializer(water_page, many=True)
+
+            response_data = {
+                "email": user.email,
+                "water_data": water_serializer.data,
+                "overall_water_usage_total": totals['overall_usage'],
+                "totals": totals,
+            }
+            if pagination.enabled:
+                response_data.update(pagination.page_info())
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except ValueError as e:
             return Response(
@@ -594,14 +656,20 @@ class BiodiversityCreateView(APIView):
         return Response(serializer.errors,status=status.HTTP_400_BAD_REQUEST)
     
 #biodiversity View  
-class BiodiversityView(APIView):
+class BiodiversityView(MetricExportMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get("facility_id", None)
         year = request.GET.get("year", None)
 
+        try:
+            pagination = KeysetPagination(request)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Initialize queryset for Biodiversity data
             biodiversity_data = Biodiversity.objects.filter(user=user)
@@ -610,9 +678,7 @@ class BiodiversityView(APIView):
             if year:
                 try:
                     year = int(year)
-                    start_date = datetime(year, 4, 1)  # Fiscal year starts in April
-                    end_date = datetime(year + 1, 3, 31)  # Ends in March next year
-                    biodiversity_data = biodiversity_data.filter(DatePicker__range=(start_date, end_date))
+                    biodiversity_data = biodiversity_data.filter(fiscal_year=year)  # Fiscal year: April - March
                 except ValueError:
                     return Response(
                         {"error": "Invalid year format. Please provide a valid year, e.g., 2023."},
@@ -623,6 +689,11 @@ class BiodiversityView(APIView):
             if facility_id:
                 biodiversity_data = biodiversity_data.filter(facility__facility_id=facility_id)
 
+            # Raw data download (?format=csv|xlsx) streams every matching row instead of the JSON list
+            export_format = self.export_format(request)
+            if export_format:
+                return export_response(biodiversity_data, export_format, f"biodiversity_data_{year}" if year else "biodiversity_data")
+
             # Check if data exists, otherwise return zero-filled response
             if not biodiversity_data.exists():
                 empty_fields = {
@@ -649,26 +720,28 @@ class BiodiversityView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Serialize and calculate totals
-            biodiversity_data = biodiversity_data.order_by("-DatePicker")  # Order by date, descending
-            biodiversity_serializer = BiodiversitySerializer(biodiversity_data, many=True)
+            # Totals are one aggregate over every matching row, also when only a page is returned
+            totals = column_totals(biodiversity_data, ['no_trees'])
+            if pagination.enabled:
+                biodiversity_page = pagination.paginate(biodiversity_data)
+            else:
+                biodiversity_page = biodiversity_data.order_by("-DatePicker")  # Order by date, descending
+            biodiversity_serializer = BiodiversitySerializer(biodiversity_page, many=True)
             serialized_data = biodiversity_serializer.data
 
-            # Add facility ID to serialized data
-            for data, biodiversity in zip(serialized_data, biodiversity_data):
-                data["facility_id"] = biodiversity.facility.facility_id
-
-            # Calculate overall totals
-            overall_total = sum(biodiversity.no_trees for biodiversity in biodiversity_data)
+            # Add facility ID to serialized data (the foreign key column, no per-row facility query)
+            for data, biodiversity in zip(serialized_data, biodiversity_page):
+                data["facility_id"] = biodiversity.facility_id
 
-            return Response(
-                {
-                    "email": user.email,
-                    "biodiversity_data": serialized_data,
-                    "overall_biodiversity_usage_total": overall_total,
-                },
-                status=status.HTTP_200_OK,
-            )
+            response_data = {
+                "email": user.email,
+                "biodiversity_data": serialized_data,
+                "overall_biodiversity_usage_total": totals['no_trees'],
+                "totals": totals,
+            }
+            if pagination.enabled:
+                response_data.update(pagination.page_info())
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except ValueError as e:
             return Response(
@@ -741,21 +814,27 @@ class LogisticesCreateView(APIView):
             seen.add(key)
 
         # Validate and save
-        serializer = LogisticesSerializer(data=data, many=True, context={'request': request})
+        serializer = LogisticesSerializer(data=data, many=True, context={'request': request, 'upsert': wants_upsert(request)})
         if serializer.is_valid():
             serializer.save(user=request.user)
             return Response({"message": "Logistices data added successfully."}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 #View Logistices
-class LogisticesView(APIView):
+class LogisticesView(MetricExportMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
         year = request.GET.get('year', None)
 
+        try:
+            pagination = KeysetPagination(request)
+        except PaginationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # Initialize queryset for Logistices data
             logistices_data = Logistices.objects.filter(user=user)
@@ -764,9 +843,7 @@ class LogisticesView(APIView):
             if year:
                 try:
                     year = int(year)
-                    start_date = datetime(year, 4, 1)  # Fiscal year starts in April
-                    end_date = datetime(year + 1, 3, 31)  # Ends in March next year
-                    logistices_data = logistices_data.filter(DatePicker__range=(start_date, end_date))
+                    logistices_data = logistices_data.filter(fiscal_year=year)  # Fiscal year: April - March
                 except ValueError:
                     return Response(
                         {"error": "Invalid year format. Please provide a valid year, e.g., 2023."},
@@ -777,6 +854,11 @@ class LogisticesView(APIView):
             if facility_id:
                 logistices_data = logistices_data.filter(facility__facility_id=facility_id)
 
+            # Raw data download (?format=csv|xlsx) streams every matching row instead of the JSON list
+            export_format = self.export_format(request)
+            if export_format:
+                return export_response(logistices_data, export_format, f"logistices_data_{year}" if year else "logistices_data")
+
             # Check if data exists, otherwise return zero-filled response
             if not logistices_data.exists():
                 empty_fields = {
@@ -803,28 +885,28 @@ class LogisticesView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Serialize and calculate totals
-            logistices_data = logistices_data.order_by("-DatePicker")  # Order by date, descending
-            logistices_serializer = LogisticesSerializer(logistices_data, many=True)
+            # Totals are one aggregate over every matching row, also when only a page is returned
+            totals = column_totals(logistices_data, ['fuel_consumption'])
+            if pagination.enabled:
+                logistices_page = pagination.paginate(logistices_data)
+            else:
+                logistices_page = logistices_data.order_by("-DatePicker")  # Order by date, descending
+            logistices_serializer = LogisticesSerializer(logistices_page, many=True)
 
-            # Add facility ID to serialized data
+            # Add facility ID to serialized data (the foreign key column, no per-row facility query)
             serialized_data = logistices_serializer.data
-            for data, logistices in zip(serialized_data, logistices_data):
-                data["facility_id"] = logistices.facility.facility_id
-
-            # Calculate overall total fuel consumption
-            overall_fuel_consumption = sum(
-                logistices.fuel_consumption for logistices in logistices_data
-            )
+            for data, logistices in zip(serialized_data, logistices_page):
+                data["facility_id"] = logistices.facility_id
 
-            return Response(
-                {
-                    "email": user.email,
-                    "logistices_data": serialized_data,
-                    "overall_logistices_usage_total": overall_fuel_consumption,
-                },
-                status=status.HTTP_200_OK,
-            )
+            response_data = {
+                "email": user.email,
+                "logistices_data": serialized_data,
+                "overall_logistices_usage_total": totals['fuel_consumption'],
+                "totals": totals,
+            }
+            if pagination.enabled:
+                response_data.update(pagination.page_info())
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except ValueError as e:
             return Response(
@@ -853,7 +935,11 @@ class LogisticesEditView(APIView):
 
         # Validate and save
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except ValidationError as e:
+                # An entry of the same month, logistices type and fuel type, found by the unique constraint
+                return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
             return Response({"message": "Logistices data updated successfully."}, status=status.HTTP_200_OK)
         else:
             # Return detailed validation errors
@@ -906,73 +992,12 @@ class LogoutView(APIView):
     
 '''OverViwe of allTotal_Usages '''
 
-def calculate_emissions(monthly_energy, monthly_water, monthly_waste, monthly_logistices, yearly_biodiversity):
-    electricity_factor = 0.82
-    fuel_factors = {
-        'coking_coal': 2.66,
-        'coke_oven_coal': 3.1,
-        'natural_gas': 2.7,
-        'diesel': 2.91 * 1000,
-        'biomass_wood': 1.75,
-        'biomass_other_solid': 1.16,
-    }
-    petrol_factor = 2.29 * 1000
-    diesel_factor = 2.91 * 1000
-
-    electricity_emissions = (
-        monthly_energy.aggregate(
-            total=Coalesce(
-                Sum(
-                    F('hvac') + F('production') + F('stp') +
-                    F('admin_block') + F('utilities') + F('others'),
-                    output_field=FloatField()
-                ),
-                0.0
-            )
-        )['total'] or 0.0
-    ) * electricity_factor
-
-    fuel_emissions = sum([
-        (monthly_energy.aggregate(total=Sum(F(fuel), output_field=FloatField()))['total'] or 0) * factor
-        for fuel, factor in fuel_factors.items()
-    ])
-
-    water_emissions = (
-        monthly_water.aggregate(
-            total=Coalesce(
-                Sum(
-                    F('Generated_Water') + F('Recycled_Water') +
-                    F('Softener_usage') + F('Boiler_usage') + F('otherUsage'),
-                    output_field=FloatField()
-                ),
-                0.0
-            )
-        )['total'] or 0.0
-    ) * 0.46
-
-    waste_emissions = sum([
-        (monthly_waste.aggregate(total=Sum(F('Landfill_waste'), output_field=FloatField()))['total'] or 0) * 300,
-        (monthly_waste.aggregate(total=Sum(F('Recycle_waste'), output_field=FloatField()))['total'] or 0) * 10,
-    ])
-
-    logistices_emissions = sum([
-        (monthly_logistices.filter(Typeof_fuel='diesel').aggregate(total=Sum(F('fuel_consumption'), output_field=FloatField()))['total'] or 0) * diesel_factor,
-        (monthly_logistices.filter(Typeof_fuel='petrol').aggregate(total=Sum(F('fuel_consumption'), output_field=FloatField()))['total'] or 0) * petrol_factor,
-    ])
-
-    total_emissions = (
-        electricity_emissions +
-        fuel_emissions +
-        water_emissions +
-        waste_emissions +
-        logistices_emissions
-    )
-
-    return total_emissions
-
 class OverallUsageView(APIView):
+    """Usage totals and emissions of one fiscal year; `?monthly=true` adds the monthly emission breakdown."""
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', 'all').lower()
@@ -989,31 +1014,15 @@ class OverallUsageView(APIView):
 
         # Determine the fiscal year range
         if not year:
-            # Fetch the latest year across all models for the user
-            latest_date = max(
-                [
-                    Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                ],
-                default=None,
-                key=lambda d: d and datetime.combine(d, datetime.min.time()) or datetime.min  # Handle None and convert to datetime
-            )
+            # Latest fiscal year with data, falling back to the current calendar year
+            year = latest_fiscal_year(user, default=datetime.now().year)
 
-            if latest_date:
-                year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-            else:
-                year = datetime.now().year
-                
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
+        # Facility selected by facility_id, resolved once per request; an unknown one selects no data,
+        # so the totals are zero
+        scope = facility_scope(request, facility_id)
 
         # Build filters
-        filters = {'user': user, 'DatePicker__range': (start_date, end_date)}
-        if facility_id != 'all':
-            filters['facility__facility_id'] = facility_id
+        filters = {'user': user, 'fiscal_year': year, **scope.filters}
 
         # Fetch data
         waste_data = Waste.objects.filter(**filters)
@@ -1021,23 +1030,12 @@ class OverallUsageView(APIView):
         water_data = Water.objects.filter(**filters)
         logistices_data = Logistices.objects.filter(**filters)
         
-        # Apply facility_id filter to Biodiversity if it's not "all"
-        biodiversity_filters = {'user': user, 'DatePicker__year': year}
-        if facility_id != 'all':
-            biodiversity_filters['facility__facility_id'] = facility_id
+        # Biodiversity is totalled over the calendar year
+        biodiversity_filters = {'user': user, 'DatePicker__year': year, **scope.filters}
         yearly_biodiversity = Biodiversity.objects.filter(**biodiversity_filters)
 
-        # Calculate total emissions
-        total_emissions = 0
-        for month in [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]:
-            monthly_energy = energy_data.filter(DatePicker__month=month)
-            monthly_water = water_data.filter(DatePicker__month=month)
-            monthly_waste = waste_data.filter(DatePicker__month=month)
-            monthly_logistices = logistices_data.filter(DatePicker__month=month)
-
-            total_emissions += calculate_emissions(
-                monthly_energy, monthly_water, monthly_waste, monthly_logistices, yearly_biodiversity
-            )
+        # Emissions and usage totals of the whole year from one grouped query per model
+        monthly_total_emissions, usage = emissions_and_usage(energy_data, water_data, waste_data, logistices_data)
 
         # Prepare response data with rounded values
         response_data = {
@@ -1045,14 +1043,19 @@ class OverallUsageView(APIView):
             "year": year,
             "facility_id": facility_id if facility_id != 'all' else "All facilities",
             "overall_data": {
-                "waste_usage": round(waste_data.aggregate(total=Sum('overall_usage'))['total'] or 0.0, 2),
-                "energy_usage": round(energy_data.aggregate(total=Sum('overall_usage'))['total'] or 0.0, 2),
-                "water_usage": round(water_data.aggregate(total=Sum('overall_usage'))['total'] or 0.0, 2),
+                "waste_usage": round(usage['waste'], 2),
+                "energy_usage": round(usage['energy'], 2),
+                "water_usage": round(usage['water'], 2),
                 "biodiversity_usage": round(yearly_biodiversity.aggregate(total=Sum('overall_Trees'))['total'] or 0.0, 2),
-                "logistices_usage": round(logistices_data.aggregate(total=Sum('total_fuelconsumption'))['total'] or 0.0, 2),
-                "total_emissions": round(total_emissions, 2),
+                "logistices_usage": round(usage['logistices'], 2),
+                "total_emissions": round(sum(monthly_total_emissions.values()), 2),
             },
         }
+        if request.GET.get('monthly', '').lower() in ('1', 'true', 'yes'):
+            response_data["monthly_emissions"] = [
+                {"month": datetime(1900, month, 1).strftime('%b'), "total_emissions": round(monthly_total_emissions[month], 2)}
+                for month in FISCAL_MONTHS
+            ]
 
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -1063,6 +1066,8 @@ class OverallUsageView(APIView):
 class WasteViewCard_Over(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', 'all')
@@ -1070,8 +1075,10 @@ class WasteViewCard_Over(APIView):
         year = request.GET.get('year')
 
         try:
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
 
             if year:
                 try:
@@ -1081,36 +1088,12 @@ class WasteViewCard_Over(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                
-                
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date,latest_energy_date,latest_biodiversity_date,latest_logistices_date]), default=None)
-                
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            # Query waste data
-            waste_data = Waste.objects.filter(user=user, DatePicker__range=(start_date, end_date))
 
-            # Apply specific facility filter if provided
-            if facility_id != 'all':
-                waste_data = waste_data.filter(facility__facility_id=facility_id)
-
-            # Apply facility location filter if provided
-            if facility_location:
-                waste_data = waste_data.filter(facility__location__icontains=facility_location)
+            # Query waste data of the selected facilities
+            waste_data = Waste.objects.filter(user=user, fiscal_year=year, **scope.filters)
 
             # If no data is found, create a structure with zeros
             waste_fields = [
@@ -1136,7 +1119,7 @@ class WasteViewCard_Over(APIView):
                         waste_data
                         .values('facility__facility_name')
                         .annotate(total=Sum(field))
-                        .order_by('-total')
+                        .order_by('-total', 'facility__facility_name')
                     )
 
                     response_data['facility_waste_data'][field] = [
@@ -1158,10 +1141,17 @@ class WasteViewCard_Over(APIView):
             print(error_message)
             return Response({'error': error_message}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-#FoodWaste
-class FoodWasteOverviewView(APIView):
+# Per-field overview charts
+class MetricOverviewView(APIView):
+    """Monthly line chart and facility donut of one metric; subclasses pick it from dashboard.METRIC_OVERVIEWS.
+
+    Both charts come from a single grouped query over the monthly rollups of that metric.
+    """
     permission_classes = [IsAuthenticated]
+    metric = None
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -1178,70 +1168,15 @@ class FoodWasteOverviewView(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=400)
             else:
-                year = self.get_latest_available_year(user)
+                year = latest_fiscal_year(user)
 
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            # Build filters
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            # Query filtered data
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
-
-            # Line chart data: monthly food waste
-            monthly_food_waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_food_waste=Sum('food_waste'))
-            )
-
-            food_waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_food_waste:
-                food_waste[entry['DatePicker__month']] = entry['total_food_waste']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "food_waste": food_waste[month]
-                }
-                for month in month_order
-            ]
-
-            # Donut chart data: facility contribution
-            facility_food_waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_food_waste=Sum('food_waste'))
-                .order_by('-total_food_waste')
+            # Unknown facilities aren't rejected here: they select no data and give empty charts
+            data = DashboardData(
+                user, year, facility_id, facility_location,
+                rollup_metrics={self.metric.category: [self.metric.field]},
+                scope=facility_scope(request, facility_id, facility_location),
             )
-
-            total_food_waste = sum(entry['total_food_waste'] for entry in facility_food_waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_food_waste'] / total_food_waste * 100) if total_food_waste else 0,
-                }
-                for entry in facility_food_waste
-            ]
-
-            # Construct response
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
+            return Response(metric_overview(self.metric)(data), status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response(
@@ -1249,43 +1184,44 @@ class FoodWasteOverviewView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#FoodWaste
+class FoodWasteOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['FoodWasteOverviewView']
+
+#SolidWaste
+class SolidWasteOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['SolidWasteOverviewView']
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
+#e_waste overview view
+class E_WasteOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['E_WasteOverviewView']
 
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
+#biomedical_waste Overview
+class Biomedical_WasteOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Biomedical_WasteOverviewView']
 
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "food_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+#Liquid_DischargeOverviewView
+class Liquid_DischargeOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Liquid_DischargeOverviewView']
 
-#SolidWaste
-class SolidWasteOverviewView(APIView):
+#OtherOverview
+class OthersOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['OthersOverviewView']
+
+#Sent for RecycleOverview
+class Waste_Sent_For_RecycleOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Waste_Sent_For_RecycleOverviewView']
+
+#Sent For LandFill Overview
+class Waste_Sent_For_LandFillOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Waste_Sent_For_LandFillOverviewView']
+
+#Stacked Graphs Overview
+class StackedWasteOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -1293,738 +1229,580 @@ class SolidWasteOverviewView(APIView):
         year = request.GET.get('year', None)
 
         try:
-            # Determine year
+            filters = {'user': user}
+
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
+
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-
-
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_solid_Waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_solid_Waste=Sum('solid_Waste'))
-            )
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            solid_Waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_solid_Waste:
-                solid_Waste[entry['DatePicker__month']] = entry['total_solid_Waste']
+            filters['fiscal_year'] = year
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "solid_Waste": solid_Waste[month]
-                }
-                for month in month_order
+            waste_types = [
+                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste',
+                'liquid_discharge', 'Recycle_waste', 'Landfill_waste', 'other_waste'
             ]
 
-            # Prepare facility data for donut chart
-            facility_solid_Waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_solid_Waste=Sum('solid_Waste'))
-                .order_by('-total_solid_Waste')
-            )
-
-            total_solid_Waste = sum(entry['total_solid_Waste'] for entry in facility_solid_Waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_solid_Waste'] / total_solid_Waste * 100) if total_solid_Waste else 0,
-                }
-                for entry in facility_solid_Waste
-            ]
+            # Every waste type per month in one grouped query, in fiscal month order (April to March)
+            stacked_bar_data = stacked_bars(Waste.objects.filter(**filters), {
+                waste_type: Coalesce(Sum(waste_type, output_field=FloatField()), Value(0, output_field=FloatField()))
+                for waste_type in waste_types
+            })
 
             response_data = {
+                "facility_id": facility_id,
                 "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "facility_location": facility_location,
+                "stacked_bar_data": stacked_bar_data
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-    
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "solid_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+            print(f"Error occurred: {e}") 
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-#e_waste overview view
-class E_WasteOverviewView(APIView):
+#WasteOverview Donut chart
+class WasteOverallDonutChartView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
-        facility_id = request.GET.get('facility_id', None)
+        year = request.GET.get('year', None)  # Get the 'year' query parameter
+        facility_id = request.GET.get('facility_id', 'all')
         facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
 
         try:
+            # Initialize filters with the user-specific data
+            filters = {'user': user}
+
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
+
+            # Year calculation
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            monthly_E_Waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_E_Waste=Sum('E_Waste'))
-            )
+            filters['fiscal_year'] = year
 
-            E_Waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_E_Waste:
-                E_Waste[entry['DatePicker__month']] = entry['total_E_Waste']
+            # Query the Waste model with the filters applied
+            queryset = Waste.objects.filter(**filters)
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "E_Waste": E_Waste[month]
+            if not queryset.exists():  # If no data is found, return zero values for all waste types
+                waste_totals = {
+                    'food_waste_total': 0.0,
+                    'solid_Waste_total': 0.0,
+                    'E_Waste_total': 0.0,
+                    'Biomedical_waste_total': 0.0,
+                    'other_waste_total': 0.0
                 }
-                for month in month_order
-            ]
+            else:
+                # Aggregate waste totals for each waste type if data is found
+                waste_totals = queryset.aggregate(
+                    food_waste_total=Coalesce(Sum(Cast('food_waste', FloatField())), 0.0),
+                    solid_Waste_total=Coalesce(Sum(Cast('solid_Waste', FloatField())), 0.0),
+                    E_Waste_total=Coalesce(Sum(Cast('E_Waste', FloatField())), 0.0),
+                    Biomedical_waste_total=Coalesce(Sum(Cast('Biomedical_waste', FloatField())), 0.0),
+                    other_waste_total=Coalesce(Sum(Cast('other_waste', FloatField())), 0.0)
+                )
 
-            # Prepare facility data for donut chart
-            facility_E_Waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_E_Waste=Sum('E_Waste'))
-                .order_by('-total_E_Waste')
-            )
+            # Calculate the overall total waste
+            overall_total = sum(waste_totals.values())
 
-            total_E_Waste = sum(entry['total_E_Waste'] for entry in facility_E_Waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_E_Waste'] / total_E_Waste * 100) if total_E_Waste else 0,
-                }
-                for entry in facility_E_Waste
-            ]
+            # Calculate percentages for each waste type
+            waste_percentages = {}
+            for waste_type, total in waste_totals.items():
+                waste_percentages[waste_type] = (total / overall_total) * 100 if overall_total else 0
 
+            # Format the response data
             response_data = {
                 "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "facility_id": facility_id,
+                "facility_location": facility_location,
+                "waste_percentages": waste_percentages
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "E_Waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+            # Log the error for debugging purposes
+            print(f"Error occurred: {e}")
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-#biomedical_waste Overview
-class Biomedical_WasteOverviewView(APIView):
+#SenT to Landfill Overview Piechart
+class SentToLandfillOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
 
+        # Get parameters from the request
+        year = request.GET.get('year', None)
+        facility_id = request.GET.get('facility_id', 'all')
+        facility_location = request.GET.get('facility_location', 'all')
+        
         try:
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Validate and determine fiscal year
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_Biomedical_waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_Biomedical_waste=Sum('Biomedical_waste'))
-            )
+            # Initialize filters
+            filters = {'user': user, 'fiscal_year': year, **scope.filters}
 
-            Biomedical_waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Biomedical_waste:
-                Biomedical_waste[entry['DatePicker__month']] = entry['total_Biomedical_waste']
+            # Start with the base queryset
+            queryset = Waste.objects.filter(**filters)
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Biomedical_waste": Biomedical_waste[month]
+            if not queryset.exists():
+                # Return zero data if no matching records
+                response_data = {
+                    "landfill_percentage": 0,
+                    "remaining_percentage": 0
                 }
-                for month in month_order
+                return Response(
+                    {
+                        "year": year,
+                        "sentToLandFill": response_data
+                    },
+                    status=status.HTTP_200_OK
+                )
+
+            # Define waste fields for calculations
+            overall_total_fields = [
+                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste'
             ]
 
-            # Prepare facility data for donut chart
-            facility_Biomedical_waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_Biomedical_waste=Sum('Biomedical_waste'))
-                .order_by('-total_Biomedical_waste')
+            # Calculate total 'Landfill_waste'
+            Landfill_waste_total = queryset.aggregate(
+                total=Coalesce(Sum(Cast('Landfill_waste', FloatField())), 0.0)
+            )['total']
+
+            # Calculate overall total waste
+            overall_totals = queryset.aggregate(
+                **{f"{waste_type}_total": Coalesce(Sum(Cast(waste_type, FloatField())), 0.0)
+                   for waste_type in overall_total_fields}
             )
+            overall_total = sum(overall_totals.values())
 
-            total_Biomedical_waste = sum(entry['total_Biomedical_waste'] for entry in facility_Biomedical_waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Biomedical_waste'] / total_Biomedical_waste * 100) if total_Biomedical_waste else 0,
-                }
-                for entry in facility_Biomedical_waste
-            ]
+            # Calculate remaining waste and percentages
+            remaining_waste_total = overall_total - Landfill_waste_total
+            
+            landfill_percentage = (Landfill_waste_total / overall_total) * 100 if overall_total else 0
+            remaining_percentage = (remaining_waste_total / overall_total) * 100 if overall_total else 0
 
+            # Prepare the response data
             response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "landfill_percentage": round(landfill_percentage, 2),
+                "remaining_percentage": round(remaining_percentage, 2)
             }
 
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
             return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {
+                    "year": year,
+                    "sentToLandFill": response_data
+                },
+                status=status.HTTP_200_OK
             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Biomedical_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+        except ValueError:
+            return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Error occurred: {e}")
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-#Liquid_DischargeOverviewView
-class Liquid_DischargeOverviewView(APIView):
+#Sent to Recycle Overview Piechart
+class SentToRecycledOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
+
+        # Get parameters from the request
+        year = request.GET.get('year', None)
         facility_id = request.GET.get('facility_id', None)
         facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
+    
         try:
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Validate and determine fiscal year
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            monthly_liquid_discharge = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_liquid_discharge=Sum('liquid_discharge'))
-            )
+            # Initialize filters
+            filters = {'user': user, 'fiscal_year': year, **scope.filters}
 
-            liquid_discharge = {month: 0 for month in range(1, 13)}
-            for entry in monthly_liquid_discharge:
-                liquid_discharge[entry['DatePicker__month']] = entry['total_liquid_discharge']
+            # Start with the base queryset
+            queryset = Waste.objects.filter(**filters)
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "liquid_discharge": liquid_discharge[month]
+            if not queryset.exists():
+                # Return zero data if no matching records
+                response_data = {
+                    "recycle_percentage": 0,
+                    "remaining_percentage": 0
                 }
-                for month in month_order
+                return Response(
+                    {
+                        "year":year,
+                        "SentToRecycle": response_data
+                    },
+                    status=status.HTTP_200_OK
+                )
+
+            # Define waste fields for calculations
+            overall_total_fields = [
+                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste'
             ]
 
-            # Prepare facility data for donut chart
-            facility_liquid_discharge = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_liquid_discharge=Sum('liquid_discharge'))
-                .order_by('-total_liquid_discharge')
+        # Calculate total 'Landfill_waste'
+            Recycle_waste_total = queryset.aggregate(
+                total=Coalesce(Sum(Cast('Recycle_waste', FloatField())), 0.0)
+            )['total']
+
+            # Calculate overall total waste
+            overall_totals = queryset.aggregate(
+                **{f"{waste_type}_total": Coalesce(Sum(Cast(waste_type, FloatField())), 0.0)
+                for waste_type in overall_total_fields}
             )
+            overall_total = sum(overall_totals.values())
 
-            total_liquid_discharge = sum(entry['total_liquid_discharge'] for entry in facility_liquid_discharge)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_liquid_discharge'] / total_liquid_discharge * 100) if total_liquid_discharge else 0,
-                }
-                for entry in facility_liquid_discharge
-            ]
+            # Calculate remaining waste and percentages
+            remaining_waste_total = overall_total - Recycle_waste_total
+        
+            recycle_percentage = (Recycle_waste_total / overall_total) * 100 if overall_total else 0
+            remaining_percentage = (remaining_waste_total / overall_total) * 100 if overall_total else 0
 
+            # Prepare the response data
             response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "recycle_percentage": round(recycle_percentage, 2),
+                "remaining_percentage": round(remaining_percentage, 2)
             }
 
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
             return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {
+                    "year":year,
+                    "SentToRecycle": response_data
+                },
+                status=status.HTTP_200_OK
             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+        except ValueError:
+            return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Error occurred: {e}")
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "liquid_discharge": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
 
-#OtherOverview
-class OthersOverviewView(APIView):
+'''Waste Overviewgraphs and Individual Line charts and donut charts Ends'''
+
+
+'''Energy  Overview Cards ,Graphs and Individual line charts and donut charts Starts'''
+#Energy Overview Cards
+class EnergyViewCard_Over(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
+        facility_id = request.GET.get('facility_id', 'all')
+        facility_location = request.GET.get('facility_location')
+        year = request.GET.get('year')
 
         try:
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Validate year
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            start_date, end_date = self.get_fiscal_year_range(year)
 
+            # Query energy data of the selected facilities
+            energy_data = Energy.objects.filter(user=user, fiscal_year=year, **scope.filters)
 
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
+            energy_fields = [
+                'hvac', 'production', 'stp', 'admin_block',
+                'utilities', 'others', 'renewable_solar', 'renewable_other', 'coking_coal', 
+                'coke_oven_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid'
+            ]
+
+            response_data = {
+                'year': year,
+                'overall_energy_totals': {}
             }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
 
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
+            if not energy_data.exists():
+                # Populate only specific fields with zero values when no data exists
+                zero_fields = ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others']
+                response_data['overall_energy_totals'] = {
+                    f"overall_{field}": 0.0 for field in zero_fields
+                }
+                response_data['overall_energy_totals']['overall_fuel_used_in_operations'] = 0.0
+                response_data['overall_energy_totals']['overall_renewable_energy'] = 0.0
+            else:
+                # Initialize counters for renewable energy and fuel usage totals
+                fuel_used_in_operations_total = 0
+                renewable_energy_total = 0
 
-            monthly_other_waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_other_waste=Sum('other_waste'))
-            )
+                for field in energy_fields:
+                    # Aggregate total for each field
+                    overall_total = energy_data.aggregate(total=Sum(field))['total'] or 0
 
-            other_waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_other_waste:
-                other_waste[entry['DatePicker__month']] = entry['total_other_waste']
+                    # Add renewable energy (sum of renewable_solar and renewable_other)
+                    if field in ['renewable_solar', 'renewable_other']:
+                        renewable_energy_total += overall_total
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "other_waste": other_waste[month]
-                }
-                for month in month_order
-            ]
+                    # Add to fuel usage totals
+                    if field in ['coke_oven_coal', 'coking_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid']:
+                        fuel_used_in_operations_total += overall_total
 
-            # Prepare facility data for donut chart
-            facility_other_waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_other_waste=Sum('other_waste'))
-                .order_by('-total_other_waste')
-            )
-
-            total_other_waste = sum(entry['total_other_waste'] for entry in facility_other_waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_other_waste'] / total_other_waste * 100) if total_other_waste else 0,
-                }
-                for entry in facility_other_waste
-            ]
+                    # Include other fields in the response
+                    if field not in ['renewable_solar', 'renewable_other', 'coke_oven_coal', 'coking_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid']:
+                        response_data['overall_energy_totals'][f"overall_{field}"] = overall_total
 
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
+                # Set the calculated totals for renewable energy and fuel used in operations
+                response_data['overall_energy_totals']['overall_fuel_used_in_operations'] = fuel_used_in_operations_total
+                response_data['overall_energy_totals']['overall_renewable_energy'] = renewable_energy_total
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            error_message = f"An error occurred: {str(e)}"
+            print(error_message)
+            return Response({'error': error_message}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#HVAC Line Charts and Donut Chart 
+class HVACOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['HVACOverviewView']
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year 
+#ProductionLine Charts and Donut charts
+class ProductionOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['ProductionOverviewView']
 
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
+#STP Overview line charts and donut charts
+class StpOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['StpOverviewView']
 
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "other_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+#Admin_block Overview Linecharts and donut charts
+class Admin_BlockOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Admin_BlockOverviewView']
 
-#Sent for RecycleOverview
-class Waste_Sent_For_RecycleOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
+#Utilities_OverView Linecharts and Donut Charts
+class Utilities_OverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Utilities_OverviewView']
 
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
+# Others Overview Linecharts andDonut charts
+class Others_OverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Others_OverviewView']
 
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
+#Renewable_EnergyOverview Line Charts And Donut Charts
+# class Renewable_EnergyOverView(APIView):
+#     permission_classes = [IsAuthenticated]
 
-            start_date, end_date = self.get_fiscal_year_range(year)
+#     def get(self, request):
+#         user = request.user
+#         facility_id = request.GET.get('facility_id', None)
+#         facility_location = request.GET.get('facility_location', None)
+#         year = request.GET.get('year', None)
 
+#         try:
+#             # Initialize filters
+#             filters = {'user': user}
 
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
+#             # Determine fiscal year range
+#             if facility_id and facility_id.lower() != 'all':
+#                 if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
+#                     return Response(
+#                         {'error': 'Invalid facility ID or not associated with the logged-in user.'},
+#                         status=status.HTTP_400_BAD_REQUEST
+#                     )
+#                 filters['facility__facility_id'] = facility_id
 
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
+#             # Facility Location validation and filtering
+#             if facility_location and facility_location.lower() != 'all':
+#                 if not Facility.objects.filter(location__icontains=facility_location).exists():
+#                     return Response(
+#                         {'error': f'No facility found with location {facility_location}.'},
+#                         status=status.HTTP_400_BAD_REQUEST
+#                     )
+#                 filters['facility__location__icontains'] = facility_location
 
-            monthly_Recycle_waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_Recycle_waste=Sum('Recycle_waste'))
-            )
+#             # Year validation and filtering
+#             if year:
+#                 try:
+#                     year = int(year)
+#                     if year < 1900 or year > datetime.now().year + 10:
+#                         return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+#                 except ValueError:
+#                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+#             else:
+#                 # Find the latest year across all models (Water, Waste, etc.)
+#                 latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
+#                 latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
+#                 latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
+#                 latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
+#                 latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
 
-            Recycle_waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Recycle_waste:
-                Recycle_waste[entry['DatePicker__month']] = entry['total_Recycle_waste']
+#                 latest_date = max(
+#                     filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
+#                     default=None
+#                 )
+#                 if latest_date:
+#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
+#                 else:
+#                     # Default to the current fiscal year if no data exists
+#                     today = datetime.now()
+#                     year = today.year - 1 if today.month < 4 else today.year
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Recycle_waste": Recycle_waste[month]
-                }
-                for month in month_order
-            ]
+#             # Determine fiscal year range
+#             start_date = datetime(year, 4, 1)
+#             end_date = datetime(year + 1, 3, 31)
+#             filters['DatePicker__range'] = (start_date, end_date)
 
-            # Prepare facility data for donut chart
-            facility_Recycle_waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_Recycle_waste=Sum('Recycle_waste'))
-                .order_by('-total_Recycle_waste')
-            )
+#             # Apply additional filters for facility
+#             if facility_id and facility_id.lower() != 'all':
+#                 filters['facility__facility_id'] = facility_id
+#             if facility_location:
+#                 filters['facility__facility_location__icontains'] = facility_location
 
-            total_Recycle_waste = sum(entry['total_Recycle_waste'] for entry in facility_Recycle_waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Recycle_waste'] / total_Recycle_waste * 100) if total_Recycle_waste else 0,
-                }
-                for entry in facility_Recycle_waste
-            ]
+#             # Query monthly renewable energy data
+#             monthly_renewable_energy = (
+#                 Energy.objects.filter(**filters)
+#                 .values('DatePicker__month')
+#                 .annotate(
+#                     total_solar=Sum('renewable_solar'),
+#                     total_other=Sum('renewable_other')
+#                 )
+#                 .order_by('DatePicker__month')
+#             )
 
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
+#             # Map data to fiscal year months
+#             renewable_energy = defaultdict(float)
+#             for entry in monthly_renewable_energy:
+#                 month = entry['DatePicker__month']
+#                 total_energy = entry['total_solar'] + entry['total_other']
+#                 renewable_energy[month] = total_energy
 
-            return Response(response_data, status=status.HTTP_200_OK)
+#             # Prepare line chart data
+#             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
+#             line_chart_data = []
+#             for month in month_order:
+#                 month_name = datetime(1900, month, 1).strftime('%b')
+#                 line_chart_data.append({
+#                     "month": month_name,
+#                     "renewable_energy": renewable_energy.get(month, 0)
+#                 })
 
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+#             # Query facility-wise renewable energy data
+#             facility_filters = {
+#                 'user': user,
+#                 'DatePicker__range': (start_date, end_date)
+#             }
+#             if facility_id and facility_id.lower() != 'all':
+#                 facility_filters['facility__facility_id'] = facility_id
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#             facility_renewable_energy = (
+#                 Energy.objects.filter(**facility_filters)
+#                 .values('facility__facility_name')
+#                 .annotate(total_renewable_energy=Sum('renewable_solar') + Sum('renewable_other'))
+#                 .order_by('-total_renewable_energy')
+#             )
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Recycle_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+#             # Calculate total renewable energy for percentage calculations
+#             total_renewable_energy = sum(entry['total_renewable_energy'] for entry in facility_renewable_energy)
 
-#Sent For LandFill Overview
-class Waste_Sent_For_LandFillOverviewView(APIView):
+#             # Prepare donut chart data
+#             donut_chart_data = [
+#                 {
+#                     "facility_name": entry['facility__facility_name'],
+#                     "percentage": (entry['total_renewable_energy'] / total_renewable_energy * 100) if total_renewable_energy else 0,
+#                 }
+#                 for entry in facility_renewable_energy
+#             ]
+
+#             # Prepare and return response
+#             response_data = {
+#                 "year": year,
+#                 "line_chart_data": line_chart_data,
+#                 "donut_chart_data": donut_chart_data
+#             }
+
+#             return Response(response_data, status=status.HTTP_200_OK)
+
+#         except Exception as e:
+#             return Response(
+#                 {'error': f'An error occurred while processing your request: {str(e)}'},
+#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
+#             )
+
+class Renewable_EnergyOverView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -2032,65 +1810,72 @@ class Waste_Sent_For_LandFillOverviewView(APIView):
         year = request.GET.get('year', None)
 
         try:
-            if not year:
-                year = self.get_latest_available_year(user)
-
-            try:
-                year = int(year)
-            except ValueError:
-                return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+            # Initialize filters
+            filters = {'user': user}
 
-            start_date, end_date = self.get_fiscal_year_range(year)
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
+            # Year validation and filtering
+            if year:
+                try:
+                    year = int(year)
+                    if year < 1900 or year > datetime.now().year + 10:
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+                except ValueError:
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            waste_data = Waste.objects.filter(**filters)
-            if not waste_data.exists():
-                return self.get_empty_response(year)
+            filters['fiscal_year'] = year
 
-            monthly_Landfill_waste = (
-                waste_data
-                .values('DatePicker__month')
-                .annotate(total_Landfill_waste=Sum('Landfill_waste'))
+            # Query monthly renewable energy data
+            monthly_renewable_energy = (
+                Energy.objects.filter(**filters)
+                .values('fiscal_month')
+                .annotate(
+                    total_solar=Sum('renewable_solar'),
+                    total_other=Sum('renewable_other')
+                )
+                .order_by('fiscal_month')
             )
 
-            Landfill_waste = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Landfill_waste:
-                Landfill_waste[entry['DatePicker__month']] = entry['total_Landfill_waste']
+            # Map data to fiscal year months
+            renewable_energy = defaultdict(float)
+            for entry in monthly_renewable_energy:
+                month = calendar_month(entry['fiscal_month'])
+                total_energy = entry['total_solar'] + entry['total_other']
+                renewable_energy[month] = total_energy
 
+            # Prepare line chart data
             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Landfill_waste": Landfill_waste[month]
-                }
-                for month in month_order
-            ]
+            line_chart_data = []
+            for month in month_order:
+                month_name = datetime(1900, month, 1).strftime('%b')
+                line_chart_data.append({
+                    "month": month_name,
+                    "renewable_energy": renewable_energy.get(month, 0)
+                })
 
-            # Prepare facility data for donut chart
-            facility_Landfill_waste = (
-                waste_data
-                .values('facility__facility_name')
-                .annotate(total_Landfill_waste=Sum('Landfill_waste'))
-                .order_by('-total_Landfill_waste')
-            )
+            # Query facility-wise renewable energy data (narrowed by facility_id only)
+            facility_filters = {
+                'user': user,
+                'fiscal_year': year,
+                **facility_scope(request, facility_id).filters,
+            }
 
-            total_Landfill_waste = sum(entry['total_Landfill_waste'] for entry in facility_Landfill_waste)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Landfill_waste'] / total_Landfill_waste * 100) if total_Landfill_waste else 0,
-                }
-                for entry in facility_Landfill_waste
-            ]
+            # Donut over all facilities of the user, with zero values for those without renewable energy data
+            donut_chart_data = facility_donut(
+                Energy.objects.filter(**facility_filters),
+                Sum('renewable_solar') + Sum('renewable_other'),
+                facility_names(user),
+            )
 
+            # Prepare and return response
             response_data = {
                 "year": year,
                 "line_chart_data": line_chart_data,
@@ -2100,2402 +1885,122 @@ class Waste_Sent_For_LandFillOverviewView(APIView):
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
             return Response(
                 {'error': f'An error occurred while processing your request: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Landfill_waste": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#Stacked Graphs Overview
-class StackedWasteOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            filters = {'user': user}
-
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
-
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            waste_types = [
-                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste',
-                'liquid_discharge', 'Recycle_waste', 'Landfill_waste', 'other_waste'
-            ]
-
-            # Initialize monthly data dictionary
-            monthly_data = {month: {waste_type: 0 for waste_type in waste_types} for month in range(1, 13)}
-
-            # Fetch and aggregate monthly data
-            queryset = Waste.objects.filter(**filters)
-            if queryset.exists():
-                for waste_type in waste_types:
-                    monthly_waste = (
-                        queryset
-                        .values('DatePicker__month')
-                        .annotate(total=Coalesce(Sum(waste_type, output_field=FloatField()), Value(0, output_field=FloatField())))
-                        .order_by('DatePicker__month')
-                    )
-                    for entry in monthly_waste:
-                        month = entry['DatePicker__month']
-                        monthly_data[month][waste_type] = entry['total']
-
-            # Prepare response data in fiscal month order (April to March)
-            stacked_bar_data = []
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            for month in month_order:
-                month_name = datetime(1900, month, 1).strftime('%b')
-                stacked_bar_data.append({
-                    "month": month_name,
-                    **monthly_data[month]
-                })
-
-            response_data = {
-                "facility_id": facility_id,
-                "year": year,
-                "facility_location": facility_location,
-                "stacked_bar_data": stacked_bar_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            print(f"Error occurred: {e}") 
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#WasteOverview Donut chart
-class WasteOverallDonutChartView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        year = request.GET.get('year', None)  # Get the 'year' query parameter
-        facility_id = request.GET.get('facility_id', 'all')
-        facility_location = request.GET.get('facility_location', None)
-
-        try:
-            # Initialize filters with the user-specific data
-            filters = {'user': user}
-
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-            elif facility_id != 'all':
-                filters['facility__facility_id'] = facility_id
-
-            # Facility location filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(facility_location__icontains=facility_location).exists():
-                    return Response({'error': f'No facility found with location {facility_location}.'}, status=status.HTTP_400_BAD_REQUEST)
-                filters['facility__facility_location__icontains'] = facility_location
-
-            # Year calculation
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistics_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistics_date]), default=None)
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            # Query the Waste model with the filters applied
-            queryset = Waste.objects.filter(**filters)
-
-            if not queryset.exists():  # If no data is found, return zero values for all waste types
-                waste_totals = {
-                    'food_waste_total': 0.0,
-                    'solid_Waste_total': 0.0,
-                    'E_Waste_total': 0.0,
-                    'Biomedical_waste_total': 0.0,
-                    'other_waste_total': 0.0
-                }
-            else:
-                # Aggregate waste totals for each waste type if data is found
-                waste_totals = queryset.aggregate(
-                    food_waste_total=Coalesce(Sum(Cast('food_waste', FloatField())), 0.0),
-                    solid_Waste_total=Coalesce(Sum(Cast('solid_Waste', FloatField())), 0.0),
-                    E_Waste_total=Coalesce(Sum(Cast('E_Waste', FloatField())), 0.0),
-                    Biomedical_waste_total=Coalesce(Sum(Cast('Biomedical_waste', FloatField())), 0.0),
-                    other_waste_total=Coalesce(Sum(Cast('other_waste', FloatField())), 0.0)
-                )
-
-            # Calculate the overall total waste
-            overall_total = sum(waste_totals.values())
-
-            # Calculate percentages for each waste type
-            waste_percentages = {}
-            for waste_type, total in waste_totals.items():
-                waste_percentages[waste_type] = (total / overall_total) * 100 if overall_total else 0
-
-            # Format the response data
-            response_data = {
-                "year": year,
-                "facility_id": facility_id,
-                "facility_location": facility_location,
-                "waste_percentages": waste_percentages
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            # Log the error for debugging purposes
-            print(f"Error occurred: {e}")
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#SenT to Landfill Overview Piechart
-class SentToLandfillOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get_fiscal_year_dates(self, year):
-        start_date = datetime(year, 4, 1)  # Fiscal year starts on April 1
-        end_date = datetime(year + 1, 3, 31)  # Ends on March 31 of the next year
-        return start_date, end_date
-
-    def get(self, request):
-        user = request.user
-
-        # Get parameters from the request
-        year = request.GET.get('year', None)
-        facility_id = request.GET.get('facility_id', 'all')
-        facility_location = request.GET.get('facility_location', 'all')
-        
-        try:
-            # Validate facility ID
-            if facility_id.lower() != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Validate and determine fiscal year
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistics_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistics_date]), default=None)
-
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            start_date, end_date = self.get_fiscal_year_dates(year)
-
-            # Initialize filters
-            filters = {'user': user, 'DatePicker__range': (start_date, end_date)}
-
-            # Apply facility ID filter
-            if facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-
-            # Apply facility location filter
-            if facility_location.lower() != 'all':
-                filters['facility__facility_location__icontains'] = facility_location
-
-            # Start with the base queryset
-            queryset = Waste.objects.filter(**filters)
-
-            if not queryset.exists():
-                # Return zero data if no matching records
-                response_data = {
-                    "landfill_percentage": 0,
-                    "remaining_percentage": 0
-                }
-                return Response(
-                    {
-                        "year": year,
-                        "sentToLandFill": response_data
-                    },
-                    status=status.HTTP_200_OK
-                )
-
-            # Define waste fields for calculations
-            overall_total_fields = [
-                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste'
-            ]
-
-            # Calculate total 'Landfill_waste'
-            Landfill_waste_total = queryset.aggregate(
-                total=Coalesce(Sum(Cast('Landfill_waste', FloatField())), 0.0)
-            )['total']
-
-            # Calculate overall total waste
-            overall_totals = queryset.aggregate(
-                **{f"{waste_type}_total": Coalesce(Sum(Cast(waste_type, FloatField())), 0.0)
-                   for waste_type in overall_total_fields}
-            )
-            overall_total = sum(overall_totals.values())
-
-            # Calculate remaining waste and percentages
-            remaining_waste_total = overall_total - Landfill_waste_total
-            
-            landfill_percentage = (Landfill_waste_total / overall_total) * 100 if overall_total else 0
-            remaining_percentage = (remaining_waste_total / overall_total) * 100 if overall_total else 0
-
-            # Prepare the response data
-            response_data = {
-                "landfill_percentage": round(landfill_percentage, 2),
-                "remaining_percentage": round(remaining_percentage, 2)
-            }
-
-            return Response(
-                {
-                    "year": year,
-                    "sentToLandFill": response_data
-                },
-                status=status.HTTP_200_OK
-            )
-
-        except ValueError:
-            return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#Sent to Recycle Overview Piechart
-class SentToRecycledOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get_fiscal_year_dates(self, year):
-        start_date = datetime(year, 4, 1)  # Fiscal year starts on April 1
-        end_date = datetime(year + 1, 3, 31)  # Ends on March 31 of the next year
-        return start_date, end_date
-
-    def get(self, request):
-        user = request.user
-
-        # Get parameters from the request
-        year = request.GET.get('year', None)
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-    
-        try:
-            # Default to the current fiscal year if no year is provided
-            if facility_id and facility_id.lower() != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Validate and determine fiscal year
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistics_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistics_date]), default=None)
-
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            start_date, end_date = self.get_fiscal_year_dates(year)
-
-            # Initialize filters
-            filters = {'user': user, 'DatePicker__range': (start_date, end_date)}
-
-            # Start with the base queryset
-            queryset = Waste.objects.filter(**filters)
-
-            # Apply facility_id filter if provided and not 'all'
-            if facility_id and facility_id.lower() != 'all':
-                queryset = queryset.filter(facility__facility_id=facility_id)
-
-            # Apply facility_location filter if provided and not 'all'
-            if facility_location and facility_location.lower() != 'all':
-                queryset = queryset.filter(facility__facility_location__icontains=facility_location)
-
-            if not queryset.exists():
-                # Return zero data if no matching records
-                response_data = {
-                    "recycle_percentage": 0,
-                    "remaining_percentage": 0
-                }
-                return Response(
-                    {
-                        "year":year,
-                        "SentToRecycle": response_data
-                    },
-                    status=status.HTTP_200_OK
-                )
-
-            # Define waste fields for calculations
-            overall_total_fields = [
-                'food_waste', 'solid_Waste', 'E_Waste', 'Biomedical_waste', 'other_waste'
-            ]
-
-        # Calculate total 'Landfill_waste'
-            Recycle_waste_total = queryset.aggregate(
-                total=Coalesce(Sum(Cast('Recycle_waste', FloatField())), 0.0)
-            )['total']
-
-            # Calculate overall total waste
-            overall_totals = queryset.aggregate(
-                **{f"{waste_type}_total": Coalesce(Sum(Cast(waste_type, FloatField())), 0.0)
-                for waste_type in overall_total_fields}
-            )
-            overall_total = sum(overall_totals.values())
-
-            # Calculate remaining waste and percentages
-            remaining_waste_total = overall_total - Recycle_waste_total
-        
-            recycle_percentage = (Recycle_waste_total / overall_total) * 100 if overall_total else 0
-            remaining_percentage = (remaining_waste_total / overall_total) * 100 if overall_total else 0
-
-            # Prepare the response data
-            response_data = {
-                "recycle_percentage": round(recycle_percentage, 2),
-                "remaining_percentage": round(remaining_percentage, 2)
-            }
-
-            return Response(
-                {
-                    "year":year,
-                    "SentToRecycle": response_data
-                },
-                status=status.HTTP_200_OK
-            )
-
-        except ValueError:
-            return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-'''Waste Overviewgraphs and Individual Line charts and donut charts Ends'''
-
-
-'''Energy  Overview Cards ,Graphs and Individual line charts and donut charts Starts'''
-#Energy Overview Cards
-class EnergyViewCard_Over(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', 'all')
-        facility_location = request.GET.get('facility_location')
-        year = request.GET.get('year')
-
-        try:
-            # Validate facility_id
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Validate year
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                
-                
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date,latest_energy_date,latest_biodiversity_date,latest_logistices_date]), default=None)
-                
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-
-            # Query energy data
-            energy_data = Energy.objects.filter(user=user, DatePicker__range=(start_date, end_date))
-
-            if facility_id != 'all':
-                energy_data = energy_data.filter(facility__facility_id=facility_id)
-
-            if facility_location:
-                energy_data = energy_data.filter(facility__location__icontains=facility_location)
-
-            energy_fields = [
-                'hvac', 'production', 'stp', 'admin_block',
-                'utilities', 'others', 'renewable_solar', 'renewable_other', 'coking_coal', 
-                'coke_oven_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid'
-            ]
-
-            response_data = {
-                'year': year,
-                'overall_energy_totals': {}
-            }
-
-            if not energy_data.exists():
-                # Populate only specific fields with zero values when no data exists
-                zero_fields = ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others']
-                response_data['overall_energy_totals'] = {
-                    f"overall_{field}": 0.0 for field in zero_fields
-                }
-                response_data['overall_energy_totals']['overall_fuel_used_in_operations'] = 0.0
-                response_data['overall_energy_totals']['overall_renewable_energy'] = 0.0
-            else:
-                # Initialize counters for renewable energy and fuel usage totals
-                fuel_used_in_operations_total = 0
-                renewable_energy_total = 0
-
-                for field in energy_fields:
-                    # Aggregate total for each field
-                    overall_total = energy_data.aggregate(total=Sum(field))['total'] or 0
-
-                    # Add renewable energy (sum of renewable_solar and renewable_other)
-                    if field in ['renewable_solar', 'renewable_other']:
-                        renewable_energy_total += overall_total
-
-                    # Add to fuel usage totals
-                    if field in ['coke_oven_coal', 'coking_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid']:
-                        fuel_used_in_operations_total += overall_total
-
-                    # Include other fields in the response
-                    if field not in ['renewable_solar', 'renewable_other', 'coke_oven_coal', 'coking_coal', 'natural_gas', 'diesel', 'biomass_wood', 'biomass_other_solid']:
-                        response_data['overall_energy_totals'][f"overall_{field}"] = overall_total
-
-                # Set the calculated totals for renewable energy and fuel used in operations
-                response_data['overall_energy_totals']['overall_fuel_used_in_operations'] = fuel_used_in_operations_total
-                response_data['overall_energy_totals']['overall_renewable_energy'] = renewable_energy_total
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            error_message = f"An error occurred: {str(e)}"
-            print(error_message)
-            return Response({'error': error_message}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#HVAC Line Charts and Donut Chart 
-class HVACOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_hvac = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_hvac=Sum('hvac'))
-            )
-
-            hvac = {month: 0 for month in range(1, 13)}
-            for entry in monthly_hvac:
-                hvac[entry['DatePicker__month']] = entry['total_hvac']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "hvac": hvac[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_hvac = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_hvac=Sum('hvac'))
-                .order_by('-total_hvac')
-            )
-
-            total_hvac = sum(entry['total_hvac'] for entry in facility_hvac)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_hvac'] / total_hvac * 100) if total_hvac else 0,
-                }
-                for entry in facility_hvac
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "hvac": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#ProductionLine Charts and Donut charts
-class ProductionOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_production = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_production=Sum('production'))
-            )
-
-            production = {month: 0 for month in range(1, 13)}
-            for entry in monthly_production:
-                production[entry['DatePicker__month']] = entry['total_production']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "production": production[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_production = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_production=Sum('production'))
-                .order_by('-total_production')
-            )
-
-            total_production = sum(entry['total_production'] for entry in facility_production)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_production'] / total_production * 100) if total_production else 0,
-                }
-                for entry in facility_production
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "production": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#STP Overview line charts and donut charts
-class StpOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_stp = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_stp=Sum('stp'))
-            )
-
-            stp = {month: 0 for month in range(1, 13)}
-            for entry in monthly_stp:
-                stp[entry['DatePicker__month']] = entry['total_stp']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "stp": stp[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_stp = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_stp=Sum('stp'))
-                .order_by('-total_stp')
-            )
-
-            total_stp = sum(entry['total_stp'] for entry in facility_stp)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_stp'] / total_stp * 100) if total_stp else 0,
-                }
-                for entry in facility_stp
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "stp": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#Admin_block Overview Linecharts and donut charts
-class Admin_BlockOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_admin_block = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_admin_block=Sum('admin_block'))
-            )
-
-            admin_block = {month: 0 for month in range(1, 13)}
-            for entry in monthly_admin_block:
-                admin_block[entry['DatePicker__month']] = entry['total_admin_block']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "admin_block": admin_block[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_admin_block = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_admin_block=Sum('admin_block'))
-                .order_by('-total_admin_block')
-            )
-
-            total_admin_block = sum(entry['total_admin_block'] for entry in facility_admin_block)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_admin_block'] / total_admin_block * 100) if total_admin_block else 0,
-                }
-                for entry in facility_admin_block
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "admin_block": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#Utilities_OverView Linecharts and Donut Charts
-class Utilities_OverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_utilities = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_utilities=Sum('utilities'))
-            )
-
-            utilities = {month: 0 for month in range(1, 13)}
-            for entry in monthly_utilities:
-                utilities[entry['DatePicker__month']] = entry['total_utilities']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "utilities": utilities[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_utilities = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_utilities=Sum('utilities'))
-                .order_by('-total_utilities')
-            )
-
-            total_utilities = sum(entry['total_utilities'] for entry in facility_utilities)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_utilities'] / total_utilities * 100) if total_utilities else 0,
-                }
-                for entry in facility_utilities
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "utilities": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-# Others Overview Linecharts andDonut charts
-class Others_OverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            energy_data = Energy.objects.filter(**filters)
-            if not energy_data.exists():
-                return self.get_empty_response(year)
-
-            monthly_others = (
-                energy_data
-                .values('DatePicker__month')
-                .annotate(total_others=Sum('others'))
-            )
-
-            others = {month: 0 for month in range(1, 13)}
-            for entry in monthly_others:
-                others[entry['DatePicker__month']] = entry['total_others']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "others": others[month]
-                }
-                for month in month_order
-            ]
-
-            # Prepare facility data for donut chart
-            facility_others = (
-                energy_data
-                .values('facility__facility_name')
-                .annotate(total_others=Sum('others'))
-                .order_by('-total_others')
-            )
-
-            total_others = sum(entry['total_others'] for entry in facility_others)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_others'] / total_others * 100) if total_others else 0,
-                }
-                for entry in facility_others
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "others": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#Renewable_EnergyOverview Line Charts And Donut Charts
-# class Renewable_EnergyOverView(APIView):
-#     permission_classes = [IsAuthenticated]
-
-#     def get(self, request):
-#         user = request.user
-#         facility_id = request.GET.get('facility_id', None)
-#         facility_location = request.GET.get('facility_location', None)
-#         year = request.GET.get('year', None)
-
-#         try:
-#             # Initialize filters
-#             filters = {'user': user}
-
-#             # Determine fiscal year range
-#             if facility_id and facility_id.lower() != 'all':
-#                 if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-#                     return Response(
-#                         {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-#                         status=status.HTTP_400_BAD_REQUEST
-#                     )
-#                 filters['facility__facility_id'] = facility_id
-
-#             # Facility Location validation and filtering
-#             if facility_location and facility_location.lower() != 'all':
-#                 if not Facility.objects.filter(location__icontains=facility_location).exists():
-#                     return Response(
-#                         {'error': f'No facility found with location {facility_location}.'},
-#                         status=status.HTTP_400_BAD_REQUEST
-#                     )
-#                 filters['facility__location__icontains'] = facility_location
-
-#             # Year validation and filtering
-#             if year:
-#                 try:
-#                     year = int(year)
-#                     if year < 1900 or year > datetime.now().year + 10:
-#                         return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-#                 except ValueError:
-#                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-#             else:
-#                 # Find the latest year across all models (Water, Waste, etc.)
-#                 latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-#                 latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-#                 latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-#                 latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-#                 latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-#                 latest_date = max(
-#                     filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-#                     default=None
-#                 )
-#                 if latest_date:
-#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-#                 else:
-#                     # Default to the current fiscal year if no data exists
-#                     today = datetime.now()
-#                     year = today.year - 1 if today.month < 4 else today.year
-
-#             # Determine fiscal year range
-#             start_date = datetime(year, 4, 1)
-#             end_date = datetime(year + 1, 3, 31)
-#             filters['DatePicker__range'] = (start_date, end_date)
-
-#             # Apply additional filters for facility
-#             if facility_id and facility_id.lower() != 'all':
-#                 filters['facility__facility_id'] = facility_id
-#             if facility_location:
-#                 filters['facility__facility_location__icontains'] = facility_location
-
-#             # Query monthly renewable energy data
-#             monthly_renewable_energy = (
-#                 Energy.objects.filter(**filters)
-#                 .values('DatePicker__month')
-#                 .annotate(
-#                     total_solar=Sum('renewable_solar'),
-#                     total_other=Sum('renewable_other')
-#                 )
-#                 .order_by('DatePicker__month')
-#             )
-
-#             # Map data to fiscal year months
-#             renewable_energy = defaultdict(float)
-#             for entry in monthly_renewable_energy:
-#                 month = entry['DatePicker__month']
-#                 total_energy = entry['total_solar'] + entry['total_other']
-#                 renewable_energy[month] = total_energy
-
-#             # Prepare line chart data
-#             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-#             line_chart_data = []
-#             for month in month_order:
-#                 month_name = datetime(1900, month, 1).strftime('%b')
-#                 line_chart_data.append({
-#                     "month": month_name,
-#                     "renewable_energy": renewable_energy.get(month, 0)
-#                 })
-
-#             # Query facility-wise renewable energy data
-#             facility_filters = {
-#                 'user': user,
-#                 'DatePicker__range': (start_date, end_date)
-#             }
-#             if facility_id and facility_id.lower() != 'all':
-#                 facility_filters['facility__facility_id'] = facility_id
-
-#             facility_renewable_energy = (
-#                 Energy.objects.filter(**facility_filters)
-#                 .values('facility__facility_name')
-#                 .annotate(total_renewable_energy=Sum('renewable_solar') + Sum('renewable_other'))
-#                 .order_by('-total_renewable_energy')
-#             )
-
-#             # Calculate total renewable energy for percentage calculations
-#             total_renewable_energy = sum(entry['total_renewable_energy'] for entry in facility_renewable_energy)
-
-#             # Prepare donut chart data
-#             donut_chart_data = [
-#                 {
-#                     "facility_name": entry['facility__facility_name'],
-#                     "percentage": (entry['total_renewable_energy'] / total_renewable_energy * 100) if total_renewable_energy else 0,
-#                 }
-#                 for entry in facility_renewable_energy
-#             ]
-
-#             # Prepare and return response
-#             response_data = {
-#                 "year": year,
-#                 "line_chart_data": line_chart_data,
-#                 "donut_chart_data": donut_chart_data
-#             }
-
-#             return Response(response_data, status=status.HTTP_200_OK)
-
-#         except Exception as e:
-#             return Response(
-#                 {'error': f'An error occurred while processing your request: {str(e)}'},
-#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-#             )
-
-class Renewable_EnergyOverView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            # Initialize filters
-            filters = {'user': user}
-
-            # Determine fiscal year range
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            # Facility Location validation and filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
-
-            # Year validation and filtering
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            # Query monthly renewable energy data
-            monthly_renewable_energy = (
-                Energy.objects.filter(**filters)
-                .values('DatePicker__month')
-                .annotate(
-                    total_solar=Sum('renewable_solar'),
-                    total_other=Sum('renewable_other')
-                )
-                .order_by('DatePicker__month')
-            )
-
-            # Map data to fiscal year months
-            renewable_energy = defaultdict(float)
-            for entry in monthly_renewable_energy:
-                month = entry['DatePicker__month']
-                total_energy = entry['total_solar'] + entry['total_other']
-                renewable_energy[month] = total_energy
-
-            # Prepare line chart data
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = []
-            for month in month_order:
-                month_name = datetime(1900, month, 1).strftime('%b')
-                line_chart_data.append({
-                    "month": month_name,
-                    "renewable_energy": renewable_energy.get(month, 0)
-                })
-
-            # Query facility-wise renewable energy data
-            facility_filters = {
-                'user': user,
-                'DatePicker__range': (start_date, end_date)
-            }
-            if facility_id and facility_id.lower() != 'all':
-                facility_filters['facility__facility_id'] = facility_id
-
-            facility_renewable_energy = (
-                Energy.objects.filter(**facility_filters)
-                .values('facility__facility_name')
-                .annotate(total_renewable_energy=Sum('renewable_solar') + Sum('renewable_other'))
-                .order_by('-total_renewable_energy')
-            )
-
-            # Calculate total renewable energy for percentage calculations
-            total_renewable_energy = sum(entry['total_renewable_energy'] for entry in facility_renewable_energy)
-
-            # Get a list of all facilities for the user
-            all_facilities = Facility.objects.filter(user=user)
-
-            # Prepare donut chart data with facilities having zero values if no renewable energy data is available
-            donut_chart_data = []
-            for facility in all_facilities:
-                # Check if the facility has data, if not set it to 0
-                facility_data = next((entry for entry in facility_renewable_energy if entry['facility__facility_name'] == facility.facility_name), None)
-                total_energy = facility_data['total_renewable_energy'] if facility_data else 0
-                donut_chart_data.append({
-                    "facility_name": facility.facility_name,
-                    "percentage": (total_energy / total_renewable_energy * 100) if total_renewable_energy else 0,
-                })
-
-            # Prepare and return response
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-#Fuel Used in Opeartions Line Chart and donut chart
-# class Fuel_Used_OperationsOverView(APIView):
-#     permission_classes = [IsAuthenticated]
-
-#     def get(self, request):
-#         user = request.user
-#         facility_id = request.GET.get('facility_id', None)
-#         facility_location = request.GET.get('facility_location', None)
-#         year = request.GET.get('year', None)
-
-#         try:
-#             filters = {'user': user}
-            
-#             # If year is not provided, get the latest available year based on the Energy model
-#             if not year:
-#                 latest_energy = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))
-#                 if latest_energy['latest_date']:
-#                     latest_date = latest_energy['latest_date']
-#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-#                 else:
-#                     # Default to the current fiscal year if no data exists
-#                     today = datetime.now()
-#                     year = today.year if today.month >= 4 else today.year - 1
-
-#             year = int(year)
-#             start_date = datetime(year, 4, 1)
-#             end_date = datetime(year + 1, 3, 31)
-
-#             filters['DatePicker__range'] = (start_date, end_date)
-
-#             # Apply facility filters if provided
-#             if facility_id and facility_id.lower() != 'all':
-#                 filters['facility__facility_id'] = facility_id
-#             if facility_location:
-#                 filters['facility__facility_location__icontains'] = facility_location
-
-#             # Query monthly fuel used in operations data
-#             monthly_fuel_used_in_operations = (
-#                 Energy.objects.filter(**filters)
-#                 .values('DatePicker__month')
-#                 .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
-#                 .order_by('DatePicker__month')
-#             )
-
-#             # Prepare line chart data with zero defaults
-#             line_chart_data = []
-#             fuel_used_in_operations = defaultdict(float)
-
-#             # Map retrieved data to months
-#             for entry in monthly_fuel_used_in_operations:
-#                 fuel_used_in_operations[entry['DatePicker__month']] = entry['total_fuel_used_in_operations']
-
-#             # Define the month order (April to March)
-#             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-#             today = datetime.now()
-#             for month in month_order:
-#                 month_name = datetime(1900, month, 1).strftime('%b')
-
-#                 if year == today.year and month > today.month:
-#                     fuel_used_in_operations[month] = 0  # No data yet for future months of the current year
-#                 else:
-                    
-#                     line_chart_data.append({
-#                     "month": month_name,
-#                     "fuel_used_in_operations": fuel_used_in_operations.get(month, 0)
-#                 })
-
-
-#             # Facility-wise fuel used in operations query for donut chart data
-#             facility_filters = {
-#                 'user': user,
-#                 'DatePicker__range': (start_date, end_date)
-#             }
-#             if facility_id and facility_id.lower() != 'all':
-#                 facility_filters['facility__facility_id'] = facility_id
-#             facility_fuel_used_in_operations = (
-#                 Energy.objects.filter(**facility_filters)
-#                 .values('facility__facility_name')
-#                 .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
-#                 .order_by('-total_fuel_used_in_operations')
-#             )
-
-#             # Prepare donut chart data
-#             total_fuel_used_in_operations = sum(entry['total_fuel_used_in_operations'] for entry in facility_fuel_used_in_operations)
-#             donut_chart_data = [
-#                 {
-#                     "facility_name": entry['facility__facility_name'],
-#                     "percentage": (entry['total_fuel_used_in_operations'] / total_fuel_used_in_operations * 100) if total_fuel_used_in_operations else 0,
-#                 }
-#                 for entry in facility_fuel_used_in_operations
-#             ]
-
-#             response_data = {
-#                 "year":year,
-#                 "line_chart_data": line_chart_data,
-#                 "donut_chart_data": donut_chart_data
-#             }
-
-#             return Response(response_data, status=status.HTTP_200_OK)
-
-#         except Exception as e:
-#             return Response(
-#                 {'error': f'An error occurred while processing your request: {str(e)}'},
-#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-#             )
-
-class Fuel_Used_OperationsOverView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            filters = {'user': user}
-            
-            # Facility ID validation and filtering
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            # Facility Location validation and filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
-
-            # Year validation and filtering
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            # Query monthly fuel used in operations data
-            monthly_fuel_used_in_operations = (
-                Energy.objects.filter(**filters)
-                .values('DatePicker__month')
-                .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
-                .order_by('DatePicker__month')
-            )
-
-            # Prepare line chart data with zero defaults
-            line_chart_data = []
-            fuel_used_in_operations = defaultdict(float)
-
-            # Map retrieved data to months
-            for entry in monthly_fuel_used_in_operations:
-                fuel_used_in_operations[entry['DatePicker__month']] = entry['total_fuel_used_in_operations']
-
-            # Define the month order (April to March)
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            today = datetime.now()
-            for month in month_order:
-                month_name = datetime(1900, month, 1).strftime('%b')
-
-                if year == today.year and month > today.month:
-                    fuel_used_in_operations[month] = 0  # No data yet for future months of the current year
-                else:
-                    line_chart_data.append({
-                        "month": month_name,
-                        "fuel_used_in_operations": fuel_used_in_operations.get(month, 0)
-                    })
-
-            # Facility-wise fuel used in operations query for donut chart data
-            facility_fuel_used_in_operations = (
-                Energy.objects.filter(**filters)
-                .values('facility__facility_name')
-                .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
-                .order_by('-total_fuel_used_in_operations')
-            )
-
-            # Prepare donut chart data, including zero data for facilities with no fuel usage
-            total_fuel_used_in_operations = sum(entry['total_fuel_used_in_operations'] for entry in facility_fuel_used_in_operations)
-            donut_chart_data = []
-
-            # Get a list of all facilities for the user
-            all_facilities = Facility.objects.filter(user=user)
-
-            # Ensure all facilities are included in the donut chart, with 0% for those with no data
-            for facility in all_facilities:
-                # Find the fuel used in operations for each facility, or set it to 0 if no data exists
-                facility_data = next((entry for entry in facility_fuel_used_in_operations if entry['facility__facility_name'] == facility.facility_name), None)
-                total_fuel = facility_data['total_fuel_used_in_operations'] if facility_data else 0
-                donut_chart_data.append({
-                    "facility_name": facility.facility_name,
-                    "percentage": (total_fuel / total_fuel_used_in_operations * 100) if total_fuel_used_in_operations else 0,
-                })
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-#StackedEnergyOverview 
-class StackedEnergyOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            filters = {'user': user}
-
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
-
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            energy_types = [
-                'hvac', 'production', 'stp', 'admin_block', 'utilities', 
-                'others', 'renewable_energy'
-            ]
-
-
-            monthly_data = {month: {energy_type: 0 for energy_type in energy_types} for month in range(1, 13)}
-
-            for energy_type in energy_types:
-                queryset = Energy.objects.filter(**filters)
-
-                if energy_type == 'renewable_energy':
-                    monthly_energy = (
-                        queryset
-                        .values('DatePicker__month')
-                        .annotate(
-                            total=Coalesce(
-                                Sum('renewable_solar') + Sum('renewable_other'),
-                                Value(0, output_field=FloatField())
-                            )
-                        )
-                        .order_by('DatePicker__month')
-                    )
-                else:
-                    monthly_energy = (
-                        queryset
-                        .values('DatePicker__month')
-                        .annotate(total=Coalesce(Sum(energy_type, output_field=FloatField()), Value(0, output_field=FloatField())))
-                        .order_by('DatePicker__month')
-                    )
-
-                for entry in monthly_energy:
-                    month = entry['DatePicker__month']
-                    monthly_data[month][energy_type] = entry['total']
-
-            
-            stacked_bar_data = []
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            for month in month_order:
-                month_name = datetime(1900, month, 1).strftime('%b')
-                stacked_bar_data.append({
-                    "month": month_name,
-                    **monthly_data[month] 
-                })
-
-            response_data = {
-                "facility_id": facility_id,
-                "year": year,
-                "facility_location": facility_location,
-                "stacked_bar_data": stacked_bar_data
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            print(f"Error occurred: {e}") 
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#EnergyAnalyticsView With Pie Chart And Donut CHart
-# class EnergyAnalyticsView(APIView):
-#     permission_classes = [IsAuthenticated]
-
-#     def get(self, request):
-#         user = request.user
-#         year = request.GET.get('year', None)
-#         facility_id = request.GET.get('facility_id', 'all')
-#         facility_location = request.GET.get('facility_location', None)
-
-#         try:
-#             filters = {'user': user}
-
-#             today = datetime.now()
-            
-#             if not year:
-#                 latest_energy = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))
-#                 if latest_energy['latest_date']:
-#                     latest_date = latest_energy['latest_date']
-#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-#                 else:
-#                     # Default to the current fiscal year if no data exists
-#                     today = datetime.now()
-#                     year = today.year if today.month >= 4 else today.year - 1
-
-#             year = int(year)
-#             start_date = datetime(year, 4, 1)
-#             end_date = datetime(year + 1, 3, 31)
-
-#             filters['DatePicker__range'] = (start_date, end_date)
-
-#             if facility_id.lower() != 'all':
-#                 try:
-#                     Facility.objects.get(facility_id=facility_id)
-#                     filters['facility__facility_id'] = facility_id
-#                 except Facility.DoesNotExist:
-#                     return Response({'error': f'Facility with ID {facility_id} does not exist.'}, status=status.HTTP_400_BAD_REQUEST)
-
-#             if facility_location and facility_location.lower() != 'all':
-#                 if not Facility.objects.filter(facility_location__icontains=facility_location).exists():
-#                     return Response({'error': f'No facility found with location {facility_location}.'}, status=status.HTTP_400_BAD_REQUEST)
-#                 filters['facility__facility_location__icontains'] = facility_location
-
-#             energy_aggregate = Energy.objects.filter(**filters).aggregate(
-#                 total_hvac=Coalesce(Sum('hvac', output_field=FloatField()), 0.0),
-#                 total_production=Coalesce(Sum('production', output_field=FloatField()), 0.0),
-#                 total_stp=Coalesce(Sum('stp', output_field=FloatField()), 0.0),
-#                 total_admin_block=Coalesce(Sum('admin_block', output_field=FloatField()), 0.0),
-#                 total_utilities=Coalesce(Sum('utilities', output_field=FloatField()), 0.0),
-#                 total_others=Coalesce(Sum('others', output_field=FloatField()), 0.0),
-#                 total_renewable_solar=Coalesce(Sum('renewable_solar', output_field=FloatField()), 0.0),
-#                 total_renewable_other=Coalesce(Sum('renewable_other', output_field=FloatField()), 0.0)
-#             )
-
-#             if not energy_aggregate:
-#                 energy_aggregate = {key: 0.0 for key in energy_aggregate}
-
-#             total_renewable_energy = energy_aggregate['total_renewable_solar'] + energy_aggregate['total_renewable_other']
-#             total_non_renewable_energy = (
-#                 energy_aggregate['total_hvac'] +
-#                 energy_aggregate['total_production'] +
-#                 energy_aggregate['total_stp'] +
-#                 energy_aggregate['total_admin_block'] +
-#                 energy_aggregate['total_utilities'] +
-#                 energy_aggregate['total_others']
-#             )
-#             total_energy = total_non_renewable_energy + total_renewable_energy
-
-#             renewable_energy_percentage = (total_renewable_energy / total_energy * 100) if total_energy > 0 else 0
-#             remaining_energy_percentage = (total_non_renewable_energy / total_energy * 100) if total_energy > 0 else 0
-#             pie_chart_data = [
-#                 {"label": "Renewable Energy", "value": renewable_energy_percentage},
-#                 {"label": "Remaining Energy", "value": remaining_energy_percentage}
-#             ]
-
-#             energy_percentages = {}
-#             overall_total = total_non_renewable_energy
-#             for key, total in {
-#                 "hvac_total": energy_aggregate['total_hvac'],
-#                 "production_total": energy_aggregate['total_production'],
-#                 "stp_total": energy_aggregate['total_stp'],
-#                 "admin_block_total": energy_aggregate['total_admin_block'],
-#                 "utilities_total": energy_aggregate['total_utilities'],
-#                 "others_total": energy_aggregate['total_others']
-#             }.items():
-#                 energy_percentages[key] = (total / overall_total * 100) if overall_total else 0
-
-#             # Final response data combining pie and donut chart information
-#             response_data = {
-#                 "facility_id": facility_id,
-#                 "year": year,
-#                 "facility_location": facility_location,
-#                 "pie_chart_data": pie_chart_data,
-#                 "energy_percentages": {key: round(value, 2) for key, value in energy_percentages.items()}
-
-#             }
-
-#             return Response(response_data, status=status.HTTP_200_OK)
-
-#         except Exception as e:
-#             print(f"Error occurred: {e}")
-#             return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class EnergyAnalyticsView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        year = request.GET.get('year', None)
-        facility_id = request.GET.get('facility_id', 'all')
-        facility_location = request.GET.get('facility_location', None)
+#Fuel Used in Opeartions Line Chart and donut chart
+# class Fuel_Used_OperationsOverView(APIView):
+#     permission_classes = [IsAuthenticated]
 
-        try:
-            filters = {'user': user}
+#     def get(self, request):
+#         user = request.user
+#         facility_id = request.GET.get('facility_id', None)
+#         facility_location = request.GET.get('facility_location', None)
+#         year = request.GET.get('year', None)
 
-            today = datetime.now()
+#         try:
+#             filters = {'user': user}
             
-            # Validate year and set default if not provided
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
-
-            # Facility ID validation and filtering
-            if facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            # Facility Location validation and filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location, user=user).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location} or associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
-
-            # Querying the Energy model with the filters
-            energy_aggregate = Energy.objects.filter(**filters).aggregate(
-                total_hvac=Coalesce(Sum('hvac', output_field=FloatField()), 0.0),
-                total_production=Coalesce(Sum('production', output_field=FloatField()), 0.0),
-                total_stp=Coalesce(Sum('stp', output_field=FloatField()), 0.0),
-                total_admin_block=Coalesce(Sum('admin_block', output_field=FloatField()), 0.0),
-                total_utilities=Coalesce(Sum('utilities', output_field=FloatField()), 0.0),
-                total_others=Coalesce(Sum('others', output_field=FloatField()), 0.0),
-                total_renewable_solar=Coalesce(Sum('renewable_solar', output_field=FloatField()), 0.0),
-                total_renewable_other=Coalesce(Sum('renewable_other', output_field=FloatField()), 0.0)
-            )
-
-            if not energy_aggregate:
-                energy_aggregate = {key: 0.0 for key in energy_aggregate}
-
-            # Calculate total energy values
-            total_renewable_energy = energy_aggregate['total_renewable_solar'] + energy_aggregate['total_renewable_other']
-            total_non_renewable_energy = (
-                energy_aggregate['total_hvac'] +
-                energy_aggregate['total_production'] +
-                energy_aggregate['total_stp'] +
-                energy_aggregate['total_admin_block'] +
-                energy_aggregate['total_utilities'] +
-                energy_aggregate['total_others']
-            )
-            total_energy = total_non_renewable_energy + total_renewable_energy
-
-            # Calculate percentages
-            renewable_energy_percentage = (total_renewable_energy / total_energy * 100) if total_energy > 0 else 0
-            remaining_energy_percentage = (total_non_renewable_energy / total_energy * 100) if total_energy > 0 else 0
-            pie_chart_data = [
-                {"label": "Renewable Energy", "value": renewable_energy_percentage},
-                {"label": "Remaining Energy", "value": remaining_energy_percentage}
-            ]
-
-            energy_percentages = {}
-            overall_total = total_non_renewable_energy
-            for key, total in {
-                "hvac_total": energy_aggregate['total_hvac'],
-                "production_total": energy_aggregate['total_production'],
-                "stp_total": energy_aggregate['total_stp'],
-                "admin_block_total": energy_aggregate['total_admin_block'],
-                "utilities_total": energy_aggregate['total_utilities'],
-                "others_total": energy_aggregate['total_others']
-            }.items():
-                energy_percentages[key] = (total / overall_total * 100) if overall_total else 0
-
-            # Final response data combining pie and donut chart information
-            response_data = {
-                "facility_id": facility_id,
-                "year": year,
-                "facility_location": facility_location,
-                "pie_chart_data": pie_chart_data,
-                "energy_percentages": {key: round(value, 2) for key, value in energy_percentages.items()}
-            }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            print(f"Error occurred: {e}")
-            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-'''Energy  Overview Cards ,Graphs and Individual line charts and donut charts Ends'''
-
-'''Water Overview Cards ,Graphs and Individual Line Charts and donut Charts Starts'''
-#Water Card OverView
-class WaterViewCard_Over(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', 'all')
-        facility_location = request.GET.get('facility_location')
-        year = request.GET.get('year')
-
-        try:
-            # Validate facility ID
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Determine fiscal year range
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                
-                
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date,latest_energy_date,latest_biodiversity_date,latest_logistices_date]), default=None)
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
-
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-
-            # Query water data
-            water_data = Water.objects.filter(user=user, DatePicker__range=(start_date, end_date))
-
-            if facility_id != 'all':
-                water_data = water_data.filter(facility__facility_id=facility_id)
-
-            if facility_location:
-                water_data = water_data.filter(facility__location__icontains=facility_location)
-
-            # Water fields for aggregation
-            water_fields = [
-                'Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage'
-            ]
-
-            # Calculate overall totals
-            overall_totals = {
-                f"overall_{field}": water_data.aggregate(total=Sum(field))['total'] or 0 for field in water_fields
-            }
-
-            if not water_data.exists():
-                response_data = {
-                    'year': year,
-                    'message': f"No data available for the year {year}.",
-                    'overall_water_totals': {f"overall_{field}": 0 for field in water_fields},
-                }
-            else:
-                response_data = {
-                    'year': year,
-                    'overall_water_totals': overall_totals,
-                }
-
-            return Response(response_data, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            error_message = f"An error occurred: {str(e)}"
-            print(error_message)
-            return Response({'error': error_message}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-#GeneratedWater Overview Line Charts and Donut Chart
-class Generated_WaterOverviewView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
-
-        try:
-            if year:
-                try:
-                    year = int(year)
-                    if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
-                except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
-            else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
+#             # If year is not provided, get the latest available year based on the Energy model
+#             if not year:
+#                 latest_energy = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))
+#                 if latest_energy['latest_date']:
+#                     latest_date = latest_energy['latest_date']
+#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
+#                 else:
+#                     # Default to the current fiscal year if no data exists
+#                     today = datetime.now()
+#                     year = today.year if today.month >= 4 else today.year - 1
 
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
+#             year = int(year)
+#             start_date = datetime(year, 4, 1)
+#             end_date = datetime(year + 1, 3, 31)
 
-            water_data = Water.objects.filter(**filters)
-            if not water_data.exists():
-                return self.get_empty_response(year)
+#             filters['DatePicker__range'] = (start_date, end_date)
 
-            monthly_Generated_Water = (
-                water_data
-                .values('DatePicker__month')
-                .annotate(total_Generated_Water=Sum('Generated_Water'))
-            )
+#             # Apply facility filters if provided
+#             if facility_id and facility_id.lower() != 'all':
+#                 filters['facility__facility_id'] = facility_id
+#             if facility_location:
+#                 filters['facility__facility_location__icontains'] = facility_location
 
-            Generated_Water = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Generated_Water:
-                Generated_Water[entry['DatePicker__month']] = entry['total_Generated_Water']
+#             # Query monthly fuel used in operations data
+#             monthly_fuel_used_in_operations = (
+#                 Energy.objects.filter(**filters)
+#                 .values('DatePicker__month')
+#                 .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
+#                 .order_by('DatePicker__month')
+#             )
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Generated_Water": Generated_Water[month]
-                }
-                for month in month_order
-            ]
+#             # Prepare line chart data with zero defaults
+#             line_chart_data = []
+#             fuel_used_in_operations = defaultdict(float)
 
-            # Prepare facility data for donut chart
-            facility_Generated_Water = (
-                water_data
-                .values('facility__facility_name')
-                .annotate(total_Generated_Water=Sum('Generated_Water'))
-                .order_by('-total_Generated_Water')
-            )
+#             # Map retrieved data to months
+#             for entry in monthly_fuel_used_in_operations:
+#                 fuel_used_in_operations[entry['DatePicker__month']] = entry['total_fuel_used_in_operations']
 
-            total_Generated_Water = sum(entry['total_Generated_Water'] for entry in facility_Generated_Water)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Generated_Water'] / total_Generated_Water * 100) if total_Generated_Water else 0,
-                }
-                for entry in facility_Generated_Water
-            ]
+#             # Define the month order (April to March)
+#             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
+#             today = datetime.now()
+#             for month in month_order:
+#                 month_name = datetime(1900, month, 1).strftime('%b')
 
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
+#                 if year == today.year and month > today.month:
+#                     fuel_used_in_operations[month] = 0  # No data yet for future months of the current year
+#                 else:
+                    
+#                     line_chart_data.append({
+#                     "month": month_name,
+#                     "fuel_used_in_operations": fuel_used_in_operations.get(month, 0)
+#                 })
 
-            return Response(response_data, status=200)
 
-        except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=500
-            )
+#             # Facility-wise fuel used in operations query for donut chart data
+#             facility_filters = {
+#                 'user': user,
+#                 'DatePicker__range': (start_date, end_date)
+#             }
+#             if facility_id and facility_id.lower() != 'all':
+#                 facility_filters['facility__facility_id'] = facility_id
+#             facility_fuel_used_in_operations = (
+#                 Energy.objects.filter(**facility_filters)
+#                 .values('facility__facility_name')
+#                 .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
+#                 .order_by('-total_fuel_used_in_operations')
+#             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#             # Prepare donut chart data
+#             total_fuel_used_in_operations = sum(entry['total_fuel_used_in_operations'] for entry in facility_fuel_used_in_operations)
+#             donut_chart_data = [
+#                 {
+#                     "facility_name": entry['facility__facility_name'],
+#                     "percentage": (entry['total_fuel_used_in_operations'] / total_fuel_used_in_operations * 100) if total_fuel_used_in_operations else 0,
+#                 }
+#                 for entry in facility_fuel_used_in_operations
+#             ]
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
+#             response_data = {
+#                 "year":year,
+#                 "line_chart_data": line_chart_data,
+#                 "donut_chart_data": donut_chart_data
+#             }
 
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
+#             return Response(response_data, status=status.HTTP_200_OK)
 
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Generated_Water": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=200)
+#         except Exception as e:
+#             return Response(
+#                 {'error': f'An error occurred while processing your request: {str(e)}'},
+#                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
+#             )
 
-#Recycle Water Overview line charts and Donut chart
-class Recycle_WaterOverviewView(APIView):
+class Fuel_Used_OperationsOverView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -4503,66 +2008,65 @@ class Recycle_WaterOverviewView(APIView):
         year = request.GET.get('year', None)
 
         try:
+            filters = {'user': user}
+            
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
+
+            # Year validation and filtering
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            water_data = Water.objects.filter(**filters)
-            if not water_data.exists():
-                return self.get_empty_response(year)
+            filters['fiscal_year'] = year
 
-            monthly_Recycled_Water = (
-                water_data
-                .values('DatePicker__month')
-                .annotate(total_Recycled_Water=Sum('Recycled_Water'))
+            # Query monthly fuel used in operations data
+            monthly_fuel_used_in_operations = (
+                Energy.objects.filter(**filters)
+                .values('fiscal_month')
+                .annotate(total_fuel_used_in_operations=Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'))
+                .order_by('fiscal_month')
             )
 
-            Recycled_Water = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Recycled_Water:
-                Recycled_Water[entry['DatePicker__month']] = entry['total_Recycled_Water']
+            # Prepare line chart data with zero defaults
+            line_chart_data = []
+            fuel_used_in_operations = defaultdict(float)
+
+            # Map retrieved data to months
+            for entry in monthly_fuel_used_in_operations:
+                fuel_used_in_operations[calendar_month(entry['fiscal_month'])] = entry['total_fuel_used_in_operations']
 
+            # Define the month order (April to March)
             month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Recycled_Water": Recycled_Water[month]
-                }
-                for month in month_order
-            ]
+            today = datetime.now()
+            for month in month_order:
+                month_name = datetime(1900, month, 1).strftime('%b')
 
-            # Prepare facility data for donut chart
-            facility_Recycled_Water = (
-                water_data
-                .values('facility__facility_name')
-                .annotate(total_Recycled_Water=Sum('Recycled_Water'))
-                .order_by('-total_Recycled_Water')
-            )
+                if year == today.year and month > today.month:
+                    fuel_used_in_operations[month] = 0  # No data yet for future months of the current year
+                else:
+                    line_chart_data.append({
+                        "month": month_name,
+                        "fuel_used_in_operations": fuel_used_in_operations.get(month, 0)
+                    })
 
-            total_Recycled_Water = sum(entry['total_Recycled_Water'] for entry in facility_Recycled_Water)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Recycled_Water'] / total_Recycled_Water * 100) if total_Recycled_Water else 0,
-                }
-                for entry in facility_Recycled_Water
-            ]
+            # Facility-wise fuel used in operations query for donut chart data
+            # All facilities are included in the donut chart, with 0% for those with no fuel usage
+            donut_chart_data = facility_donut(
+                Energy.objects.filter(**filters),
+                Sum('coking_coal') + Sum('coke_oven_coal') + Sum('natural_gas') + Sum('diesel') + Sum('biomass_wood') + Sum('biomass_other_solid'),
+                facility_names(user),
+            )
 
             response_data = {
                 "year": year,
@@ -4573,52 +2077,17 @@ class Recycle_WaterOverviewView(APIView):
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
             return Response(
                 {'error': f'An error occurred while processing your request: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-    
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Recycled_Water": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
-
-#SoftenSoftener_usage overview line chart and donut chart
-class Softener_usageOverviewView(APIView):
+#StackedEnergyOverview 
+class StackedEnergyOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -4626,368 +2095,349 @@ class Softener_usageOverviewView(APIView):
         year = request.GET.get('year', None)
 
         try:
+            filters = {'user': user}
+
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
+
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            water_data = Water.objects.filter(**filters)
-            if not water_data.exists():
-                return self.get_empty_response(year)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            monthly_Softener_usage = (
-                water_data
-                .values('DatePicker__month')
-                .annotate(total_Softener_usage=Sum('Softener_usage'))
-            )
-
-            Softener_usage = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Softener_usage:
-                Softener_usage[entry['DatePicker__month']] = entry['total_Softener_usage']
+            filters['fiscal_year'] = year
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Softener_usage": Softener_usage[month]
-                }
-                for month in month_order
+            energy_types = [
+                'hvac', 'production', 'stp', 'admin_block', 'utilities', 
+                'others', 'renewable_energy'
             ]
 
-            # Prepare facility data for donut chart
-            facility_Softener_usage = (
-                water_data
-                .values('facility__facility_name')
-                .annotate(total_Softener_usage=Sum('Softener_usage'))
-                .order_by('-total_Softener_usage')
-            )
 
-            total_Softener_usage = sum(entry['total_Softener_usage'] for entry in facility_Softener_usage)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Softener_usage'] / total_Softener_usage * 100) if total_Softener_usage else 0,
-                }
-                for entry in facility_Softener_usage
-            ]
+            # Every energy type per month in one grouped query, in fiscal month order (April to March)
+            stacked_bar_data = stacked_bars(Energy.objects.filter(**filters), {
+                energy_type: (
+                    Coalesce(Sum('renewable_solar') + Sum('renewable_other'), Value(0, output_field=FloatField()))
+                    if energy_type == 'renewable_energy'
+                    else Coalesce(Sum(energy_type, output_field=FloatField()), Value(0, output_field=FloatField()))
+                )
+                for energy_type in energy_types
+            })
 
             response_data = {
+                "facility_id": facility_id,
                 "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "facility_location": facility_location,
+                "stacked_bar_data": stacked_bar_data
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            print(f"Error occurred: {e}") 
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#EnergyAnalyticsView With Pie Chart And Donut CHart
+# class EnergyAnalyticsView(APIView):
+#     permission_classes = [IsAuthenticated]
+
+#     def get(self, request):
+#         user = request.user
+#         year = request.GET.get('year', None)
+#         facility_id = request.GET.get('facility_id', 'all')
+#         facility_location = request.GET.get('facility_location', None)
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
+#         try:
+#             filters = {'user': user}
 
-    
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
-
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Softener_usage": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+#             today = datetime.now()
+            
+#             if not year:
+#                 latest_energy = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))
+#                 if latest_energy['latest_date']:
+#                     latest_date = latest_energy['latest_date']
+#                     year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
+#                 else:
+#                     # Default to the current fiscal year if no data exists
+#                     today = datetime.now()
+#                     year = today.year if today.month >= 4 else today.year - 1
 
-#Boiler_usage Overview line chart and Donut Chart
-class Boiler_usageOverviewView(APIView):
+#             year = int(year)
+#             start_date = datetime(year, 4, 1)
+#             end_date = datetime(year + 1, 3, 31)
+
+#             filters['DatePicker__range'] = (start_date, end_date)
+
+#             if facility_id.lower() != 'all':
+#                 try:
+#                     Facility.objects.get(facility_id=facility_id)
+#                     filters['facility__facility_id'] = facility_id
+#                 except Facility.DoesNotExist:
+#                     return Response({'error': f'Facility with ID {facility_id} does not exist.'}, status=status.HTTP_400_BAD_REQUEST)
+
+#             if facility_location and facility_location.lower() != 'all':
+#                 if not Facility.objects.filter(facility_location__icontains=facility_location).exists():
+#                     return Response({'error': f'No facility found with location {facility_location}.'}, status=status.HTTP_400_BAD_REQUEST)
+#                 filters['facility__facility_location__icontains'] = facility_location
+
+#             energy_aggregate = Energy.objects.filter(**filters).aggregate(
+#                 total_hvac=Coalesce(Sum('hvac', output_field=FloatField()), 0.0),
+#                 total_production=Coalesce(Sum('production', output_field=FloatField()), 0.0),
+#                 total_stp=Coalesce(Sum('stp', output_field=FloatField()), 0.0),
+#                 total_admin_block=Coalesce(Sum('admin_block', output_field=FloatField()), 0.0),
+#                 total_utilities=Coalesce(Sum('utilities', output_field=FloatField()), 0.0),
+#                 total_others=Coalesce(Sum('others', output_field=FloatField()), 0.0),
+#                 total_renewable_solar=Coalesce(Sum('renewable_solar', output_field=FloatField()), 0.0),
+#                 total_renewable_other=Coalesce(Sum('renewable_other', output_field=FloatField()), 0.0)
+#             )
+
+#             if not energy_aggregate:
+#                 energy_aggregate = {key: 0.0 for key in energy_aggregate}
+
+#             total_renewable_energy = energy_aggregate['total_renewable_solar'] + energy_aggregate['total_renewable_other']
+#             total_non_renewable_energy = (
+#                 energy_aggregate['total_hvac'] +
+#                 energy_aggregate['total_production'] +
+#                 energy_aggregate['total_stp'] +
+#                 energy_aggregate['total_admin_block'] +
+#                 energy_aggregate['total_utilities'] +
+#                 energy_aggregate['total_others']
+#             )
+#             total_energy = total_non_renewable_energy + total_renewable_energy
+
+#             renewable_energy_percentage = (total_renewable_energy / total_energy * 100) if total_energy > 0 else 0
+#             remaining_energy_percentage = (total_non_renewable_energy / total_energy * 100) if total_energy > 0 else 0
+#             pie_chart_data = [
+#                 {"label": "Renewable Energy", "value": renewable_energy_percentage},
+#                 {"label": "Remaining Energy", "value": remaining_energy_percentage}
+#             ]
+
+#             energy_percentages = {}
+#             overall_total = total_non_renewable_energy
+#             for key, total in {
+#                 "hvac_total": energy_aggregate['total_hvac'],
+#                 "production_total": energy_aggregate['total_production'],
+#                 "stp_total": energy_aggregate['total_stp'],
+#                 "admin_block_total": energy_aggregate['total_admin_block'],
+#                 "utilities_total": energy_aggregate['total_utilities'],
+#                 "others_total": energy_aggregate['total_others']
+#             }.items():
+#                 energy_percentages[key] = (total / overall_total * 100) if overall_total else 0
+
+#             # Final response data combining pie and donut chart information
+#             response_data = {
+#                 "facility_id": facility_id,
+#                 "year": year,
+#                 "facility_location": facility_location,
+#                 "pie_chart_data": pie_chart_data,
+#                 "energy_percentages": {key: round(value, 2) for key, value in energy_percentages.items()}
+
+#             }
+
+#             return Response(response_data, status=status.HTTP_200_OK)
+
+#         except Exception as e:
+#             print(f"Error occurred: {e}")
+#             return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class EnergyAnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
         year = request.GET.get('year', None)
+        facility_id = request.GET.get('facility_id', 'all')
+        facility_location = request.GET.get('facility_location', None)
 
         try:
+            filters = {'user': user}
+
+            today = datetime.now()
+            
+            # Validate year and set default if not provided
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
+            filters['fiscal_year'] = year
 
-            water_data = Water.objects.filter(**filters)
-            if not water_data.exists():
-                return self.get_empty_response(year)
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
-            monthly_Boiler_usage = (
-                water_data
-                .values('DatePicker__month')
-                .annotate(total_Boiler_usage=Sum('Boiler_usage'))
+            # Querying the Energy model with the filters
+            energy_aggregate = Energy.objects.filter(**filters).aggregate(
+                total_hvac=Coalesce(Sum('hvac', output_field=FloatField()), 0.0),
+                total_production=Coalesce(Sum('production', output_field=FloatField()), 0.0),
+                total_stp=Coalesce(Sum('stp', output_field=FloatField()), 0.0),
+                total_admin_block=Coalesce(Sum('admin_block', output_field=FloatField()), 0.0),
+                total_utilities=Coalesce(Sum('utilities', output_field=FloatField()), 0.0),
+                total_others=Coalesce(Sum('others', output_field=FloatField()), 0.0),
+                total_renewable_solar=Coalesce(Sum('renewable_solar', output_field=FloatField()), 0.0),
+                total_renewable_other=Coalesce(Sum('renewable_other', output_field=FloatField()), 0.0)
             )
 
-            Boiler_usage = {month: 0 for month in range(1, 13)}
-            for entry in monthly_Boiler_usage:
-                Boiler_usage[entry['DatePicker__month']] = entry['total_Boiler_usage']
-
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "Boiler_usage": Boiler_usage[month]
-                }
-                for month in month_order
-            ]
+            if not energy_aggregate:
+                energy_aggregate = {key: 0.0 for key in energy_aggregate}
 
-            # Prepare facility data for donut chart
-            facility_Boiler_usage = (
-                water_data
-                .values('facility__facility_name')
-                .annotate(total_Boiler_usage=Sum('Boiler_usage'))
-                .order_by('-total_Boiler_usage')
+            # Calculate total energy values
+            total_renewable_energy = energy_aggregate['total_renewable_solar'] + energy_aggregate['total_renewable_other']
+            total_non_renewable_energy = (
+                energy_aggregate['total_hvac'] +
+                energy_aggregate['total_production'] +
+                energy_aggregate['total_stp'] +
+                energy_aggregate['total_admin_block'] +
+                energy_aggregate['total_utilities'] +
+                energy_aggregate['total_others']
             )
+            total_energy = total_non_renewable_energy + total_renewable_energy
 
-            total_Boiler_usage = sum(entry['total_Boiler_usage'] for entry in facility_Boiler_usage)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_Boiler_usage'] / total_Boiler_usage * 100) if total_Boiler_usage else 0,
-                }
-                for entry in facility_Boiler_usage
+            # Calculate percentages
+            renewable_energy_percentage = (total_renewable_energy / total_energy * 100) if total_energy > 0 else 0
+            remaining_energy_percentage = (total_non_renewable_energy / total_energy * 100) if total_energy > 0 else 0
+            pie_chart_data = [
+                {"label": "Renewable Energy", "value": renewable_energy_percentage},
+                {"label": "Remaining Energy", "value": remaining_energy_percentage}
             ]
 
+            energy_percentages = {}
+            overall_total = total_non_renewable_energy
+            for key, total in {
+                "hvac_total": energy_aggregate['total_hvac'],
+                "production_total": energy_aggregate['total_production'],
+                "stp_total": energy_aggregate['total_stp'],
+                "admin_block_total": energy_aggregate['total_admin_block'],
+                "utilities_total": energy_aggregate['total_utilities'],
+                "others_total": energy_aggregate['total_others']
+            }.items():
+                energy_percentages[key] = (total / overall_total * 100) if overall_total else 0
+
+            # Final response data combining pie and donut chart information
             response_data = {
+                "facility_id": facility_id,
                 "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
+                "facility_location": facility_location,
+                "pie_chart_data": pie_chart_data,
+                "energy_percentages": {key: round(value, 2) for key, value in energy_percentages.items()}
             }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
-
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
-
-
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
+            print(f"Error occurred: {e}")
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "Boiler_usage": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+'''Energy  Overview Cards ,Graphs and Individual line charts and donut charts Ends'''
 
-#otherUsage overview line chart and Donut chart
-class otherUsage_OverviewView(APIView):
+'''Water Overview Cards ,Graphs and Individual Line Charts and donut Charts Starts'''
+#Water Card OverView
+class WaterViewCard_Over(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
-        facility_id = request.GET.get('facility_id', None)
-        facility_location = request.GET.get('facility_location', None)
-        year = request.GET.get('year', None)
+        facility_id = request.GET.get('facility_id', 'all')
+        facility_location = request.GET.get('facility_location')
+        year = request.GET.get('year')
 
         try:
-            
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Determine fiscal year range
             if year:
                 try:
                     year = int(year)
                     if year < 1900 or year > datetime.now().year + 10:
-                        return Response({'error': 'Invalid year parameter.'}, status=400)
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
                 except ValueError:
-                    return Response({'error': 'Year must be an integer.'}, status=400)
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                year = self.get_latest_available_year(user)
-
-            start_date, end_date = self.get_fiscal_year_range(year)
-
-            filters = {
-                'user': user,
-                'DatePicker__range': (start_date.date(), end_date.date())
-            }
-            if facility_id and facility_id.lower() != 'all':
-                filters['facility__facility_id'] = facility_id
-            if facility_location:
-                filters['facility__location__icontains'] = facility_location
-
-            water_data = Water.objects.filter(**filters)
-            if not water_data.exists():
-                return self.get_empty_response(year)
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            monthly_otherUsage = (
-                water_data
-                .values('DatePicker__month')
-                .annotate(total_otherUsage=Sum('otherUsage'))
-            )
 
-            otherUsage = {month: 0 for month in range(1, 13)}
-            for entry in monthly_otherUsage:
-                otherUsage[entry['DatePicker__month']] = entry['total_otherUsage']
+            # Query water data of the selected facilities
+            water_data = Water.objects.filter(user=user, fiscal_year=year, **scope.filters)
 
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            line_chart_data = [
-                {
-                    "month": datetime(1900, month, 1).strftime('%b'),
-                    "otherUsage": otherUsage[month]
-                }
-                for month in month_order
+            # Water fields for aggregation
+            water_fields = [
+                'Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage'
             ]
 
-            # Prepare facility data for donut chart
-            facility_otherUsage = (
-                water_data
-                .values('facility__facility_name')
-                .annotate(total_otherUsage=Sum('otherUsage'))
-                .order_by('-total_otherUsage')
-            )
+            # Calculate overall totals
+            overall_totals = {
+                f"overall_{field}": water_data.aggregate(total=Sum(field))['total'] or 0 for field in water_fields
+            }
 
-            total_otherUsage = sum(entry['total_otherUsage'] for entry in facility_otherUsage)
-            donut_chart_data = [
-                {
-                    "facility_name": entry['facility__facility_name'],
-                    "percentage": (entry['total_otherUsage'] / total_otherUsage * 100) if total_otherUsage else 0,
+            if not water_data.exists():
+                response_data = {
+                    'year': year,
+                    'message': f"No data available for the year {year}.",
+                    'overall_water_totals': {f"overall_{field}": 0 for field in water_fields},
+                }
+            else:
+                response_data = {
+                    'year': year,
+                    'overall_water_totals': overall_totals,
                 }
-                for entry in facility_otherUsage
-            ]
-
-            response_data = {
-                "year": year,
-                "line_chart_data": line_chart_data,
-                "donut_chart_data": donut_chart_data
-            }
 
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            import traceback
-            print(f"Error: {str(e)}")
-            print("Traceback:", traceback.format_exc())
-            return Response(
-                {'error': f'An error occurred while processing your request: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            error_message = f"An error occurred: {str(e)}"
+            print(error_message)
+            return Response({'error': error_message}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def get_latest_available_year(self, user):
-        # Find the latest date across all models
-        latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-        latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-        latest_date = max(
-            filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-            default=None
-        )
+#GeneratedWater Overview Line Charts and Donut Chart
+class Generated_WaterOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Generated_WaterOverviewView']
 
-        if latest_date:
-            return latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-        today = datetime.now()
-        return today.year - 1 if today.month < 4 else today.year
+#Recycle Water Overview line charts and Donut chart
+class Recycle_WaterOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Recycle_WaterOverviewView']
 
-    def get_fiscal_year_range(self, year):
-        start_date = datetime(year, 4, 1)
-        end_date = datetime(year + 1, 3, 31)
-        return start_date, end_date
+#SoftenSoftener_usage overview line chart and donut chart
+class Softener_usageOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Softener_usageOverviewView']
 
-    def get_empty_response(self, year):
-        month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-        line_chart_data = [{"month": datetime(1900, month, 1).strftime('%b'), "otherUsage": 0} for month in month_order]
-        donut_chart_data = [{"facility_name": "No Facility", "percentage": 0}]
-        return Response({
-            "year": year,
-            "line_chart_data": line_chart_data,
-            "donut_chart_data": donut_chart_data
-        }, status=status.HTTP_200_OK)
+#Boiler_usage Overview line chart and Donut Chart
+class Boiler_usageOverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['Boiler_usageOverviewView']
+
+#otherUsage overview line chart and Donut chart
+class otherUsage_OverviewView(MetricOverviewView):
+    metric = METRIC_OVERVIEWS['otherUsage_OverviewView']
 
 #Stacked Graph Overview 
 class StackedWaterOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', None)
@@ -4997,21 +2447,11 @@ class StackedWaterOverviewView(APIView):
         try:
             filters = {'user': user}
 
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
             if year:
                 try:
@@ -5021,59 +2461,20 @@ class StackedWaterOverviewView(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
+            filters['fiscal_year'] = year
 
             water_types = [
                 'Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage'
             ]
 
-            monthly_data = {month: {water_type: 0 for water_type in water_types} for month in range(1, 13)}
-
-            for water_type in water_types:
-                queryset = Water.objects.filter(**filters)
-
-                monthly_water = (
-                    queryset
-                    .values('DatePicker__month')
-                    .annotate(
-                        total=Coalesce(Sum(water_type, output_field=FloatField()), Value(0, output_field=FloatField()))
-                    )
-                    .order_by('DatePicker__month')
-                )
-
-                for entry in monthly_water:
-                    month = entry['DatePicker__month']
-                    monthly_data[month][water_type] = entry['total']
-
-            stacked_bar_data = []
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            for month in month_order:
-                month_name = datetime(1900, month, 1).strftime('%b')
-                stacked_bar_data.append({
-                    "month": month_name,
-                    **monthly_data[month]
-                })
+            # Every water type per month in one grouped query, in fiscal month order (April to March)
+            stacked_bar_data = stacked_bars(Water.objects.filter(**filters), {
+                water_type: Coalesce(Sum(water_type, output_field=FloatField()), Value(0, output_field=FloatField()))
+                for water_type in water_types
+            })
 
             response_data = {
                 "facility_id": facility_id,
@@ -5092,6 +2493,8 @@ class StackedWaterOverviewView(APIView):
 class WaterAnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         year = request.GET.get('year', None)
@@ -5101,17 +2504,11 @@ class WaterAnalyticsView(APIView):
         try:
             filters = {'user': user}
 
-            # Validate facility ID
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response({'error': 'Invalid facility ID or not associated with the logged-in user.'}, status=status.HTTP_400_BAD_REQUEST)
-            elif facility_id != 'all':
-                filters['facility__facility_id'] = facility_id
-
-            # Facility location filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(facility_location__icontains=facility_location).exists():
-                    return Response({'error': f'No facility found with location {facility_location}.'}, status=status.HTTP_400_BAD_REQUEST)
-                filters['facility__facility_location__icontains'] = facility_location
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
             # Year calculation
             if year:
@@ -5122,25 +2519,10 @@ class WaterAnalyticsView(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Find the latest year across all models
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistics_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistics_date]), default=None)
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
+            filters['fiscal_year'] = year
 
             # Query Water data
             queryset = Water.objects.filter(**filters)
@@ -5399,6 +2781,8 @@ class WaterAnalyticsView(APIView):
 class BiodiversityMetricsGraphsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', 'all')
@@ -5409,21 +2793,11 @@ class BiodiversityMetricsGraphsView(APIView):
             # Filters for user and optional parameters
             filters = {'user': user}
 
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
             if year:
                 try:
@@ -5433,28 +2807,10 @@ class BiodiversityMetricsGraphsView(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Find the latest year across all related models
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
+            filters['fiscal_year'] = year
 
             # Query all data for the user with the filters
             all_years_data = Biodiversity.objects.filter(**filters)
@@ -5480,17 +2836,14 @@ class BiodiversityMetricsGraphsView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
-            # Aggregate yearly metrics
-            yearly_data = {}
-            for entry in all_years_data.values('DatePicker', 'width', 'height', 'no_trees', 'totalArea', 'head_count'):
-                entry_year = self.get_fiscal_year(entry['DatePicker'])
-                if entry_year not in yearly_data:
-                    yearly_data[entry_year] = {'no_trees': 0, 'width': 0, 'height': 0, 'totalArea': 0, 'head_count': 0}
-                yearly_data[entry_year]['no_trees'] += entry['no_trees'] or 0
-                yearly_data[entry_year]['width'] += entry['width'] or 0
-                yearly_data[entry_year]['height'] += entry['height'] or 0
-                yearly_data[entry_year]['totalArea'] += entry['totalArea'] or 0
-                yearly_data[entry_year]['head_count'] += entry['head_count'] or 0
+            # Aggregate yearly metrics, grouped in the database on the stored fiscal year
+            metric_fields = ['no_trees', 'width', 'height', 'totalArea', 'head_count']
+            yearly_data = {
+                row['fiscal_year']: {field: row[f'total_{field}'] or 0 for field in metric_fields}
+                for row in all_years_data.values('fiscal_year').annotate(
+                    **{f'total_{field}': Sum(field) for field in metric_fields}
+                ).order_by('fiscal_year')
+            }
 
             # Compute metrics for each year
             results = []
@@ -5544,12 +2897,6 @@ class BiodiversityMetricsGraphsView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def get_fiscal_year(self, date):
-        """Returns the fiscal year based on a given date."""
-        if date.month >= 4:
-            return date.year
-        return date.year - 1
-
     def calculate_co2(self, data):
         return sum(
             0.00006 *
@@ -5586,7 +2933,7 @@ class BiodiversityMetricsGraphsView(APIView):
 
     def calculate_co2_sequestration_rate(self, all_years_data):
         # Get the latest fiscal year
-        latest_year = self.get_fiscal_year(datetime.now())
+        latest_year = current_fiscal_year()
         current_year_data = all_years_data.filter(DatePicker__year=latest_year)
         prev_year_data = all_years_data.filter(DatePicker__year=latest_year - 1)
 
@@ -5771,6 +3118,8 @@ class BiodiversityMetricsGraphsView(APIView):
 class LogisticesOverviewAndGraphs(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         facility_id = request.GET.get('facility_id', 'all')
@@ -5781,23 +3130,11 @@ class LogisticesOverviewAndGraphs(APIView):
             # Base filters
             filters = {'user': user}
 
-            # Validate and apply facility_id filter
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            # Validate and apply facility_location filter
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
             # Validate or determine the fiscal year
             if year:
@@ -5808,27 +3145,11 @@ class LogisticesOverviewAndGraphs(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Determine the latest year across all models
-                latest_dates = [
-                    Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date'],
-                    Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                ]
-                latest_date = max(filter(None, latest_dates), default=None)
-
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    today = datetime.now()
-                    year = today.year - 1 if today.month < 4 else today.year
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
             # Define fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
+            filters['fiscal_year'] = year
 
             # Query data for the current fiscal year
             current_year_data = Logistices.objects.filter(**filters)
@@ -5879,26 +3200,21 @@ class LogisticesOverviewAndGraphs(APIView):
             )['total_fuel_consumed']
 
             # Monthly Fuel Consumption
-            monthly_data = current_year_data.annotate(month=ExtractMonth('DatePicker')).values('month').annotate(
+            monthly_data = current_year_data.values('fiscal_month').annotate(
                 total_fuel=Coalesce(Sum('fuel_consumption', output_field=FloatField()), Value(0.0, output_field=FloatField()))
             )
-            monthly_fuel = {d['month']: d['total_fuel'] for d in monthly_data}
+            monthly_fuel = {calendar_month(d['fiscal_month']): d['total_fuel'] for d in monthly_data}
 
             # Facility-wise Fuel Consumption
-            facility_data = current_year_data.values('facility__facility_name').annotate(
-                total_fuel=Coalesce(Sum('fuel_consumption', output_field=FloatField()), Value(0.0, output_field=FloatField()))
+            donut_chart_data = facility_donut(
+                current_year_data,
+                Coalesce(Sum('fuel_consumption', output_field=FloatField()), Value(0.0, output_field=FloatField())),
+                ndigits=2,
             )
 
-            # Calculate percentages for the donut chart
-            total_fuel = sum(d['total_fuel'] for d in facility_data) or 1  # Avoid division by zero
-            donut_chart_data = [
-                {"facility_name": d['facility__facility_name'], "percentage": round((d['total_fuel'] / total_fuel) * 100, 2)}
-                for d in facility_data
-            ]
-
             # Logistices Types Fuel Consumption
-            type_month_data = current_year_data.annotate(month=ExtractMonth('DatePicker')).values(
-                'month', 'logistices_types'
+            type_month_data = current_year_data.values(
+                'fiscal_month', 'logistices_types'
             ).annotate(
                 total_fuel=Coalesce(Sum('fuel_consumption', output_field=FloatField()), Value(0.0, output_field=FloatField()))
             )
@@ -5914,7 +3230,7 @@ class LogisticesOverviewAndGraphs(APIView):
 
             # Process logistices types data and update cargo and staff data
             for data in type_month_data:
-                month = data['month']
+                month = calendar_month(data['fiscal_month'])
                 logistices_type = data['logistices_types']
                 fuel_consumed = data['total_fuel']
 
@@ -6139,6 +3455,8 @@ class LogisticesOverviewAndGraphs(APIView):
 class EmissionCalculations(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         user = request.user
         year = request.GET.get('year', None)
@@ -6149,23 +3467,11 @@ class EmissionCalculations(APIView):
             filters = {'user': user}
             today = datetime.now()
 
-            # Facility ID filtering
-            if facility_id and facility_id.lower() != 'all':
-                if not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                    return Response(
-                        {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__facility_id'] = facility_id
-
-            # Facility location filtering
-            if facility_location and facility_location.lower() != 'all':
-                if not Facility.objects.filter(location__icontains=facility_location).exists():
-                    return Response(
-                        {'error': f'No facility found with location {facility_location}.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                filters['facility__location__icontains'] = facility_location
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            filters.update(scope.filters)
 
             # Year filtering
             if year:
@@ -6176,27 +3482,10 @@ class EmissionCalculations(APIView):
                 except ValueError:
                     return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
             else:
-                # Find the latest year across all models (Water, Waste, etc.)
-                latest_water_date = Water.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_waste_date = Waste.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_energy_date = Energy.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_biodiversity_date = Biodiversity.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-                latest_logistices_date = Logistices.objects.filter(user=user).aggregate(latest_date=Max('DatePicker'))['latest_date']
-
-                latest_date = max(
-                    filter(None, [latest_water_date, latest_waste_date, latest_energy_date, latest_biodiversity_date, latest_logistices_date]),
-                    default=None
-                )
-                if latest_date:
-                    year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
-                else:
-                    # Default to the current fiscal year if no data exists
-                    year = today.year - 1 if today.month < 4 else today.year
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
 
-            # Determine fiscal year range
-            start_date = datetime(year, 4, 1)
-            end_date = datetime(year + 1, 3, 31)
-            filters['DatePicker__range'] = (start_date, end_date)
+            filters['fiscal_year'] = year
 
             # Fetch energy, water, waste, and logistices data
             energy_data = Energy.objects.filter(**filters)
@@ -6204,84 +3493,12 @@ class EmissionCalculations(APIView):
             waste_data = Waste.objects.filter(**filters)
             logistices_data = Logistices.objects.filter(**filters)
 
-            # Check if data exists, if not set all emissions to zero
-            if not any([energy_data, water_data, waste_data, logistices_data]):
-                return Response({
-                    'year': year,
-                    'line_chart_data': [
-                        {"month": datetime(1900, month, 1).strftime('%b'), "total_emissions": 0}
-                        for month in list(range(4, 13)) + list(range(1, 4))
-                    ]
-                }, status=status.HTTP_200_OK)
-
-            # Energy Emission factors
-            electricity_factor = 0.82
-            fuel_factors = {
-                'coking_coal': 2.66,
-                'coke_oven_coal': 3.1,
-                'natural_gas': 2.7,
-                'diesel': 2.91 * 1000,  # Diesel in liters, convert to kg
-                'biomass_wood': 1.75,
-                'biomass_other_solid': 1.16
-            }
-            petrol_factor = 2.29 * 1000
-            diesel_factor = 2.91 * 1000
-
-            # Monthly totals (ordered by fiscal year: April - March)
-            month_order = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
-            monthly_total_emissions = {}
-
-            for month in month_order:  # Loop over fiscal months
-                # Filter data for the specific month
-                monthly_energy = energy_data.filter(DatePicker__month=month)
-                monthly_water = water_data.filter(DatePicker__month=month)
-                monthly_waste = waste_data.filter(DatePicker__month=month)
-                monthly_logistices = logistices_data.filter(DatePicker__month=month)
-
-                # Calculate electricity emissions
-                electricity_emissions = (
-                    sum([
-                        monthly_energy.aggregate(total=Coalesce(Sum(field), 0.0))['total'] or 0
-                        for field in ['hvac', 'production', 'stp', 'admin_block', 'utilities', 'others']
-                    ]) * electricity_factor
-                )
-
-                # Calculate fuel emissions
-                fuel_emissions = sum([
-                    (monthly_energy.aggregate(total=Coalesce(Sum(fuel), 0.0))['total'] or 0) * factor
-                    for fuel, factor in fuel_factors.items()
-                ])
-                total_energy_emissions = electricity_emissions + fuel_emissions
-
-                # Calculate water usage emissions
-                total_water = sum([
-                    monthly_water.aggregate(total=Coalesce(Sum(field), 0.0))['total'] or 0
-                    for field in ['Generated_Water', 'Recycled_Water', 'Softener_usage', 'Boiler_usage', 'otherUsage']
-                ])
-                total_water_emissions = total_water * 0.46
-
-                # Calculate waste emissions
-                total_waste_emissions = sum([
-                    (monthly_waste.aggregate(total=Coalesce(Sum(field), 0.0))['total'] or 0) * factor
-                    for field, factor in [('Landfill_waste', 300), ('Recycle_waste', 10)]
-                ])
-
-                # Calculate logistices emissions
-                total_logistices_emissions = sum([
-                    (monthly_logistices.filter(Typeof_fuel=fuel_type).aggregate(
-                        total=Coalesce(Sum('fuel_consumption'), 0.0))['total'] or 0) * factor
-                    for fuel_type, factor in [('diesel', diesel_factor), ('petrol', petrol_factor)]
-                ])
-
-                # Total emissions
-                total_emissions = total_energy_emissions + total_water_emissions + total_waste_emissions + total_logistices_emissions
-
-                # Store monthly emissions data
-                monthly_total_emissions[month] = total_emissions
+            # All twelve monthly totals from one grouped query per model
+            monthly_total_emissions = monthly_emissions(energy_data, water_data, waste_data, logistices_data)
 
             # Prepare the response data for line chart
             line_chart_data = []
-            for month in month_order:
+            for month in FISCAL_MONTHS:
                 month_name = datetime(1900, month, 1).strftime('%b')  # Get month name
                 line_chart_data.append({
                     "month": month_name,
@@ -6303,51 +3520,26 @@ class EmissionCalculations(APIView):
 class YearFacilityDataAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_response
+    @cache_response
     def get(self, request):
         try:
             user = request.user
             facility_id = request.query_params.get('facility_id', 'all')
 
             # Validate facility
-            if facility_id != 'all' and not Facility.objects.filter(facility_id=facility_id, user=user).exists():
-                return Response(
-                    {'error': 'Invalid facility ID or not associated with the logged-in user.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Map categories to models (but we will only be interested in the fiscal years)
-            model_serializer_map = {
-                'waste': Waste,
-                'energy': Energy,
-                'water': Water,
-                'biodiversity': Biodiversity,
-                'logistics': Logistices,
-            }
+            scope = facility_scope(request, facility_id)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Fetch fiscal years from all categories (models)
-            fiscal_years_set = set()
-            for model in model_serializer_map.values():
-                queryset = model.objects.filter(user=user)
-                if facility_id != 'all':
-                    queryset = queryset.filter(facility__facility_id=facility_id)
-
-                # Map each record's year to the fiscal year
-                for record in queryset.values('DatePicker'):
-                    record_date = record['DatePicker']
-                    if record_date:
-                        record_year = record_date.year
-                        record_month = record_date.month
-                        
-                        # Adjust year based on fiscal year (April to March)
-                        fiscal_year = record_year if record_month >= 4 else record_year - 1
-                        fiscal_years_set.add(fiscal_year)
+            # Distinct fiscal years of all categories (models), computed in one query and cached
+            fiscal_years = available_fiscal_years(user, None if scope.facility_ids is None else scope.facility_ids[0])
 
             # If no fiscal years found, default to 0
-            if not fiscal_years_set:
+            if not fiscal_years:
                 years_list = [{"year": 0}]
             else:
-                # Convert set to list and sort the fiscal years
-                years_list = [{"year": year} for year in sorted(list(fiscal_years_set), reverse=True)]
+                years_list = [{"year": year} for year in fiscal_years]
 
             return Response({
                 "facility_id": facility_id,
@@ -6361,3 +3553,146 @@ class YearFacilityDataAPIView(APIView):
 
 '''YearFilter Ends'''
 
+'''Spreadsheet Import Starts'''
+class MetricImportView(APIView):
+    """Imports a .csv or .xlsx upload (`file`) into one metric category.
+
+    The first row holds the field names of the category's create API. Valid rows are inserted,
+    invalid ones are listed (by spreadsheet row number) in the error report.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, category):
+        if category not in IMPORT_CATEGORIES:
+            return Response(
+                {'error': f"Unknown category '{category}'. Choose one of: {', '.join(IMPORT_CATEGORIES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A .csv or .xlsx file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = MetricImporter(category, request.user).run(upload)
+        except ImportFileError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not report['total_rows']:
+            return Response({'error': 'The uploaded file has no data rows.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        report['message'] = f"Imported {report['created']} of {report['total_rows']} rows."
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+'''Spreadsheet Import Ends'''
+
+'''Bulk Upsert Starts'''
+# The categories with a one-entry-per-month unique constraint (not biodiversity)
+UPSERT_CATEGORIES = {
+    category: serializer_class for category, (model, serializer_class, _, _) in IMPORT_CATEGORIES.items()
+    if hasattr(model, 'unique_month_fields')
+}
+
+
+class MetricUpsertView(APIView):
+    """Creates or replaces a list of monthly entries of one metric category in one transaction.
+
+    Rows take the fields of the category's create API and are matched on facility_id and the month of
+    DatePicker (plus logistices_types and Typeof_fuel for logistices): a row for a month already
+    stored overwrites that entry, keeping its id, and overall_usage is recomputed from the new values.
+    Nothing is written if any row is invalid.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, category):
+        serializer_class = UPSERT_CATEGORIES.get(category)
+        if serializer_class is None:
+            return Response(
+                {'error': f"Unknown category '{category}'. Choose one of: {', '.join(UPSERT_CATEGORIES)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(request.data, list) or not request.data:
+            return Response({'error': 'A non-empty list of entries is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = serializer_class(data=request.data, many=True, context={'request': request, 'upsert': True})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        instances = serializer.save(user=request.user)
+        updated = serializer.updated
+        return Response({
+            'category': category,
+            'created': len(instances) - updated,
+            'updated': updated,
+            'message': f"Saved {len(instances)} entries: {len(instances) - updated} created, {updated} updated.",
+        }, status=status.HTTP_200_OK)
+
+'''Bulk Upsert Ends'''
+
+'''Dashboard Bundle Starts'''
+class DashboardBundleView(APIView):
+    """Returns several overview charts in one response.
+
+    `charts` is a comma separated (or repeated) list of overview endpoint names, all charts when omitted.
+    The charts share the year/facility_id/facility_location filters, each applying them like its endpoint
+    does (OverallUsageView and the renewable energy donut ignore facility_location), and are computed from
+    one grouped query per data source instead of one request (and dozens of queries) per chart.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @conditional_response
+    @cache_response
+    def get(self, request):
+        user = request.user
+        facility_id = request.GET.get('facility_id', None)
+        facility_location = request.GET.get('facility_location', None)
+        year = request.GET.get('year', None)
+        chart_ids = [
+            chart_id.strip()
+            for value in request.GET.getlist('charts')
+            for chart_id in value.split(',') if chart_id.strip()
+        ] or list(DASHBOARD_CHARTS)
+
+        unknown = [chart_id for chart_id in chart_ids if chart_id not in DASHBOARD_CHARTS]
+        if unknown:
+            return Response({'error': f"Unknown chart identifiers: {', '.join(unknown)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if year:
+                try:
+                    year = int(year)
+                    if year < 1900 or year > datetime.now().year + 10:
+                        return Response({'error': 'Invalid year parameter.'}, status=status.HTTP_400_BAD_REQUEST)
+                except ValueError:
+                    return Response({'error': 'Year must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                # Latest fiscal year with data (cached per user)
+                year = latest_fiscal_year(user)
+
+            # Facilities selected by facility_id / facility_location, resolved once per request
+            scope = facility_scope(request, facility_id, facility_location)
+            if scope.error:
+                return Response({'error': scope.error}, status=status.HTTP_400_BAD_REQUEST)
+            data = DashboardData(user, year, facility_id, facility_location, scope=scope)
+
+            return Response({
+                "year": year,
+                "facility_id": facility_id or 'all',
+                "facility_location": facility_location,
+                "charts": build_dashboard(data, chart_ids),
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error in DashboardBundleView: {e}")
+            return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+'''Dashboard Bundle Ends'''
+
+'''Response Cache Stats Starts'''
+class ResponseCacheStatsView(APIView):
+    """Hit/miss counters of the chart response cache, per view and overall (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache_stats(), status=status.HTTP_200_OK)
+'''Response Cache Stats Ends'''